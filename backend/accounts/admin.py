@@ -2,6 +2,7 @@ import nested_admin
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
+from utilities.admin import ScalableAdminMixin
 from .models import OTPRequest, User, PhoneNumber, StakeholderAccount, GovIssuedIdentity
 
 
@@ -30,7 +31,7 @@ class StakeholderAccountInline(nested_admin.NestedTabularInline):
 
 
 @admin.register(User)
-class UserAdmin(BaseUserAdmin, nested_admin.NestedModelAdmin):
+class UserAdmin(ScalableAdminMixin, BaseUserAdmin, nested_admin.NestedModelAdmin):
     fieldsets = (
         (None, {"fields": ("email", "password")}),
         (_("Personal info"), {"fields": ("first_name", "last_name")}),
@@ -64,9 +65,30 @@ class UserAdmin(BaseUserAdmin, nested_admin.NestedModelAdmin):
     inlines = [PhoneNumberInline, StakeholderAccountInline]
 
 
+class OTPExpiredFilter(admin.SimpleListFilter):
+    title = _("expired")
+    parameter_name = "expired"
+
+    def lookups(self, request, model_admin):
+        return (("1", _("Yes")), ("0", _("No")))
+
+    def queryset(self, request, queryset):
+        if self.value() in ("0", "1"):
+            return queryset.expired(self.value() == "1")
+        return queryset
+
+
 @admin.register(OTPRequest)
-class OTPRequestAdmin(nested_admin.NestedModelAdmin):
-    list_display = ("ref", "otp", "is_verified", "has_expired", "created_at")
+class OTPRequestAdmin(ScalableAdminMixin, nested_admin.NestedModelAdmin):
+    list_display = ("ref", "otp", "is_verified", "expired", "created_at")
     search_fields = ("ref",)
     ordering = ("-created_at",)
-    list_filter = ("created_at",)
\ No newline at end of file
+    list_filter = (OTPExpiredFilter, "created_at")
+
+    def get_queryset(self, request):
+        # Expiry is computed in the changelist query instead of per row
+        return super().get_queryset(request).with_expiry()
+
+    @admin.display(boolean=True, description="Expired", ordering="expired_flag")
+    def expired(self, obj):
+        return obj.has_expired()
\ No newline at end of file
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.14 on 2026-10-18 07:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_user_date_joined_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='otprequest',
+            index=models.Index(fields=['created_at'], name='otprequest_created_at_idx'),
+        ),
+    ]
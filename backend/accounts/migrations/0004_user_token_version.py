@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 07:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_otprequest_created_at_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='token_version',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Bumped to revoke every token issued before.'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.0.14 on 2026-10-18 07:19
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models.functions import Lower, Trim
+
+
+def normalize_emails(apps, schema_editor):
+    """
+    Lowercase stored emails. Accounts whose emails only differ by case
+    can't be merged automatically and have to be resolved by hand first.
+    """
+    User = apps.get_model('accounts', 'User')
+    duplicates = list(
+        User.objects.annotate(normalized=Lower(Trim('email')))
+        .values('normalized').annotate(count=models.Count('pk')).filter(count__gt=1)
+        .values_list('normalized', flat=True)
+    )
+    if duplicates:
+        raise RuntimeError(f"Users share these emails up to case, merge them first: {', '.join(duplicates)}")
+    User.objects.exclude(email=Lower(Trim('email'))).update(email=Lower(Trim('email')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_user_token_version'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Upper('email'), name='user_email_upper_unique'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser, BaseUserManager, UserManager
 from django.contrib.auth.hashers import make_password, check_password
+from django.db.models.functions import Upper
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 import random
@@ -10,14 +11,45 @@ from django.conf import settings
 import os
 
 
-class UserManager(BaseUserManager):
+class UserQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        """
+        Bulk updates send no post_save, which is what keeps the cached
+        Firebase users and token versions current, so drop the cache
+        entries of the updated users here. Changing a field our tokens
+        carry as a claim also revokes the tokens, as save() does.
+        """
+        from api_auth.revocation import invalidate_token_versions
+        from api_auth.user_cache import invalidate_user
+
+        users = list(self.values_list('pk', 'firebase_uid'))
+        if set(kwargs) & set(self.model.TOKEN_CLAIM_FIELDS) and 'token_version' not in kwargs:
+            kwargs['token_version'] = models.F('token_version') + 1
+        updated = super().update(**kwargs)
+        invalidate_user(*(uid for _, uid in users))
+        invalidate_token_versions(*(pk for pk, _ in users))
+        return updated
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
+    @classmethod
+    def normalize_email(cls, email):
+        """
+        Emails are stored and compared stripped and lowercased, so the same
+        address always maps to the same user whatever its casing. A missing
+        email stays None.
+        """
+        if email is None:
+            return None
+        return super().normalize_email(email).strip().lower()
+
     def _create_user(self, email, password, **extra_fields):
         """
         Create and save a user with the given email and password.
         """
         if not email:
             raise ValueError("Users must have an email address")
-        user = self.model(email=email, **extra_fields)
+        user = self.model(email=self.normalize_email(email), **extra_fields)
         user.password = make_password(password)
         user.save(using=self._db)
         return user
@@ -49,6 +81,7 @@ class User(AbstractUser):
     email = models.EmailField(_("email address"), unique=True)
     email_verified = models.BooleanField(_("email verified"), default=False, help_text=_("Designates whether the email has been verified."))
     firebase_uid = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    token_version = models.PositiveIntegerField(default=0, editable=False, help_text=_("Bumped to revoke every token issued before."))
 
     objects = UserManager()
 
@@ -59,6 +92,67 @@ class User(AbstractUser):
     class Meta:
         verbose_name = _("User")
         verbose_name_plural = _("Users")
+        indexes = [
+            models.Index(fields=['-date_joined', '-id'], name='user_date_joined_id_idx'),
+        ]
+        constraints = [
+            # Serves case-insensitive `email__iexact` lookups, which
+            # PostgreSQL compiles to UPPER(email) = UPPER(%s)
+            models.UniqueConstraint(Upper('email'), name='user_email_upper_unique'),
+        ]
+
+    # Fields carried as claims by our tokens; changing one revokes them
+    TOKEN_CLAIM_FIELDS = ('is_staff', 'is_superuser', 'is_active')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded uid so a change can drop the cache entry of
+        # the old one as well
+        if 'firebase_uid' in field_names:
+            instance._loaded_firebase_uid = instance.firebase_uid
+        instance._loaded_token_claims = {
+            field: getattr(instance, field) for field in cls.TOKEN_CLAIM_FIELDS if field in field_names
+        }
+        return instance
+
+    def have_token_claims_changed(self, update_fields=None):
+        """
+        Check, without a query, whether a field our tokens carry as a
+        claim differs from the value stored in the database.
+        """
+        loaded = getattr(self, '_loaded_token_claims', {})
+        return any(
+            getattr(self, field) != value
+            for field, value in loaded.items()
+            if update_fields is None or field in update_fields
+        )
+
+    def save(self, *args, **kwargs):
+        if self.email and 'email' not in self.get_deferred_fields():
+            self.email = type(self).objects.normalize_email(self.email)
+        update_fields = kwargs.get('update_fields')
+        if self.has_password_changed(update_fields) or self.have_token_claims_changed(update_fields):
+            # Tokens issued before were issued for the old password or
+            # still carry the old claims
+            self.token_version += 1
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'token_version'}
+        super().save(*args, **kwargs)
+        deferred = self.get_deferred_fields()
+        if 'firebase_uid' not in deferred:
+            self._loaded_firebase_uid = self.firebase_uid
+        self._loaded_token_claims = {
+            field: getattr(self, field) for field in self.TOKEN_CLAIM_FIELDS if field not in deferred
+        }
+
+    def has_password_changed(self, update_fields=None):
+        """
+        Check whether set_password() was called since the last save.
+        Django clears the raw password before saving a hash upgrade done
+        by check_password(), so upgrades don't count as changes.
+        """
+        return self._password is not None and (update_fields is None or 'password' in update_fields)
 
     def has_google_account(self):
         return self.firebase_uid != None
@@ -84,6 +178,28 @@ class TimeStampedBaseModel(models.Model):
         abstract = True
 
 
+class OTPRequestQuerySet(models.QuerySet):
+    @staticmethod
+    def expiry_cutoff():
+        """
+        Requests created before this moment have expired.
+        """
+        return timezone.now() - timezone.timedelta(seconds=getattr(settings, 'OTP_EXPIRATION_TIME', 600))
+
+    def expired(self, expired=True):
+        lookup = models.Q(created_at__lt=self.expiry_cutoff())
+        return self.filter(lookup if expired else ~lookup)
+
+    def with_expiry(self):
+        """
+        Annotate `expired_flag`, so expiry can be listed, filtered and
+        ordered on in the database.
+        """
+        return self.annotate(expired_flag=models.ExpressionWrapper(
+            models.Q(created_at__lt=self.expiry_cutoff()), output_field=models.BooleanField(),
+        ))
+
+
 class OTPRequest(TimeStampedBaseModel):
     ref = models.TextField()
     # Hashed random token for device identity
@@ -92,9 +208,14 @@ class OTPRequest(TimeStampedBaseModel):
     is_verified = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = OTPRequestQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("OTP Request")
         verbose_name_plural = _("OTP Requests")
+        indexes = [
+            models.Index(fields=['created_at'], name='otprequest_created_at_idx'),
+        ]
     
     def __str__(self):
         return f"{self.ref} - {self.otp}"
@@ -106,6 +227,8 @@ class OTPRequest(TimeStampedBaseModel):
         """
         Check if the OTP request has expired based on the expiration time.
         """
+        if hasattr(self, 'expired_flag'):
+            return self.expired_flag
         expiration_time = timezone.timedelta(
             seconds=getattr(settings, 'OTP_EXPIRATION_TIME', 600))
         return timezone.now() > self.created_at + expiration_time
@@ -46,18 +46,27 @@ class ChangeAccountPasswordSerializer(serializers.Serializer):
     new_password = serializers.CharField()
 
 
+class NormalizedEmailField(serializers.EmailField):
+    """
+    Email field validated to the stored form of user emails.
+    """
+
+    def to_internal_value(self, data):
+        return User.objects.normalize_email(super().to_internal_value(data))
+
+
 class SendOTPSerializer(serializers.Serializer):
-    email = serializers.EmailField()
+    email = NormalizedEmailField()
 
 
 class VerifyOTPSerializer(serializers.Serializer):
-    email = serializers.EmailField()
+    email = NormalizedEmailField()
     otp = serializers.CharField(max_length=6)
     device_identity = serializers.CharField(max_length=255)
 
 
 class ResetPasswordSerializer(serializers.Serializer):
-    email = serializers.EmailField()
+    email = NormalizedEmailField()
     new_password = serializers.CharField(min_length=6)
     device_identity = serializers.CharField(max_length=255)
 
@@ -68,7 +77,7 @@ class ResetPasswordWithTokenSerializer(serializers.Serializer):
 
 
 class VerifyEmailSerializer(serializers.Serializer):
-    email = serializers.EmailField()
+    email = NormalizedEmailField()
     device_identity = serializers.CharField(max_length=255)
 
 
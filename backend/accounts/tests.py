@@ -1,3 +1,46 @@
+from django.apps import apps
+from django.db import connection
 from django.test import TestCase
+from importlib import import_module
+import uuid
 
-# Create your tests here.
+from .models import User
+
+email_migration = import_module('accounts.migrations.0005_user_email_upper_unique')
+
+
+class NormalizeEmailsMigrationTests(TestCase):
+    def create_user(self, email):
+        user = User.objects.create_user(email=f"{uuid.uuid4()}@example.com")
+        # save() normalizes emails, so store the legacy value directly
+        User.objects.filter(pk=user.pk).update(email=email)
+        return user
+
+    def normalize_emails(self):
+        with connection.schema_editor() as schema_editor:
+            email_migration.normalize_emails(apps, schema_editor)
+
+    def test_lowercases_and_trims_emails(self):
+        mixed = self.create_user("  Mixed@Example.COM ")
+        lower = self.create_user("lower@example.com")
+        self.normalize_emails()
+        self.assertEqual(
+            dict(User.objects.filter(pk__in=[mixed.pk, lower.pk]).values_list('pk', 'email')),
+            {mixed.pk: "mixed@example.com", lower.pk: "lower@example.com"},
+        )
+
+    def test_aborts_on_emails_differing_only_by_case(self):
+        # The migration runs before the constraint that rules these out
+        # exists; the test transaction rolls its removal back
+        constraint = next(c for c in User._meta.constraints if c.name == 'user_email_upper_unique')
+        with connection.schema_editor() as schema_editor:
+            schema_editor.remove_constraint(User, constraint)
+        first = self.create_user("owner@example.com")
+        second = self.create_user("Owner@Example.com ")
+
+        with self.assertRaisesMessage(RuntimeError, "owner@example.com"):
+            self.normalize_emails()
+        self.assertEqual(
+            dict(User.objects.filter(pk__in=[first.pk, second.pk]).values_list('pk', 'email')),
+            {first.pk: "owner@example.com", second.pk: "Owner@Example.com "},
+        )
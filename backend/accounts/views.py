@@ -9,11 +9,13 @@ from rest_framework import views, permissions, status
 from rest_framework.response import Response
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework.request import Request
+from django_ratelimit.core import user_or_ip
 from django_ratelimit.decorators import ratelimit
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status, viewsets
 from django.contrib.auth import get_user_model
+from django.shortcuts import get_object_or_404
 from .models import OTPRequest
 from .serializers import PhoneNumberSerializer, ResetPasswordWithTokenSerializer, UserSerializer, UserMeSerializer, ChangeAccountPasswordSerializer, VerifyEmailSerializer
 from .serializers import SendOTPSerializer, VerifyOTPSerializer, ResetPasswordSerializer
@@ -35,6 +37,8 @@ class UserViewSet(viewsets.mixins.ListModelMixin,
     lookup_url_kwarg = 'pk'
     serializer_class = UserSerializer
     permission_classes = [permissions.AllowAny]
+    # Served by the `user_date_joined_id_idx` index
+    keyset_ordering = ('-date_joined', '-pk')
 
 
 class UserMeViewSet(viewsets.GenericViewSet):
@@ -44,6 +48,17 @@ class UserMeViewSet(viewsets.GenericViewSet):
     serializer_class = UserMeSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_object(self):
+        """
+        The authenticated user's User row. Token authenticated requests
+        only carry the token's claims as `request.user`.
+        """
+        user = self.request.user
+        if not isinstance(user, User):
+            user = get_object_or_404(User, pk=user.pk)
+        self.check_object_permissions(self.request, user)
+        return user
+
     @action(methods=['POST'], detail=False, url_path='change-password')
     @swagger_auto_schema(
         request_body=ChangeAccountPasswordSerializer,
@@ -55,7 +70,7 @@ class UserMeViewSet(viewsets.GenericViewSet):
         """
         Change the password of the authenticated user.
         """
-        user = request.user
+        user = self.get_object()
         serializer = ChangeAccountPasswordSerializer(
             data=request.data)
         if serializer.is_valid():
@@ -80,7 +95,7 @@ class UserMeViewSet(viewsets.GenericViewSet):
         """
         Get the profile of the authenticated user.
         """
-        user = request.user
+        user = self.get_object()
         serializer = UserMeSerializer(user)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
@@ -96,7 +111,7 @@ class UserMeViewSet(viewsets.GenericViewSet):
         """
         Update the profile of the authenticated user.
         """
-        user = request.user
+        user = self.get_object()
         serializer = UserMeSerializer(user, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
@@ -115,7 +130,7 @@ class UserMeViewSet(viewsets.GenericViewSet):
         """
         Add a phone number to the authenticated user.
         """
-        user = request.user
+        user = self.get_object()
         serializer = PhoneNumberSerializer(data=request.data)
         if serializer.is_valid():
             try:
@@ -129,12 +144,22 @@ class UserMeViewSet(viewsets.GenericViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+def email_ratelimit_key(request: Request):
+    """
+    Rate limit OTP requests per email address, or per client when the
+    request has no usable email.
+    """
+    email = request.data.get('email')
+    if isinstance(email, str) and email.strip():
+        return User.objects.normalize_email(email)
+    return user_or_ip(request)
+
 
 class PasswordResetViewSet(viewsets.ViewSet):
     __ID_FOR = 'password-reset'
     def __ratelimit_key(group, self: 'PasswordResetViewSet'):
         request: Request = self.request
-        return request.data.get('email')
+        return email_ratelimit_key(request)
     
     def __get_ref(self, input: str) -> str:
         """
@@ -160,7 +185,7 @@ class PasswordResetViewSet(viewsets.ViewSet):
         serializer.is_valid(raise_exception=True)
         email = serializer.validated_data['email']
 
-        user = User.objects.filter(email=email).first()
+        user = User.objects.filter(email__iexact=email).first()
         if not user:
             return Response({'detail': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -249,7 +274,7 @@ class PasswordResetViewSet(viewsets.ViewSet):
         if not otp_entry or not otp_entry.is_valid(device_identity) and otp_entry.is_verified:
             return Response({'detail': 'OTP not verified or expired'}, status=status.HTTP_400_BAD_REQUEST)
 
-        user = User.objects.filter(email=email).first()
+        user = User.objects.filter(email__iexact=email).first()
         if not user:
             return Response({'detail': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -280,7 +305,7 @@ class PasswordResetViewSet(viewsets.ViewSet):
 
         try:
             payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
-            email = payload.get('email')
+            email = User.objects.normalize_email(payload.get('email'))
             otp = payload.get('otp')
             device_identity = payload.get('device_identity')
         except jwt.ExpiredSignatureError:
@@ -295,7 +320,7 @@ class PasswordResetViewSet(viewsets.ViewSet):
         otp_entry.is_verified = True
         otp_entry.save()
 
-        user = User.objects.filter(email=email).first()
+        user = User.objects.filter(email__iexact=email).first()
         if not user:
             return Response({'detail': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
         user.set_password(new_password)
@@ -311,7 +336,7 @@ class EmailVerificationViewSet(viewsets.ViewSet):
     __ID_FOR = 'email-verification'
     def __ratelimit_key(group, self: 'EmailVerificationViewSet'):
         request: Request = self.request
-        return request.data.get('email')
+        return email_ratelimit_key(request)
     
     def __get_ref(self, input: str) -> str:
         """
@@ -337,7 +362,7 @@ class EmailVerificationViewSet(viewsets.ViewSet):
         serializer.is_valid(raise_exception=True)
         email = serializer.validated_data['email']
 
-        user = User.objects.filter(email=email).first()
+        user = User.objects.filter(email__iexact=email).first()
         if not user:
             return Response({'detail': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -425,7 +450,7 @@ class EmailVerificationViewSet(viewsets.ViewSet):
         if not otp_entry or not otp_entry.is_valid(device_identity) and otp_entry.is_verified:
             return Response({'detail': 'OTP not verified or expired'}, status=status.HTTP_400_BAD_REQUEST)
 
-        user = User.objects.filter(email=email).first()
+        user = User.objects.filter(email__iexact=email).first()
         if not user:
             return Response({'detail': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -455,7 +480,7 @@ class EmailVerificationViewSet(viewsets.ViewSet):
 
         try:
             payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
-            email = payload.get('email')
+            email = User.objects.normalize_email(payload.get('email'))
             otp = payload.get('otp')
             device_identity = payload.get('device_identity')
         except jwt.ExpiredSignatureError:
@@ -470,7 +495,7 @@ class EmailVerificationViewSet(viewsets.ViewSet):
         otp_entry.is_verified = True
         otp_entry.save()
 
-        user = User.objects.filter(email=email).first()
+        user = User.objects.filter(email__iexact=email).first()
         if not user:
             return Response({'detail': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
         user.email_verified = True
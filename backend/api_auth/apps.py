@@ -9,6 +9,9 @@ class ApiAuthConfig(AppConfig):
         # Import the authentication module to ensure it's loaded
         # when the app is ready.
         # import api_auth.authentication
+        from .signals import connect_signals
+        connect_signals()
+
         import firebase_admin
         from firebase_admin import credentials
         import os
@@ -1,13 +1,56 @@
-from firebase_admin import auth as firebase_auth
 from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
 from rest_framework import authentication, exceptions
 from rest_framework.authentication import get_authorization_header
-from django.db.models import Q
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from django.conf import settings
+from django.db import IntegrityError, transaction
+import jwt
 import logging
 
+from .claims import TOKEN_VERSION_CLAIM, ClaimsUser
+from .revocation import current_token_version
+from .token_cache import firebase_token_cache
+from .user_cache import cache_user, get_cached_user
+
 logger = logging.getLogger("django")
 
+# Issuer prefix of Firebase ID tokens; the project is checked on verification
+FIREBASE_ISSUER_PREFIX = "https://securetoken.google.com/"
+
+
+def get_bearer_token(request):
+    """
+    The raw token of a `Bearer` Authorization header, or None when the
+    request carries no bearer token.
+    """
+    header = get_authorization_header(request).split()
+
+    if not header or header[0].lower() != b"bearer":
+        return None
+
+    if len(header) == 1:
+        raise exceptions.AuthenticationFailed(_("Invalid token header. No credentials provided."))
+    elif len(header) > 2:
+        raise exceptions.AuthenticationFailed(_("Invalid token header. Token string should not contain spaces."))
+    return header[1]
+
+
+def is_firebase_token(raw_token):
+    """
+    Tell Firebase ID tokens from our own tokens by their unverified
+    claims: Firebase signs with a Google key (`kid`) and sets its own
+    issuer. Reading them only base64-decodes the token.
+    """
+    try:
+        header = jwt.get_unverified_header(raw_token)
+        claims = jwt.decode(raw_token, options={"verify_signature": False})
+    except jwt.PyJWTError:
+        return False
+    return 'kid' in header and str(claims.get('iss', '')).startswith(FIREBASE_ISSUER_PREFIX)
+
 
 class FirebaseAuthentication(authentication.BaseAuthentication):
     """
@@ -19,44 +62,142 @@ class FirebaseAuthentication(authentication.BaseAuthentication):
     media_type = "application/json"
 
     def authenticate(self, request):
-        header = get_authorization_header(request).split()
-        
-        if not header or header[0].lower() != b"bearer":
+        raw_token = get_bearer_token(request)
+        if raw_token is None:
             return None
 
-        if len(header) == 1:
-            raise exceptions.AuthenticationFailed(_("Invalid token header. No credentials provided."))
-        elif len(header) > 2:
-            raise exceptions.AuthenticationFailed(_("Invalid token header. Token string should not contain spaces."))
-
         try:
-            token = header[1].decode()
-            decoded_token = firebase_auth.verify_id_token(token, clock_skew_seconds=60)
-            uid = decoded_token["uid"]
+            decoded_token = firebase_token_cache.verify(raw_token.decode())
         except Exception as e:
             logger.error(f"Firebase token verification failed: {e}")
             return None # Let other authentication classes handle the request
 
+        return self.authenticate_claims(decoded_token)
+
+    def authenticate_claims(self, decoded_token):
+        """
+        The user of verified Firebase token claims. Served from the uid
+        cache in steady state, so authenticating costs no query.
+        """
+        uid = decoded_token["uid"]
+        user = get_cached_user(uid)
+        if user is None:
+            try:
+                user = self.get_or_provision_user(decoded_token)
+            except exceptions.AuthenticationFailed:
+                raise
+            except Exception as e:
+                logger.error(f"Error retrieving user: {e}")
+                raise exceptions.AuthenticationFailed(_("User retrieval failed.")) from e
+            if user.firebase_uid == uid:
+                cache_user(user)
+
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_("User is inactive."))
+        return (user, None)
+
+    def get_or_provision_user(self, decoded_token):
+        """
+        Look the user up by uid (one unique index lookup), falling back to
+        the email on first sign in, which links the account or creates it.
+        Each case writes the user at most once.
+        """
+        uid = decoded_token["uid"]
         User = get_user_model()
-        try:
-            user = User.objects.get(Q(firebase_uid=uid) | Q(email=decoded_token.get("email")))
-            if not user.firebase_uid or not user.email_verified:
-                # If the user exists but does not have a firebase_uid, update it
-                # and set email_verified to True
+        email = User.objects.normalize_email(decoded_token.get("email"))
+
+        user = User.objects.filter(firebase_uid=uid).first()
+        if user is not None:
+            if not user.email_verified:
+                user.email_verified = True
+                user.save(update_fields=['email_verified'])
+            return user
+
+        if not email:
+            # e.g. phone sign-in; accounts are identified by their email
+            raise exceptions.AuthenticationFailed(_("The Firebase account has no email address."))
+
+        user = User.objects.filter(email__iexact=email).first()
+        if user is not None:
+            if not user.firebase_uid:
+                # Link the existing account; Firebase verified the email
                 user.firebase_uid = uid
                 user.email_verified = True
-                user.save()
-        except User.DoesNotExist:
-            # If the user does not exist, create a new user instance
-            email = decoded_token.get("email")
-            display_name: str = decoded_token.get("name")
-            first_name, last_name = display_name.split(" ", 1) if display_name else (None, None)
-            user = User(email=email, first_name=first_name, last_name=last_name, firebase_uid=uid)
-            user.email_verified = True  # Assuming the email is verified by Firebase
-            user.save()
-            # TODO: Send a welcome email or perform any other action if needed
-        except Exception as e:
-            logger.error(f"Error retrieving user: {e}")
-            raise exceptions.AuthenticationFailed(_("User retrieval failed.")) from e
+                user.save(update_fields=['firebase_uid', 'email_verified'])
+            return user
+
+        display_name: str = decoded_token.get("name")
+        first_name, last_name = display_name.split(" ", 1) if display_name else (None, None)
+        try:
+            with transaction.atomic():
+                user = User.objects.create(
+                    email=email, first_name=first_name, last_name=last_name, firebase_uid=uid,
+                    email_verified=True,  # Assuming the email is verified by Firebase
+                )
+        except IntegrityError:
+            # A concurrent first request provisioned the user
+            return User.objects.get(firebase_uid=uid)
+        # TODO: Send a welcome email or perform any other action if needed
+        return user
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    SimpleJWT authentication that trusts the claims of a validated access
+    token instead of loading the user, unless JWT_STATELESS_USERS is off.
+
+    Tokens carry the user's token version, compared in O(1) against the
+    cached current version, so changing the password or deactivating the
+    user revokes every token issued before right away.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+        if user_id is None:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        version = current_token_version(user_id)
+        # Tokens issued before versions existed count as version 0
+        if version is None or validated_token.get(TOKEN_VERSION_CLAIM, 0) != version:
+            raise exceptions.AuthenticationFailed(_("Token has been revoked."), code="token_revoked")
+
+        if not getattr(settings, 'JWT_STATELESS_USERS', True):
+            return super().get_user(validated_token)
+        return ClaimsUser(validated_token)
+
+
+class BearerTokenAuthentication(authentication.BaseAuthentication):
+    """
+    Authenticate bearer tokens with the verifier of whoever issued them.
+
+    The unverified JWT header and issuer are read once to tell Firebase ID
+    tokens from our SimpleJWT tokens, so every request pays for exactly one
+    signature check and our own tokens never go through a failed Firebase
+    verification.
+    """
+
+    www_authenticate_realm = "api"
+
+    def __init__(self):
+        self.firebase = FirebaseAuthentication()
+        self.jwt = StatelessJWTAuthentication()
+
+    def authenticate(self, request):
+        raw_token = get_bearer_token(request)
+        if raw_token is None:
+            return None
+
+        if is_firebase_token(raw_token):
+            try:
+                decoded_token = firebase_token_cache.verify(raw_token.decode())
+            except Exception as e:
+                logger.warning(f"Firebase token verification failed: {e}")
+                raise exceptions.AuthenticationFailed(_("Invalid or expired Firebase token.")) from e
+            return self.firebase.authenticate_claims(decoded_token)
+
+        # Anything else is ours; SimpleJWT reports what is wrong with it
+        validated_token = self.jwt.get_validated_token(raw_token)
+        return self.jwt.get_user(validated_token), validated_token
 
-        return (user, None)
\ No newline at end of file
+    def authenticate_header(self, request):
+        return f'Bearer realm="{self.www_authenticate_realm}"'
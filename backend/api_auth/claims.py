@@ -0,0 +1,31 @@
+from rest_framework_simplejwt.models import TokenUser
+
+
+TOKEN_VERSION_CLAIM = "ver"
+
+
+def user_token_claims(user):
+    """
+    Claims added to our tokens so requests can be authenticated from the
+    token alone.
+    """
+    return {
+        TOKEN_VERSION_CLAIM: user.token_version,
+        'is_staff': user.is_staff,
+        'is_superuser': user.is_superuser,
+        'email_verified': user.email_verified,
+        'is_stakeholder': user.is_stakeholder(),
+    }
+
+
+class ClaimsUser(TokenUser):
+    """
+    Request user built from the claims of a validated access token,
+    without a query. Views needing the full User load it by `pk`.
+    """
+    @property
+    def email_verified(self):
+        return self.token.get('email_verified', False)
+
+    def is_stakeholder(self):
+        return self.token.get('is_stakeholder', False)
@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+
+TOKEN_VERSION_CACHE_PREFIX = "token-version"
+
+# Cached for users that are inactive or gone, whose tokens are all revoked
+REVOKED = -1
+
+
+def token_version_cache_key(user_id):
+    return f"{TOKEN_VERSION_CACHE_PREFIX}:{user_id}"
+
+
+def current_token_version(user_id):
+    """
+    The token version a user's tokens must carry, or None when all of them
+    are revoked. One cache read in steady state.
+    """
+    key = token_version_cache_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = get_user_model().objects.filter(pk=user_id, is_active=True).values_list('token_version', flat=True).first()
+        version = REVOKED if version is None else version
+        cache.set(key, version, timeout=getattr(settings, 'TOKEN_VERSION_CACHE_TIMEOUT', 60 * 60 * 24))
+    return None if version == REVOKED else version
+
+
+def publish_token_version(user_id, version):
+    """
+    Write a user's token version (or REVOKED) through to the cache once the
+    transaction commits, so a revocation applies to the very next request.
+    """
+    key = token_version_cache_key(user_id)
+    timeout = getattr(settings, 'TOKEN_VERSION_CACHE_TIMEOUT', 60 * 60 * 24)
+    transaction.on_commit(lambda: cache.set(key, version, timeout=timeout))
+
+
+def invalidate_token_versions(*user_ids):
+    """
+    Drop the cached token versions of the given users once the current
+    transaction commits; the next request reads them from the database.
+    """
+    keys = [token_version_cache_key(user_id) for user_id in user_ids]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def bump_token_version(user_id):
+    """
+    Revoke every token of a user whose claims changed outside the User row,
+    such as gaining or losing a stakeholder account.
+    """
+    User = get_user_model()
+    User.objects.filter(pk=user_id).update(token_version=F('token_version') + 1)
+    row = User.objects.filter(pk=user_id).values_list('token_version', 'is_active').first()
+    if row is not None:
+        version, is_active = row
+        publish_token_version(user_id, version if is_active else REVOKED)
@@ -1,5 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .claims import TOKEN_VERSION_CLAIM, user_token_claims
 
 class BasicAuthChangePasswordSerializer(serializers.Serializer):
     old_password = serializers.CharField()
-    new_password = serializers.CharField()
\ No newline at end of file
+    new_password = serializers.CharField()
+
+class CacheCountersSerializer(serializers.Serializer):
+    hits = serializers.IntegerField()
+    misses = serializers.IntegerField()
+
+
+class LocalCacheCountersSerializer(CacheCountersSerializer):
+    size = serializers.IntegerField()
+    maxsize = serializers.IntegerField()
+
+
+class FirebaseTokenCacheStatsSerializer(serializers.Serializer):
+    local = LocalCacheCountersSerializer()
+    shared = CacheCountersSerializer()
+    verifications = serializers.IntegerField(help_text="Tokens verified with Firebase by this process")
+
+
+class ClaimsTokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    """
+    Token pair carrying what authenticated requests need to know about the
+    user, so they can be served without loading it.
+    """
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        for claim, value in user_token_claims(user).items():
+            token[claim] = value
+        return token
+
+
+class ClaimsTokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """
+    Refresh that rejects revoked refresh tokens and issues the new access
+    token with the user's current claims.
+    """
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user_id = refresh.get(jwt_settings.USER_ID_CLAIM)
+        user = get_user_model().objects.filter(**{jwt_settings.USER_ID_FIELD: user_id, 'is_active': True}).first()
+        if user is None or refresh.get(TOKEN_VERSION_CLAIM, 0) != user.token_version:
+            raise AuthenticationFailed(_("Token has been revoked."), code="token_revoked")
+        for claim, value in user_token_claims(user).items():
+            refresh[claim] = value
+        # The parent copies the refreshed claims into the access token
+        return super().validate({"refresh": str(refresh)})
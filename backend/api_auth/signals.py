@@ -0,0 +1,48 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+
+from accounts.models import StakeholderAccount
+from .revocation import REVOKED, bump_token_version, publish_token_version
+from .user_cache import invalidate_user
+
+
+def invalidate_cached_user(sender, instance, **kwargs):
+    """
+    A saved or deleted user must not be served from the cache, under its
+    current uid or the one it was loaded with.
+    """
+    invalidate_user(instance.firebase_uid, getattr(instance, '_loaded_firebase_uid', None))
+
+
+def publish_user_token_version(sender, instance, update_fields=None, **kwargs):
+    """
+    Password changes and changes to the staff, superuser or active flags
+    bump the token version, and deactivation revokes every token; all of
+    them must reach the revocation cache right away.
+    """
+    if update_fields is not None and not {'token_version', 'is_active'} & set(update_fields):
+        return
+    publish_token_version(instance.pk, instance.token_version if instance.is_active else REVOKED)
+
+
+def revoke_deleted_user_tokens(sender, instance, **kwargs):
+    publish_token_version(instance.pk, REVOKED)
+
+
+def revoke_stakeholder_tokens(sender, instance, created=True, **kwargs):
+    """
+    Tokens carry `is_stakeholder`, so gaining or losing a stakeholder
+    account revokes them.
+    """
+    if created:
+        bump_token_version(instance.user_id)
+
+
+def connect_signals():
+    User = get_user_model()
+    post_save.connect(invalidate_cached_user, sender=User, dispatch_uid="firebase-user-cache-save")
+    post_delete.connect(invalidate_cached_user, sender=User, dispatch_uid="firebase-user-cache-delete")
+    post_save.connect(publish_user_token_version, sender=User, dispatch_uid="token-version-save")
+    post_delete.connect(revoke_deleted_user_tokens, sender=User, dispatch_uid="token-version-delete")
+    post_save.connect(revoke_stakeholder_tokens, sender=StakeholderAccount, dispatch_uid="token-version-stakeholder-save")
+    post_delete.connect(revoke_stakeholder_tokens, sender=StakeholderAccount, dispatch_uid="token-version-stakeholder-delete")
@@ -1,3 +1,149 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from accounts.models import OTPRequest
+from .authentication import FirebaseAuthentication
+from .revocation import current_token_version
+from .serializers import ClaimsTokenObtainPairSerializer
+from .user_cache import get_cached_user
+
+User = get_user_model()
+
+
+class TokenRevocationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="owner@example.com", password="old-password")
+        self.refresh = ClaimsTokenObtainPairSerializer.get_token(self.user)
+        self.access = str(self.refresh.access_token)
+        self.client = APIClient()
+
+    def get_profile(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        return self.client.get('/accounts/me/profile/')
+
+    def refresh_tokens(self):
+        return APIClient().post('/api-auth/basic/login/refresh/', {'refresh': str(self.refresh)}, format='json')
+
+    def assertRevoked(self, version):
+        self.assertEqual(current_token_version(self.user.pk), version)
+        self.assertEqual(self.get_profile(self.access).status_code, 401)
+        self.assertEqual(self.refresh_tokens().status_code, 401)
+
+    def test_tokens_work_until_revoked(self):
+        self.assertEqual(self.get_profile(self.access).status_code, 200)
+        response = self.refresh_tokens()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_profile(response.data['access']).status_code, 200)
+
+    def test_change_password_revokes_tokens(self):
+        # Load the version into the cache so the revocation has to replace it
+        self.assertEqual(self.get_profile(self.access).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/accounts/me/change-password/',
+                {'old_password': "old-password", 'new_password': "new-password"}, format='json',
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertRevoked(self.user.token_version + 1)
+
+    def test_reset_password_revokes_tokens(self):
+        self.assertEqual(self.get_profile(self.access).status_code, 200)
+        hashed_token, device_token = OTPRequest.generate_device_token()
+        OTPRequest.objects.create(
+            ref=f"password-reset:{self.user.email}", otp="123456", device_identity=hashed_token, is_verified=True,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            response = APIClient().post(
+                '/accounts/password-reset/reset_password/',
+                {'email': self.user.email, 'new_password': "new-password", 'device_identity': device_token},
+                format='json',
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertRevoked(self.user.token_version + 1)
+
+    def test_deactivation_revokes_tokens(self):
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertRevoked(None)
+
+    def test_refresh_rejects_stale_version(self):
+        # The refresh checks the version in the database, not the cache
+        User.objects.filter(pk=self.user.pk).update(token_version=self.user.token_version + 1)
+        response = self.refresh_tokens()
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data['detail'].code, "token_revoked")
+
+    @override_settings(PASSWORD_HASHERS=[
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+    ])
+    def test_login_upgrading_the_password_hash_keeps_tokens(self):
+        User.objects.filter(pk=self.user.pk).update(password=make_password("old-password", hasher='md5'))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = APIClient().post(
+                '/api-auth/basic/login/', {'email': self.user.email, 'password': "old-password"}, format='json',
+            )
+        self.assertEqual(response.status_code, 200)
+
+        user = User.objects.get(pk=self.user.pk)
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$"))
+        self.assertEqual(user.token_version, self.user.token_version)
+        # Tokens issued by that login and before it stay valid
+        self.assertEqual(self.get_profile(response.data['access']).status_code, 200)
+        self.assertEqual(self.get_profile(self.access).status_code, 200)
+        self.refresh = response.data['refresh']
+        self.assertEqual(self.refresh_tokens().status_code, 200)
+
+
+class FirebaseUserCacheTests(TestCase):
+    claims = {'uid': "firebase-uid-1", 'email': "Ada@Example.com", 'name': "Ada Lovelace"}
+
+    def setUp(self):
+        cache.clear()
+        self.authentication = FirebaseAuthentication()
+
+    def authenticate(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            user, _ = self.authentication.authenticate_claims(self.claims)
+        return user
+
+    def test_first_sign_in_provisions_and_caches_the_user(self):
+        user = self.authenticate()
+        self.assertEqual((user.email, user.first_name, user.last_name), ("ada@example.com", "Ada", "Lovelace"))
+        self.assertTrue(user.email_verified)
+
+        with self.assertNumQueries(0):
+            cached = self.authenticate()
+        self.assertEqual((cached.pk, cached.email), (user.pk, user.email))
+
+    def test_sign_in_links_an_existing_account(self):
+        existing = User.objects.create_user(email="ada@example.com")
+        self.assertEqual(self.authenticate().pk, existing.pk)
+        existing.refresh_from_db()
+        self.assertEqual(existing.firebase_uid, "firebase-uid-1")
+
+    def test_saves_and_bulk_updates_drop_the_entry(self):
+        user = self.authenticate()
+        user.first_name = "Augusta"
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+        self.assertIsNone(get_cached_user("firebase-uid-1"))
+        self.assertEqual(self.authenticate().first_name, "Augusta")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.filter(pk=user.pk).update(last_name="King")
+        self.assertIsNone(get_cached_user("firebase-uid-1"))
+        self.assertEqual(self.authenticate().last_name, "King")
+
+    def test_inactive_users_are_rejected(self):
+        user = self.authenticate()
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.filter(pk=user.pk).update(is_active=False)
+        with self.assertRaisesMessage(AuthenticationFailed, "User is inactive."):
+            self.authenticate()
@@ -0,0 +1,105 @@
+from django.conf import settings
+from django.core.cache import cache
+from firebase_admin import auth as firebase_auth
+import hashlib
+import threading
+import time
+
+from utilities.cache import LRUCache
+
+
+FIREBASE_TOKEN_CACHE_PREFIX = "firebase-token"
+
+# Concurrent misses on the same token wait on one of these instead of
+# verifying it in parallel; striping keeps the number of locks fixed
+LOCK_STRIPES = 64
+
+
+class FirebaseTokenCache:
+    """
+    Cache of verified Firebase ID token claims.
+
+    Verifying a token checks its RSA signature (and fetches Google's
+    certificates when they expired), so the decoded claims are kept until
+    the token's own `exp`, never longer than FIREBASE_TOKEN_CACHE_TIMEOUT.
+    Entries are keyed by a SHA-256 of the token, so tokens themselves are
+    not kept. The first tier is an in-process LRU; with
+    FIREBASE_TOKEN_SHARED_CACHE the Django cache (Redis when configured)
+    lets every worker reuse a verification.
+    Tokens that fail verification are not cached.
+    """
+
+    def __init__(self):
+        self.local_cache = LRUCache(
+            maxsize=getattr(settings, 'FIREBASE_TOKEN_CACHE_SIZE', 10000),
+            timeout=getattr(settings, 'FIREBASE_TOKEN_CACHE_TIMEOUT', 60 * 60),
+        )
+        self.shared_hits = 0
+        self.shared_misses = 0
+        self.verifications = 0
+        self._lock = threading.Lock()
+        self._stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+    @staticmethod
+    def cache_key(token):
+        return f"{FIREBASE_TOKEN_CACHE_PREFIX}:{hashlib.sha256(token.encode()).hexdigest()}"
+
+    def _lookup(self, key):
+        claims = self.local_cache.get(key)
+        if claims is not None or not getattr(settings, 'FIREBASE_TOKEN_SHARED_CACHE', False):
+            return claims
+        claims = cache.get(key)
+        with self._lock:
+            if claims is None:
+                self.shared_misses += 1
+            else:
+                self.shared_hits += 1
+        if claims is not None:
+            self._store_local(key, claims)
+        return claims
+
+    def _store_local(self, key, claims):
+        timeout = self._timeout(claims)
+        if timeout > 0:
+            self.local_cache.set(key, claims, timeout=timeout)
+
+    def _timeout(self, claims):
+        return min(claims.get('exp', 0) - time.time(), self.local_cache.timeout)
+
+    def verify(self, token):
+        """
+        Decoded claims of a Firebase ID token, verifying it only when no
+        worker has verified it before. Raises what
+        `firebase_auth.verify_id_token` raises for invalid tokens.
+        """
+        key = self.cache_key(token)
+        claims = self._lookup(key)
+        if claims is not None:
+            return claims
+
+        with self._stripes[hash(key) % LOCK_STRIPES]:
+            # A burst of requests with the same token verifies it once
+            claims = self._lookup(key)
+            if claims is not None:
+                return claims
+            claims = firebase_auth.verify_id_token(token, clock_skew_seconds=60)
+            with self._lock:
+                self.verifications += 1
+            self._store_local(key, claims)
+            timeout = self._timeout(claims)
+            if getattr(settings, 'FIREBASE_TOKEN_SHARED_CACHE', False) and timeout > 0:
+                cache.set(key, claims, timeout=int(timeout))
+        return claims
+
+    def stats(self):
+        """
+        Hit/miss counters of both cache tiers and the number of tokens
+        actually verified, for this process.
+        """
+        with self._lock:
+            shared = {'hits': self.shared_hits, 'misses': self.shared_misses}
+            verifications = self.verifications
+        return {'local': self.local_cache.stats(), 'shared': shared, 'verifications': verifications}
+
+
+firebase_token_cache = FirebaseTokenCache()
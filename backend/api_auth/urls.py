@@ -5,4 +5,5 @@ urlpatterns = [
     path("basic/login/", views.BasicAuthView.as_view(), name="basic_login"),
     path("basic/login/refresh/", views.BasicAuthRefreshView.as_view(), name="basic_login_refresh"),
     path("basic/login/verify/", views.BasicAuthVerifyView.as_view(), name="basic_login_verify"),
+    path("firebase/cache-stats/", views.FirebaseTokenCacheStatsView.as_view(), name="firebase_cache_stats"),
 ]
\ No newline at end of file
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+
+FIREBASE_USER_CACHE_PREFIX = "firebase-user"
+
+# Left out of cached users; read from the database if ever accessed
+UNCACHED_FIELDS = {'password'}
+
+
+def _cached_fields():
+    return [field for field in get_user_model()._meta.concrete_fields if field.name not in UNCACHED_FIELDS]
+
+
+def user_cache_key(uid):
+    return f"{FIREBASE_USER_CACHE_PREFIX}:{uid}"
+
+
+def get_cached_user(uid):
+    """
+    The user linked to a Firebase uid, rebuilt from the cache without a
+    query, or None on a miss.
+
+    Entries are dropped when a user is saved or deleted, and by
+    UserQuerySet.update(). Raw SQL writes to the users table bypass both,
+    and such users are served stale for up to FIREBASE_USER_CACHE_TIMEOUT.
+    """
+    values = cache.get(user_cache_key(uid))
+    fields = _cached_fields()
+    if values is None or len(values) != len(fields):
+        # Missing, or cached before the user model changed
+        return None
+    return get_user_model().from_db(DEFAULT_DB_ALIAS, [field.attname for field in fields], values)
+
+
+def cache_user(user):
+    """
+    Cache the field values of a user under its Firebase uid.
+    """
+    values = [getattr(user, field.attname) for field in _cached_fields()]
+    cache.set(user_cache_key(user.firebase_uid), values, timeout=getattr(settings, 'FIREBASE_USER_CACHE_TIMEOUT', 60 * 15))
+
+
+def invalidate_user(*uids):
+    """
+    Drop the cached users of the given uids once the current transaction
+    commits.
+    """
+    keys = [user_cache_key(uid) for uid in uids if uid]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
@@ -1,7 +1,11 @@
 from rest_framework_simplejwt import views as jwt
 from rest_framework_simplejwt import serializers as jwt_serializer
 from drf_yasg.utils import swagger_auto_schema
-from rest_framework import status
+from rest_framework import permissions, status, views
+from rest_framework.response import Response
+
+from .serializers import FirebaseTokenCacheStatsSerializer
+from .token_cache import firebase_token_cache
 
 
 class BasicAuthView(jwt.TokenObtainPairView):
@@ -16,4 +20,20 @@ class BasicAuthRefreshView(jwt.TokenRefreshView):
     pass
 
 class BasicAuthVerifyView(jwt.TokenVerifyView):
-    pass
\ No newline at end of file
+    pass
+
+
+class FirebaseTokenCacheStatsView(views.APIView):
+    """
+    Hit/miss counters of the Firebase token verification cache of the
+    worker process serving the request.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        responses={
+            status.HTTP_200_OK: FirebaseTokenCacheStatsSerializer,
+        }
+    )
+    def get(self, request, *args, **kwargs):
+        return Response(FirebaseTokenCacheStatsSerializer(firebase_token_cache.stats()).data, status=status.HTTP_200_OK)
@@ -1,6 +1,5 @@
 from django.contrib.auth.backends import ModelBackend as _ModelBackend
 from django.contrib.auth import get_user_model
-from django.db.models import Q
 
 
 UserModel = get_user_model()
@@ -14,7 +13,7 @@ class ModelBackend(_ModelBackend):
         if email is None or password is None:
             return
         try:
-            user = UserModel.objects.get(Q(email__iexact=email.strip()))
+            user = UserModel.objects.get(email__iexact=UserModel.objects.normalize_email(email))
         except UserModel.DoesNotExist:
             # Run the default password hasher once to reduce the timing
             # difference between an existing and a nonexistent user (#20760).
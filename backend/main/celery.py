@@ -0,0 +1,14 @@
+import os
+
+from celery import Celery
+
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'main.settings.dev')
+
+app = Celery('main')
+
+# Read every CELERY_* setting from the Django settings module
+app.config_from_object('django.conf:settings', namespace='CELERY')
+
+# Load tasks.py from every installed app
+app.autodiscover_tasks()
@@ -55,6 +55,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.gis',
+    'django.contrib.postgres',
 ]
 
 MIDDLEWARE = [
@@ -167,10 +168,11 @@ CORS_ALLOW_CREDENTIALS = True
 # Rest Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'api_auth.authentication.FirebaseAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Sends Firebase ID tokens and our own SimpleJWT tokens to their verifier
+        'api_auth.authentication.BearerTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ),
+    'DEFAULT_PAGINATION_CLASS': 'utilities.pagination.KeysetPagination',
 }
 
 
@@ -185,12 +187,33 @@ SWAGGER_SETTINGS = {
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
+    # Tokens carry the user claims and token version stateless requests need
+    'TOKEN_OBTAIN_SERIALIZER': 'api_auth.serializers.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'api_auth.serializers.ClaimsTokenRefreshSerializer',
 }
+JWT_STATELESS_USERS = True  # Build request users from access token claims instead of loading them
+TOKEN_VERSION_CACHE_TIMEOUT = 60 * 60 * 24  # Seconds a user's token version is cached; written through on save
 
 # CORS settings
 CORS_ALLOWED_ORIGINS = []
 CORS_ALLOW_CREDENTIALS = True
 
+# Cache settings
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
 # Channels settings
 CHANNEL_LAYERS = {
     "default": {
@@ -201,6 +224,31 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Celery settings
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
+CELERY_TASK_ALWAYS_EAGER = os.getenv("CELERY_TASK_ALWAYS_EAGER", "False") == "True"
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    # Picks up anything a previous run could not resolve
+    "geocode-pending-addresses": {
+        "task": "properties.tasks.geocode_pending_addresses",
+        "schedule": 600,  # 10 minutes
+    },
+    "sweep-image-blobs": {
+        "task": "properties.tasks.sweep_image_blobs",
+        "schedule": 60 * 60 * 6,  # 6 hours
+    },
+    "rollup-price-history": {
+        "task": "properties.tasks.rollup_price_history",
+        "schedule": 60 * 60,  # 1 hour
+    },
+    "detect-duplicate-listings": {
+        "task": "properties.tasks.detect_recent_duplicate_listings",
+        "schedule": 60 * 60 * 24,  # nightly
+    },
+}
+
 # Email settings
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = os.getenv("EMAIL_HOST")
@@ -216,6 +264,15 @@ EMAIL_TIMEOUT = 30  # 30 seconds timeout for email sending
 # OTP settings
 OTP_EXPIRATION_TIME = 300  # 5 minutes
 
+# Firebase token verification cache
+FIREBASE_TOKEN_CACHE_SIZE = 10000  # Verified tokens kept per process
+FIREBASE_TOKEN_CACHE_TIMEOUT = 60 * 60  # Upper bound; entries never outlive the token's exp
+FIREBASE_TOKEN_SHARED_CACHE = bool(REDIS_URL)  # Share verifications across workers through the cache
+FIREBASE_USER_CACHE_TIMEOUT = 60 * 15  # Seconds a Firebase uid's user is cached; dropped on save/delete
+
+# Admin settings
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 10000  # Rows above which changelists show estimated counts
+
 # Logging settings
 LOG_DIR = BASE_DIR / 'logs'
 if not LOG_DIR.exists():
@@ -298,5 +355,43 @@ MAP_WIDGETS = {
     }
 }
 
+# Geocoding settings
+GEOCODE_CACHE_PRECISION = 5  # Decimal places coordinates are rounded to (about 1 metre)
+GEOCODE_CACHE_TIMEOUT = 60 * 60 * 24 * 30  # 30 days
+GEOCODE_LOCAL_CACHE_SIZE = 10000  # Entries kept in each process
+GEOCODE_BATCH_SIZE = 500  # Pending addresses resolved per worker run
+GEOCODE_BATCH_DELAY = 5  # Seconds saves are collected before a worker run
+GEOCODE_RETRY_DELAY = 60  # Seconds before failed lookups are retried, doubled per failed run
+GEOCODE_RETRY_MAX_DELAY = 60 * 60  # 1 hour
+
+# Property map settings
+PROPERTY_CLUSTER_GRID_CELLS = 8  # Cluster grid cells per tile side
+PROPERTY_CLUSTER_MAX_ZOOM = 16  # From this zoom level individual properties are returned
+PROPERTY_CLUSTER_MAX_TILES = 64  # Maximum tiles a single viewport request may cover
+PROPERTY_CLUSTER_MAX_PINS_PER_TILE = 500
+PROPERTY_CLUSTER_CACHE_TIMEOUT = 300  # 5 minutes
+PROPERTY_TILE_MAX_ZOOM = 20  # Highest zoom level vector tiles are served for
+PROPERTY_TILE_CACHE_TIMEOUT = 3600  # 1 hour
+PROPERTY_TILE_HTTP_MAX_AGE = 60  # Seconds CDNs and browsers may reuse a tile; they miss invalidations
+PROPERTY_FACET_PRICE_BUCKETS = [0, 100000, 500000, 1000000, 5000000]  # Price facet bucket boundaries
+PROPERTY_FACET_CACHE_TIMEOUT = 300  # 5 minutes
+
+# Property image settings
+PROPERTY_IMAGE_VARIANTS = {'thumb': 320, 'card': 800, 'full': 1920}  # Longest side of each generated variant
+PROPERTY_IMAGE_WEBP_QUALITY = 80
+PROPERTY_IMAGE_JPEG_QUALITY = 82
+IMAGE_BLOB_GRACE_PERIOD = 60 * 60 * 24  # Seconds an unreferenced image file is kept before it is swept
+IMAGE_BLOB_SWEEP_BATCH_SIZE = 500
+BOOKMARK_CACHE_TIMEOUT = 60 * 60 * 24  # Seconds a user's bookmarked property IDs are cached
+BOOKMARK_BULK_MAX_SIZE = 100  # Properties per bulk bookmark request
+PRICE_HISTORY_AREA_PRECISION = 5  # Geohash characters of a price statistics area (about 5 km)
+PRICE_ROLLUP_WINDOW = 60 * 60 * 2  # Seconds of price changes each rollup run re-aggregates
+DUPLICATE_LISTING_RADIUS = 50  # Metres within which two listings can be duplicates
+DUPLICATE_LISTING_MIN_SIMILARITY = 0.6  # Estimated Jaccard similarity of the descriptions
+DUPLICATE_LISTING_SCAN_WINDOW = 60 * 60 * 25  # Seconds of changes the nightly pass re-checks
+DUPLICATE_LISTING_BATCH_SIZE = 500
+IMAGE_SIMILARITY_MAX_DISTANCE = 6  # Differing dHash bits (at most 7) for photos to be flagged as near duplicates
+IMAGE_SIMILARITY_MIN_DETAIL = 8  # dHash bits against the majority below which a photo is too plain to match
+
 # SSL settings
 # SECURE_SSL_REDIRECT = os.getenv("SECURE_SSL_REDIRECT", "False") == "True"
\ No newline at end of file
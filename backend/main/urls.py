@@ -42,6 +42,7 @@ urlpatterns = [
     path("", RedirectView.as_view(url=reverse_lazy("docs"))),
     path("accounts/", include('accounts.urls'), name="accounts"),
     path("api-auth/", include('api_auth.urls'), name="api-auth"),
+    path("properties/", include('properties.urls'), name="properties"),
     path("auth/", include('rest_framework.urls'), name="auth"),
     path('docs/', schema_view.with_ui('swagger', cache_timeout=0), name='docs'),
     path('admin/', admin.site.urls),
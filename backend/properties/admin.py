@@ -4,6 +4,8 @@ from django.contrib.gis.db import models as gis_models
 import mapwidgets
 import nested_admin
 
+from utilities.admin import ScalableAdminMixin, model_field_names
+
 
 class PropertyAdminInlineProxy:
     def has_add_permission(self, request, obj=None):
@@ -20,7 +22,7 @@ class PropertyAdminInlineProxy:
             self.has_add_permission(
                 request, obj) and request.user.stakeholder_account != obj.listed_by
         )):
-            return [field.name for field in self.model._meta.fields]
+            return model_field_names(self.model)
         return []  # No readonly fields if the user has permission
 
     def has_delete_permission(self, request, obj=None):
@@ -35,6 +37,10 @@ class PropertyImageInline(PropertyAdminInlineProxy, nested_admin.NestedTabularIn
     min_num = 1
     fields = ('image', 'is_primary')
 
+    def get_queryset(self, request):
+        # Each row's label is its __str__, which reads the property address
+        return super().get_queryset(request).select_related('property')
+
 
 class HomePropertyBedroomInline(PropertyAdminInlineProxy, nested_admin.NestedTabularInline):
     model = models.HomePropertyBedroom
@@ -42,8 +48,12 @@ class HomePropertyBedroomInline(PropertyAdminInlineProxy, nested_admin.NestedTab
     min_num = 1
     fields = ('level', 'dimention_width', 'dimention_length')
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('home_property')
+
 
 class PropertyAdminProxy:
+    list_display = ('__str__', 'is_active', 'verified', 'banned', 'created_at')
     formfield_overrides = {
         gis_models.PointField: {"widget": mapwidgets.GoogleMapPointFieldWidget(
             attrs={
@@ -56,6 +66,18 @@ class PropertyAdminProxy:
         )}
     }
 
+    def get_queryset(self, request):
+        # Status columns come from annotations instead of a query per row
+        return super().get_queryset(request).with_status()
+
+    @admin.display(boolean=True, description="Verified")
+    def verified(self, obj):
+        return obj.is_verified()
+
+    @admin.display(boolean=True, description="Banned")
+    def banned(self, obj):
+        return obj.is_banned()
+
     def save_model(self, request, obj, form, change):
         if not change:
             obj.listed_by = request.user.stakeholder_account
@@ -83,9 +105,8 @@ class PropertyAdminProxy:
             # Gray out all fields except `readable` if the admin is not the owner of the property
             readable = ['is_active', 'last_checked']
 
-            # Get only actual model fields (exclude related fields like ManyToOneRel)
-            all_fields = [
-                field.name for field in self.model._meta.get_fields() if not field.is_relation]
+            # Only actual model fields, computed once per model
+            all_fields = model_field_names(self.model, include_relations=False)
 
             # Add all fields except the readable ones to readonly_fields
             readonly_fields.update(
@@ -95,17 +116,18 @@ class PropertyAdminProxy:
 
 
 @admin.register(models.HomeProperty)
-class HomeProperty(PropertyAdminProxy, nested_admin.NestedModelAdmin):
+class HomeProperty(ScalableAdminMixin, PropertyAdminProxy, nested_admin.NestedModelAdmin):
     inlines = [HomePropertyBedroomInline, PropertyImageInline]
 
 
 @admin.register(models.ApartmentProperty)
-class ApartmentProperty(PropertyAdminProxy, nested_admin.NestedModelAdmin):
+class ApartmentProperty(ScalableAdminMixin, PropertyAdminProxy, nested_admin.NestedModelAdmin):
     inlines = [PropertyImageInline]
 
 
 @admin.register(models.BannedProperty)
 class BannedPropertyAdmin(admin.ModelAdmin):
+    list_select_related = ('property',)
     readonly_fields = ('banned_by',)
 
     def save_model(self, request, obj, form, change):
@@ -114,11 +136,28 @@ class BannedPropertyAdmin(admin.ModelAdmin):
         return super().save_model(request, obj, form, change)
 
 
+@admin.register(models.DuplicateCandidate)
+class DuplicateCandidateAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ('property', 'duplicate_of', 'similarity', 'distance', 'is_reviewed', 'created_at')
+    list_filter = ('is_reviewed',)
+    list_select_related = ('property', 'duplicate_of')
+    readonly_fields = ('property', 'duplicate_of', 'similarity', 'distance', 'created_at')
+
+
 @admin.register(models.VerifiedProperty)
 class VerifiedPropertyAdmin(admin.ModelAdmin):
+    list_select_related = ('property',)
     readonly_fields = ('verified_by',)
 
     def save_model(self, request, obj, form, change):
         if not hasattr(obj, 'verified_by') or (hasattr(obj, 'verified_by') and obj.verified_by is None):
             obj.verified_by = request.user
         return super().save_model(request, obj, form, change)
+
+
+@admin.register(models.SimilarImageFlag)
+class SimilarImageFlagAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ('image', 'similar_image', 'distance', 'is_reviewed', 'created_at')
+    list_filter = ('is_reviewed',)
+    list_select_related = ('image__property', 'similar_image__property')
+    readonly_fields = ('image', 'similar_image', 'distance', 'created_at')
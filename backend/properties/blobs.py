@@ -0,0 +1,73 @@
+from django.db import transaction
+from django.db.models import Case, F, When
+from django.db.models.functions import Now
+import os
+import re
+
+from .models import ImageBlob
+
+
+BLOB_NAME_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+
+def blob_digest(name):
+    """
+    SHA-256 a content addressed storage name was derived from, or None for
+    files stored before images were content addressed.
+    """
+    stem = os.path.splitext(os.path.basename(name or ''))[0]
+    return stem if BLOB_NAME_PATTERN.match(stem) else None
+
+
+def acquire_blob(storage, name, content=None):
+    """
+    Count one more image referencing the blob stored as `name`.
+
+    Saving a file that is already stored writes nothing, so the sweeper
+    may have removed it since the image was saved. The blob row is locked
+    first, which makes a running sweep finish (or skip the blob), and a
+    file that is gone by then is written again from `content`.
+    """
+    digest = blob_digest(name)
+    if digest is None:
+        return
+    with transaction.atomic():
+        ImageBlob.objects.select_for_update().filter(pk=digest).first()
+        if not storage.exists(name):
+            if content is None:
+                raise FileNotFoundError(f"Image blob {name} was removed and no content was given to restore it")
+            storage.save(name, content)
+        ImageBlob.objects.get_or_create(sha256=digest, defaults={
+            'name': name,
+            'size': lambda: storage.size(name),
+        })
+        ImageBlob.objects.filter(pk=digest).update(ref_count=F('ref_count') + 1, unreferenced_at=None)
+
+
+def release_blob(name):
+    """
+    Count one image fewer referencing the blob stored as `name`, marking
+    when it stopped being referenced.
+    """
+    digest = blob_digest(name)
+    if digest is None:
+        return
+    # `ref_count` in the CASE is the value before this update
+    ImageBlob.objects.filter(pk=digest).update(
+        ref_count=F('ref_count') - 1,
+        unreferenced_at=Case(When(ref_count__lte=1, then=Now()), default=None),
+    )
+
+
+def record_derived_files(name, files):
+    """
+    Remember files generated from a blob so the sweeper removes them too.
+    """
+    digest = blob_digest(name)
+    if digest is None or not files:
+        return
+    with transaction.atomic():
+        blob = ImageBlob.objects.select_for_update().filter(pk=digest).first()
+        if blob is not None:
+            blob.derived_files = sorted(set(blob.derived_files) | set(files))
+            blob.save(update_fields=['derived_files'])
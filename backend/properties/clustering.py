@@ -0,0 +1,122 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.contrib.gis.db.models import GeometryField
+from django.db.models import Avg, Count, F, FloatField, Func, Max, Min
+from django.db.models.functions import Cast, Floor
+import hashlib
+import json
+
+from .geo import mercator_location, tile_bounds, tile_polygon, tiles_in_bbox
+
+
+CLUSTER_CACHE_PREFIX = "property-clusters"
+
+
+def _coordinate(expression, axis):
+    return Func(expression, function=f"ST_{axis}", output_field=FloatField())
+
+
+def _tile_queryset(queryset, zoom, x, y):
+    """
+    Restrict `queryset` to the properties inside one XYZ tile.
+
+    The `&&` bounding box test on the web mercator expression is answered by
+    the `search_location_3857_gist` index; the half-open range then makes
+    sure a property on a tile edge is only ever counted in one tile.
+    """
+    min_x, min_y, max_x, max_y = tile_bounds(zoom, x, y)
+    return queryset.annotate(
+        mercator=mercator_location(),
+    ).filter(
+        mercator__bboverlaps=tile_polygon(zoom, x, y),
+    ).annotate(
+        longitude=_coordinate(Cast('location', GeometryField(srid=4326)), 'X'),
+        latitude=_coordinate(Cast('location', GeometryField(srid=4326)), 'Y'),
+        mercator_x=_coordinate('mercator', 'X'),
+        mercator_y=_coordinate('mercator', 'Y'),
+    ).filter(
+        mercator_x__gte=min_x, mercator_x__lt=max_x,
+        mercator_y__gt=min_y, mercator_y__lte=max_y,
+    )
+
+
+def cluster_tile(queryset, zoom, x, y):
+    """
+    Aggregate the properties of one tile into grid cells.
+    Counts, centroids and price ranges are all computed by PostgreSQL.
+    """
+    cells = getattr(settings, 'PROPERTY_CLUSTER_GRID_CELLS', 8)
+    min_x, min_y, max_x, max_y = tile_bounds(zoom, x, y)
+    cell_size = (max_x - min_x) / cells
+
+    rows = _tile_queryset(queryset, zoom, x, y).annotate(
+        cell_x=Floor((F('mercator_x') - min_x) / cell_size),
+        cell_y=Floor((F('mercator_y') - min_y) / cell_size),
+    ).values('cell_x', 'cell_y').annotate(
+        count=Count('pk'),
+        centroid_latitude=Avg('latitude'),
+        centroid_longitude=Avg('longitude'),
+        min_price=Min('price'),
+        max_price=Max('price'),
+    ).order_by()
+
+    return [
+        {
+            'count': row['count'],
+            'latitude': row['centroid_latitude'],
+            'longitude': row['centroid_longitude'],
+            'min_price': row['min_price'],
+            'max_price': row['max_price'],
+        }
+        for row in rows
+    ]
+
+
+def tile_pins(queryset, zoom, x, y):
+    """
+    Individual properties of one tile, for zoom levels close enough
+    that clustering is no longer useful.
+    """
+    limit = getattr(settings, 'PROPERTY_CLUSTER_MAX_PINS_PER_TILE', 500)
+    return list(
+        _tile_queryset(queryset, zoom, x, y).values(
+            'property_id', 'latitude', 'longitude', 'property_type', 'price',
+        ).order_by()[:limit]
+    )
+
+
+def _cache_key(zoom, x, y, filters):
+    digest = hashlib.md5(
+        json.dumps(filters, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return f"{CLUSTER_CACHE_PREFIX}:{zoom}:{x}:{y}:{digest}"
+
+
+def clusters_for_bbox(queryset, bbox, zoom, filters):
+    """
+    Clusters (or individual pins, when zoomed in far enough) for every tile
+    covering `bbox`. Each tile is cached separately per zoom level and filter
+    set, so panning only computes the tiles that were not seen recently.
+    """
+    show_pins = zoom >= getattr(settings, 'PROPERTY_CLUSTER_MAX_ZOOM', 16)
+    tiles = tiles_in_bbox(*bbox, zoom)
+    keys = {_cache_key(zoom, x, y, filters): (x, y) for x, y in tiles}
+
+    cached = cache.get_many(list(keys))
+    missing = {}
+    for key, (x, y) in keys.items():
+        if key in cached:
+            continue
+        if show_pins:
+            missing[key] = {'clusters': [], 'properties': tile_pins(queryset, zoom, x, y)}
+        else:
+            missing[key] = {'clusters': cluster_tile(queryset, zoom, x, y), 'properties': []}
+    if missing:
+        cache.set_many(missing, timeout=getattr(settings, 'PROPERTY_CLUSTER_CACHE_TIMEOUT', 300))
+    cached.update(missing)
+
+    result = {'zoom': zoom, 'clusters': [], 'properties': []}
+    for tile in cached.values():
+        result['clusters'].extend(tile['clusters'])
+        result['properties'].extend(tile['properties'])
+    return result
@@ -0,0 +1,84 @@
+from django.conf import settings
+from django.contrib.gis.db.models.functions import Distance
+from django.contrib.gis.measure import D
+from django.db.models import Q
+from django.utils import timezone
+import logging
+
+from utilities.minhash import estimated_similarity, lsh_bands, minhash_signature
+from .models import DuplicateCandidate, Property
+
+
+logger = logging.getLogger("django")
+
+
+def update_description_signatures(properties):
+    """
+    Recompute the MinHash signature and LSH bands of each property's
+    description and store them with a single bulk update, marking the
+    properties as checked.
+    """
+    checked_at = timezone.now()
+    for prop in properties:
+        prop.description_minhash = minhash_signature(prop.description)
+        prop.description_bands = lsh_bands(prop.description_minhash)
+        prop.duplicates_checked_at = checked_at
+    Property.objects.bulk_update(properties, ['description_minhash', 'description_bands', 'duplicates_checked_at'])
+
+
+def find_duplicate_listings(prop):
+    """
+    Listings within DUPLICATE_LISTING_RADIUS metres of `prop` whose
+    description is at least DUPLICATE_LISTING_MIN_SIMILARITY similar, as
+    `(listing, similarity, distance)`.
+
+    Candidates must be close by (GiST index on `location`) and share an LSH
+    band with the description (GIN index on `description_bands`), so the
+    lookup never compares against every listing.
+    """
+    if not prop.description_bands:
+        return []
+    radius = getattr(settings, 'DUPLICATE_LISTING_RADIUS', 50)
+    min_similarity = getattr(settings, 'DUPLICATE_LISTING_MIN_SIMILARITY', 0.6)
+    candidates = Property.objects.filter(
+        location__dwithin=(prop.location, D(m=radius)),
+        description_bands__overlap=prop.description_bands,
+        is_deleted=False,
+    ).exclude(pk=prop.pk).annotate(
+        distance=Distance('location', prop.location),
+    ).only('id', 'created_at', 'description_minhash').order_by()
+
+    matches = []
+    for candidate in candidates:
+        similarity = estimated_similarity(prop.description_minhash, candidate.description_minhash)
+        if similarity >= min_similarity:
+            matches.append((candidate, similarity, candidate.distance.m))
+    return matches
+
+
+def flag_duplicate_listings(prop):
+    """
+    Record a DuplicateCandidate for every likely duplicate of `prop`, the
+    newer listing of each pair being the suspected repost, and drop the
+    unreviewed ones that no longer match.
+    """
+    matches = find_duplicate_listings(prop)
+    others = [match.pk for match, _, _ in matches]
+    DuplicateCandidate.objects.filter(
+        Q(property=prop) & ~Q(duplicate_of__in=others) | Q(duplicate_of=prop) & ~Q(property__in=others),
+        is_reviewed=False,
+    ).delete()
+
+    candidates = []
+    for match, similarity, distance in matches:
+        newer, older = (prop, match) if (prop.created_at, str(prop.pk)) > (match.created_at, str(match.pk)) else (match, prop)
+        candidates.append(DuplicateCandidate(property=newer, duplicate_of=older, similarity=similarity, distance=distance))
+    DuplicateCandidate.objects.bulk_create(
+        candidates,
+        update_conflicts=True,
+        unique_fields=['property', 'duplicate_of'],
+        update_fields=['similarity', 'distance'],
+    )
+    if matches:
+        logger.info(f"Property {prop.pk} is a likely duplicate of {len(matches)} nearby listings")
+    return matches
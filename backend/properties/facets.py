@@ -0,0 +1,134 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+import hashlib
+import json
+import time
+
+from .models import Property, HomeProperty, ApartmentProperty, PropertySearchIndex
+
+
+FACET_CACHE_PREFIX = "property-facets"
+FACET_GENERATION_KEY = f"{FACET_CACHE_PREFIX}:generation"
+
+# Facets counted per option, keyed by the search index column they count
+CHOICE_FACETS = {
+    'property_type': Property.PROPERTY_TYPE_CHOICES,
+    'list_type': HomeProperty.LISTING_TYPE_CHOICES,
+    'home_type': HomeProperty.HOME_TYPE_CHOICES,
+    'apartment_type': ApartmentProperty.APARTMENT_TYPE_CHOICES,
+    'architectural_style': HomeProperty.ARCHITECTURAL_STYLE_CHOICES,
+}
+
+
+def price_buckets():
+    """
+    `(min_price, max_price)` ranges from the PROPERTY_FACET_PRICE_BUCKETS
+    boundaries; the last bucket is open ended.
+    """
+    bounds = getattr(settings, 'PROPERTY_FACET_PRICE_BUCKETS', [0, 100000, 500000, 1000000, 5000000])
+    return list(zip(bounds, [*bounds[1:], None]))
+
+
+def _facet_values(entry):
+    """
+    Everything about a search index entry the facet counts depend on.
+    """
+    listed = entry.is_active and not entry.is_deleted and not entry.is_banned
+    bucket = None
+    if entry.price is not None:
+        bucket = sum(1 for low, _ in price_buckets() if entry.price >= low)
+    return (listed, entry.is_verified, bucket, *(getattr(entry, facet) for facet in CHOICE_FACETS))
+
+
+def facets_changed(previous, current):
+    """
+    Whether rewriting the entries `previous` with `current` (both mapping
+    property ids to search index entries) changes any facet count. Edits
+    to descriptions, addresses or images leave the counts alone.
+    """
+    return any(
+        property_id not in previous or _facet_values(previous[property_id]) != _facet_values(entry)
+        for property_id, entry in current.items()
+    )
+
+
+def facet_counts(filters):
+    """
+    Count every facet option for a filter set in one aggregate query, with
+    one `COUNT(*) FILTER (WHERE ...)` per option.
+
+    Each facet ignores its own filter, so the options of an active facet
+    still show how many results selecting them instead would give.
+    """
+    conditions = PropertySearchIndex.objects.filter_conditions(filters)
+
+    def others(facet):
+        return Q(*(condition for name, condition in conditions.items() if name != facet))
+
+    aggregates = {'total': Count('pk', filter=Q(*conditions.values()))}
+    options = []
+    for facet, choices in CHOICE_FACETS.items():
+        for value, _ in choices:
+            alias = f"facet_{len(options)}"
+            aggregates[alias] = Count('pk', filter=Q(**{facet: value}) & others(facet))
+            options.append((alias, facet, value))
+
+    buckets = price_buckets()
+    for index, (low, high) in enumerate(buckets):
+        bucket = Q(price__gte=low) & (Q(price__lt=high) if high is not None else Q())
+        aggregates[f"price_{index}"] = Count('pk', filter=bucket & others('price'))
+    aggregates['verified'] = Count('pk', filter=Q(is_verified=True) & others('verified'))
+
+    row = PropertySearchIndex.objects.listed().aggregate(**aggregates)
+
+    result = {facet: {} for facet in CHOICE_FACETS}
+    for alias, facet, value in options:
+        result[facet][value] = row[alias]
+    result['price'] = [
+        {'min_price': low, 'max_price': high, 'count': row[f"price_{index}"]}
+        for index, (low, high) in enumerate(buckets)
+    ]
+    result['total'] = row['total']
+    result['verified'] = row['verified']
+    return result
+
+
+def _generation():
+    # Seeded from the clock so a generation lost from the cache never
+    # matches entries written under an earlier one
+    return cache.get_or_set(FACET_GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def facet_cache_key(filters):
+    """
+    Cache key of a filter set. Filters are normalized first so the same
+    filters in a different order or with empty values share an entry.
+    """
+    normalized = {key: str(value) for key, value in filters.items() if value not in (None, '', False)}
+    digest = hashlib.md5(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+    return f"{FACET_CACHE_PREFIX}:{_generation()}:{digest}"
+
+
+def get_facet_counts(filters):
+    """
+    Cached facet counts for a filter set.
+    """
+    key = facet_cache_key(filters)
+    counts = cache.get(key)
+    if counts is None:
+        counts = facet_counts(filters)
+        cache.set(key, counts, timeout=getattr(settings, 'PROPERTY_FACET_CACHE_TIMEOUT', 300))
+    return counts
+
+
+def invalidate_facets():
+    """
+    Move every cached facet count to a new generation. Old entries are no
+    longer read and expire on their own. Only called when a change affects
+    the counts; a busy index would otherwise never serve a cached count.
+    """
+    try:
+        cache.incr(FACET_GENERATION_KEY)
+    except ValueError:
+        cache.set(FACET_GENERATION_KEY, time.time_ns(), timeout=None)
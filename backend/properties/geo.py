@@ -0,0 +1,132 @@
+import math
+from django.contrib.gis.db.models import GeometryField, PointField
+from django.contrib.gis.db.models.functions import Transform
+from django.contrib.gis.geos import Point, Polygon
+from django.db.models import FloatField, Func, Value
+from django.db.models.functions import Cast
+
+
+# Half the width of the EPSG:3857 (web mercator) world, in metres.
+WEB_MERCATOR_EXTENT = 20037508.342789244
+MAX_MERCATOR_LATITUDE = 85.0511287798
+
+
+def make_point(latitude, longitude):
+    """
+    Build a WGS84 point from a latitude/longitude pair.
+    """
+    return Point(float(longitude), float(latitude), srid=4326)
+
+
+class KNNDistance(Func):
+    """
+    PostGIS `<->` distance operator between a geography column and a point.
+
+    Ordering by this expression lets PostgreSQL walk the GiST index on the
+    column nearest-first instead of sorting every candidate row.
+    """
+    arg_joiner = " <-> "
+    template = "(%(expressions)s)"
+    output_field = FloatField()
+
+    def __init__(self, expression, point, **extra):
+        point_value = Value(point, output_field=PointField(srid=point.srid, geography=True))
+        super().__init__(expression, point_value, **extra)
+
+
+def mercator_location(field='location'):
+    """
+    Web mercator (EPSG:3857) geometry of a geography point column.
+    Matches the expression of the `search_location_3857_gist` index.
+    """
+    return Transform(Cast(field, GeometryField(srid=4326)), 3857)
+
+
+def tile_bounds(zoom, x, y):
+    """
+    EPSG:3857 bounds `(min_x, min_y, max_x, max_y)` of an XYZ map tile.
+    """
+    size = 2 * WEB_MERCATOR_EXTENT / (1 << zoom)
+    min_x = -WEB_MERCATOR_EXTENT + x * size
+    max_y = WEB_MERCATOR_EXTENT - y * size
+    return min_x, max_y - size, min_x + size, max_y
+
+
+def tile_polygon(zoom, x, y):
+    """
+    EPSG:3857 polygon covering an XYZ map tile.
+    """
+    polygon = Polygon.from_bbox(tile_bounds(zoom, x, y))
+    polygon.srid = 3857
+    return polygon
+
+
+def _tile_position(longitude, latitude, zoom):
+    # Position in tile units: the integer parts are the tile, the
+    # fractions the offset within it
+    n = 1 << zoom
+    latitude = max(min(latitude, MAX_MERCATOR_LATITUDE), -MAX_MERCATOR_LATITUDE)
+    x = (longitude + 180.0) / 360.0 * n
+    y = (1.0 - math.asinh(math.tan(math.radians(latitude))) / math.pi) / 2.0 * n
+    return x, y
+
+
+def tile_for_lnglat(longitude, latitude, zoom):
+    """
+    XYZ tile `(x, y)` containing a WGS84 coordinate at `zoom`.
+    """
+    n = 1 << zoom
+    x, y = _tile_position(longitude, latitude, zoom)
+    return min(max(int(x), 0), n - 1), min(max(int(y), 0), n - 1)
+
+
+def tiles_near_lnglat(longitude, latitude, zoom, margin):
+    """
+    XYZ tiles `(x, y)` at `zoom` whose bounds, widened by `margin` of a
+    tile on every side, contain a WGS84 coordinate: the tile holding it
+    and any neighbour drawing it in its buffer.
+    """
+    n = 1 << zoom
+    x, y = _tile_position(longitude, latitude, zoom)
+    xs = range(max(int(math.floor(x - margin)), 0), min(int(math.floor(x + margin)), n - 1) + 1)
+    ys = range(max(int(math.floor(y - margin)), 0), min(int(math.floor(y + margin)), n - 1) + 1)
+    return [(tile_x, tile_y) for tile_x in xs for tile_y in ys]
+
+
+def tiles_in_bbox(west, south, east, north, zoom):
+    """
+    XYZ tiles `(x, y)` covering a WGS84 bounding box at `zoom`.
+    """
+    min_x, max_y = tile_for_lnglat(west, south, zoom)
+    max_x, min_y = tile_for_lnglat(east, north, zoom)
+    return [(x, y) for x in range(min_x, max_x + 1) for y in range(min_y, max_y + 1)]
+
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash(latitude, longitude, precision=5):
+    """
+    Geohash of a position: a string naming the grid cell it falls in,
+    with longer hashes naming smaller cells (5 characters is about 5 km).
+    """
+    bounds = [[-90.0, 90.0], [-180.0, 180.0]]
+    values = (latitude, longitude)
+    characters = []
+    bits = bit_count = 0
+    axis = 1  # Longitude comes first
+    while len(characters) < precision:
+        low, high = bounds[axis]
+        middle = (low + high) / 2
+        bits <<= 1
+        if values[axis] >= middle:
+            bits |= 1
+            bounds[axis][0] = middle
+        else:
+            bounds[axis][1] = middle
+        axis ^= 1
+        bit_count += 1
+        if bit_count == 5:
+            characters.append(GEOHASH_ALPHABET[bits])
+            bits = bit_count = 0
+    return "".join(characters)
@@ -0,0 +1,132 @@
+from django.conf import settings
+from django.core.cache import cache
+import googlemaps
+import threading
+
+from utilities.cache import LRUCache
+
+
+GEOCODE_CACHE_PREFIX = "geocode"
+
+
+class GeocodingError(Exception):
+    pass
+
+
+class ReverseGeocoder:
+    """
+    Reverse geocoder backed by a two tier cache.
+
+    Coordinates are rounded to GEOCODE_CACHE_PRECISION decimal places (5 is
+    roughly one metre) so re-saves and nearby duplicates share an entry. The
+    first tier is an in-process LRU, the second the shared Django cache
+    (Redis when configured), so only coordinates no worker has resolved
+    before reach the Google Maps API.
+    """
+
+    def __init__(self):
+        self.local_cache = LRUCache(
+            maxsize=getattr(settings, 'GEOCODE_LOCAL_CACHE_SIZE', 10000),
+            timeout=getattr(settings, 'GEOCODE_CACHE_TIMEOUT', 60 * 60 * 24 * 30),
+        )
+        self.shared_hits = 0
+        self.shared_misses = 0
+        self._published = {}
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        # Build the client once and reuse its HTTP session
+        if self._client is None:
+            self._client = googlemaps.Client(key=settings.GOOGLE_MAP_API_KEY)
+        return self._client
+
+    @staticmethod
+    def cache_key(latitude, longitude):
+        precision = getattr(settings, 'GEOCODE_CACHE_PRECISION', 5)
+        return f"{GEOCODE_CACHE_PREFIX}:{latitude:.{precision}f}:{longitude:.{precision}f}"
+
+    def resolve(self, latitude, longitude):
+        """
+        Return the formatted address for a coordinate, or an empty string
+        when Google has no address for it. Raises GeocodingError when the
+        API call fails.
+        """
+        key = self.cache_key(latitude, longitude)
+
+        address = self.local_cache.get(key)
+        if address is not None:
+            return address
+
+        address = cache.get(key)
+        with self._lock:
+            if address is None:
+                self.shared_misses += 1
+            else:
+                self.shared_hits += 1
+        if address is not None:
+            self.local_cache.set(key, address)
+            return address
+
+        try:
+            result = self.client.reverse_geocode((latitude, longitude))
+        except Exception as e:
+            # Failures are not cached so the next attempt retries
+            raise GeocodingError(str(e)) from e
+
+        # An empty string records coordinates that have no address, so they
+        # are not looked up again either.
+        address = result[0]['formatted_address'] if result else ""
+        cache.set(key, address, timeout=self.local_cache.timeout)
+        self.local_cache.set(key, address)
+        return address
+
+    def stats(self):
+        """
+        Hit/miss counters of both cache tiers for this process.
+        """
+        with self._lock:
+            shared = {'hits': self.shared_hits, 'misses': self.shared_misses}
+        return {'local': self.local_cache.stats(), 'shared': shared}
+
+    def publish_stats(self):
+        """
+        Add this process's counters since the last call to the totals in
+        the shared cache. Lookups run in the Celery workers, so that is
+        where every worker's counters add up for shared_stats().
+        """
+        stats = self.stats()
+        counters = {
+            f"{tier}_{name}": stats[tier][name] for tier in ('local', 'shared') for name in ('hits', 'misses')
+        }
+        for counter, value in counters.items():
+            delta = value - self._published.get(counter, 0)
+            if delta:
+                key = geocode_stats_key(counter)
+                cache.add(key, 0, timeout=None)
+                try:
+                    cache.incr(key, delta)
+                except ValueError:
+                    # Evicted between add() and incr()
+                    cache.set(key, delta, timeout=None)
+        self._published = counters
+
+    @staticmethod
+    def shared_stats():
+        """
+        Hit/miss counters of both cache tiers summed over every worker.
+        """
+        names = [f"{tier}_{name}" for tier in ('local', 'shared') for name in ('hits', 'misses')]
+        values = cache.get_many([geocode_stats_key(name) for name in names])
+        return {
+            tier: {name: values.get(geocode_stats_key(f"{tier}_{name}"), 0) for name in ('hits', 'misses')}
+            for tier in ('local', 'shared')
+        }
+
+
+def geocode_stats_key(counter):
+    return f"{GEOCODE_CACHE_PREFIX}:stats:{counter}"
+
+
+reverse_geocoder = ReverseGeocoder()
@@ -0,0 +1,152 @@
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+import io
+import os
+
+from utilities.blurhash import SAMPLE_SIZE, encode_blurhash
+from utilities.perceptual_hash import dhash, hash_bands, to_signed
+
+
+# Longest side, in pixels, of each generated variant
+DEFAULT_IMAGE_VARIANTS = {
+    'thumb': 320,
+    'card': 800,
+    'full': 1920,
+}
+
+# Variant formats, in the order clients should prefer them
+VARIANT_FORMATS = {
+    'webp': ('WEBP', 'PROPERTY_IMAGE_WEBP_QUALITY', 80),
+    'jpeg': ('JPEG', 'PROPERTY_IMAGE_JPEG_QUALITY', 82),
+}
+
+
+def variant_path(image_name, variant, extension):
+    """
+    Storage name of one variant, stored next to the original and named
+    after it, so every original has variant files of its own.
+    """
+    directory, filename = os.path.split(image_name)
+    stem = os.path.splitext(filename)[0]
+    return f"{directory}/variants/{stem}-{variant}.{extension}"
+
+
+def _encode(image, extension):
+    image_format, quality_setting, default_quality = VARIANT_FORMATS[extension]
+    buffer = io.BytesIO()
+    options = {'quality': getattr(settings, quality_setting, default_quality)}
+    if image_format == 'JPEG':
+        options.update(optimize=True, progressive=True)
+    else:
+        options.update(method=4)
+    # No `exif` argument is passed, so none of the original metadata
+    # (camera, GPS position, ...) is written to the variant
+    image.save(buffer, format=image_format, **options)
+    return buffer.getvalue()
+
+
+def generate_variants(field_file):
+    """
+    Resize an uploaded image into every PROPERTY_IMAGE_VARIANTS size, in
+    WebP and JPEG, and write them to the image's storage.
+
+    Returns the PropertyImage fields describing the result: the upright
+    original's `width` and `height`, its `blurhash` placeholder, its
+    perceptual hash and the `variants` map of each size name to its
+    dimensions and storage names.
+    """
+    sizes = getattr(settings, 'PROPERTY_IMAGE_VARIANTS', DEFAULT_IMAGE_VARIANTS)
+    storage = field_file.storage
+    # Variants are not content addressed; see ContentAddressedStorage
+    save = getattr(storage, 'save_derived', storage.save)
+
+    with field_file.open('rb') as source:
+        with Image.open(source) as original:
+            # Apply the EXIF orientation before the metadata is dropped
+            upright = ImageOps.exif_transpose(original).convert('RGB')
+
+    variants = {}
+    previous = None
+    for name, longest_side in sorted(sizes.items(), key=lambda item: item[1]):
+        resized = upright.copy()
+        resized.thumbnail((longest_side, longest_side), Image.LANCZOS)
+        if previous is not None and resized.size == (previous['width'], previous['height']):
+            # The original is smaller than this size; reuse the smaller
+            # variant rather than storing the same pixels twice
+            variants[name] = previous
+            continue
+
+        variant = {'width': resized.width, 'height': resized.height}
+        for extension in VARIANT_FORMATS:
+            path = variant_path(field_file.name, name, extension)
+            variant[extension] = save(path, ContentFile(_encode(resized, extension)))
+        variants[name] = previous = variant
+
+    return {
+        'width': upright.width,
+        'height': upright.height,
+        'blurhash': encode_blurhash(upright),
+        **image_dhash(upright),
+        'variants': variants,
+    }
+
+
+def image_dhash(image):
+    """
+    The `dhash` and `dhash_bands` fields of a decoded image.
+    """
+    value = dhash(image)
+    return {'dhash': to_signed(value), 'dhash_bands': hash_bands(value)}
+
+
+def image_hashes(storage, name):
+    """
+    BlurHash placeholder and perceptual hash fields of a stored image,
+    decoding as little of it as possible.
+    """
+    with storage.open(name, 'rb') as source:
+        with Image.open(source) as image:
+            # JPEGs are scaled down by the decoder itself, which is most of
+            # the cost of hashing a large photo
+            image.draft('RGB', (SAMPLE_SIZE * 4, SAMPLE_SIZE * 4))
+            upright = ImageOps.exif_transpose(image)
+            return {'blurhash': encode_blurhash(upright), **image_dhash(upright)}
+
+
+def variant_files(variants):
+    """
+    Storage names of every file referenced by a variant map.
+    """
+    return {
+        variant[extension]
+        for variant in variants.values()
+        for extension in VARIANT_FORMATS
+        if variant.get(extension)
+    }
+
+
+def variant_urls(storage, variants, request=None):
+    """
+    The srcset-ready form of a variant map: per size the URLs and
+    dimensions, plus one `srcset` string per format.
+    """
+    def url(name):
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request else url
+
+    sizes = {
+        name: {
+            'width': variant['width'],
+            'height': variant['height'],
+            **{extension: url(variant[extension]) for extension in VARIANT_FORMATS},
+        }
+        for name, variant in variants.items()
+    }
+    # Sizes sharing a reused variant appear once in the srcset
+    by_width = sorted({size['width']: size for size in sizes.values()}.values(), key=lambda size: size['width'])
+    srcset = {
+        extension: ", ".join(f"{size[extension]} {size['width']}w" for size in by_width)
+        for extension in VARIANT_FORMATS
+    }
+    return {'sizes': sizes, 'srcset': srcset}
@@ -0,0 +1,72 @@
+from concurrent.futures import ProcessPoolExecutor
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+import os
+import time
+
+from properties.images import image_hashes
+from properties.models import PropertyImage
+from properties.search_index import refresh_search_index
+from properties.similarity import flag_similar_images
+
+
+def _hash_image(name):
+    storage = PropertyImage._meta.get_field('image').storage
+    try:
+        return image_hashes(storage, name), None
+    except (OSError, SyntaxError, ValueError) as e:
+        return None, str(e)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compute the BlurHash placeholder and perceptual hash of every "
+        "PropertyImage missing them, and flag near-duplicate photos. Images "
+        "are decoded in parallel worker processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Images hashed and saved per batch")
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Worker processes decoding images")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        pending = PropertyImage.objects.filter(
+            Q(blurhash='') | Q(dhash__isnull=True),
+        ).exclude(image='').order_by('pk')
+
+        done = failed = flagged = 0
+        last_pk = 0
+        started = time.monotonic()
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                batch = list(
+                    pending.filter(pk__gt=last_pk).select_related('property').only('id', 'image', 'property__listed_by')[:batch_size]
+                )
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+
+                hashed = []
+                results = executor.map(_hash_image, [image.image.name for image in batch], chunksize=16)
+                for image, (hashes, error) in zip(batch, results):
+                    if error:
+                        failed += 1
+                        self.stderr.write(f"PropertyImage {image.pk}: {error}")
+                        continue
+                    for field, value in hashes.items():
+                        setattr(image, field, value)
+                    hashed.append(image)
+                PropertyImage.objects.bulk_update(hashed, ['blurhash', 'dhash', 'dhash_bands'])
+                refresh_search_index({image.property_id for image in hashed})
+                for image in hashed:
+                    flagged += len(flag_similar_images(image))
+
+                done += len(hashed)
+                elapsed = time.monotonic() - started
+                self.stdout.write(f"{done} images hashed ({done / elapsed:.1f} images/s)")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Hashed {done} images in {time.monotonic() - started:.1f}s, {failed} could not be read, "
+            f"{flagged} near-duplicate matches flagged"
+        ))
@@ -0,0 +1,273 @@
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from itertools import islice
+from pathlib import Path
+import csv
+import json
+import os
+import time
+
+from accounts.models import StakeholderAccount, User
+from properties.blobs import acquire_blob, blob_digest
+from properties.geo import make_point
+from properties.price_history import price_change
+from properties.search_index import queue_search_index_refresh
+from properties.models import (
+    Property, HomeProperty, ApartmentProperty, HomePropertyBedroom, PropertyImage, PriceChange, ImageBlob,
+)
+from properties.tasks import detect_duplicate_listings, generate_image_variants, schedule_address_geocoding
+from properties.tiles import invalidate_tiles
+
+
+LISTING_MODELS = {
+    'home': HomeProperty,
+    'apartment': ApartmentProperty,
+}
+
+# Row keys that are not plain model fields
+SPECIAL_KEYS = {'property_type', 'latitude', 'longitude', 'listed_by', 'bedrooms', 'images'}
+
+
+class RowError(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Import HomeProperty/ApartmentProperty listings, with their bedrooms and "
+        "images, from a CSV or JSONL file. Rows are streamed and written in "
+        "batches; progress is checkpointed so an interrupted import can resume."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or JSONL file with one listing per row")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="Input format (defaults to the file extension)")
+        parser.add_argument('--batch-size', type=int, default=500, help="Rows written per transaction")
+        parser.add_argument('--listed-by', help="Email of the stakeholder used for rows without `listed_by`")
+        parser.add_argument('--images-root', default='.', help="Directory image paths are relative to")
+        parser.add_argument('--state-file', help="Checkpoint file (defaults to <path>.import-state)")
+        parser.add_argument('--resume', action='store_true', help="Skip the rows a previous run already imported")
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f"{path} does not exist")
+        input_format = options['format'] or ('jsonl' if path.suffix in ('.jsonl', '.ndjson') else 'csv')
+        batch_size = options['batch_size']
+        self.images_root = Path(options['images_root'])
+        self.default_listed_by = options['listed_by']
+        state_file = Path(options['state_file'] or f"{path}.import-state")
+
+        done = 0
+        if options['resume'] and state_file.exists():
+            done = json.loads(state_file.read_text())['rows']
+            self.stdout.write(f"Resuming after row {done}")
+
+        imported = skipped = 0
+        started = time.monotonic()
+        with path.open(newline='', encoding='utf-8') as handle:
+            rows = islice(self.read_rows(handle, input_format), done, None)
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                listings = []
+                for line_number, raw in batch:
+                    try:
+                        listings.append(self.build_listing(self.parse_row(raw, input_format)))
+                    except (RowError, ValidationError, ValueError, TypeError) as e:
+                        skipped += 1
+                        self.stderr.write(f"Row {line_number}: {e}")
+                try:
+                    written = self.write_batch(listings)
+                except Exception as e:
+                    raise CommandError(
+                        f"Import failed in the batch after row {done}: {e}. "
+                        f"Fix the input and re-run with --resume."
+                    ) from e
+
+                done += len(batch)
+                imported += written
+                self.save_state(state_file, done)
+                elapsed = time.monotonic() - started
+                self.stdout.write(f"{done} rows processed, {imported} imported ({imported / elapsed:.1f} rows/s)")
+
+        if state_file.exists():
+            state_file.unlink()
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {imported} listings in {elapsed:.1f}s, skipped {skipped} invalid rows"
+        ))
+
+    def read_rows(self, handle, input_format):
+        """
+        Yield `(line_number, raw row)` one row at a time. Rows are decoded
+        by parse_row(), so a malformed one only skips that row.
+        """
+        if input_format == 'jsonl':
+            for line_number, line in enumerate(handle, start=1):
+                if line.strip():
+                    yield line_number, line
+        else:
+            # The header is line 1
+            yield from enumerate(csv.DictReader(handle), start=2)
+
+    def parse_row(self, raw, input_format):
+        """
+        Decode a raw JSONL line or CSV row into a row dict.
+        """
+        if input_format == 'jsonl':
+            row = json.loads(raw)
+            if not isinstance(row, dict):
+                raise RowError("each line must be a JSON object")
+            return row
+        row = dict(raw)
+        row['bedrooms'] = json.loads(row['bedrooms']) if row.get('bedrooms') else []
+        row['images'] = [image for image in (row.get('images') or '').split('|') if image]
+        return row
+
+    def build_listing(self, row):
+        """
+        Validate one row and build its unsaved objects.
+        """
+        model = LISTING_MODELS.get(row.get('property_type'))
+        if model is None:
+            raise RowError(f"property_type must be one of {', '.join(LISTING_MODELS)}")
+
+        field_names = {
+            field.name for field in model._meta.concrete_fields
+            if field.editable and not field.is_relation
+        }
+        values = {
+            key: value for key, value in row.items()
+            if key in field_names and key not in SPECIAL_KEYS and value not in ('', None)
+        }
+        listing = model(**values)
+        listing.property_type = row['property_type']
+        if row.get('latitude') in ('', None) or row.get('longitude') in ('', None):
+            raise RowError("latitude and longitude are required")
+        listing.location = make_point(row['latitude'], row['longitude'])
+        listing.listed_by_email = User.objects.normalize_email(row.get('listed_by') or self.default_listed_by)
+        if not listing.listed_by_email:
+            raise RowError("listed_by is required (or pass --listed-by)")
+        listing.address_pending = not listing.address
+        listing.full_clean(exclude=['listed_by'], validate_unique=False, validate_constraints=False)
+
+        bedrooms = []
+        for bedroom_values in row.get('bedrooms') or []:
+            bedroom = HomePropertyBedroom(**bedroom_values)
+            bedroom.full_clean(exclude=['home_property'])
+            bedrooms.append(bedroom)
+        if bedrooms and model is not HomeProperty:
+            raise RowError("only home listings can have bedrooms")
+
+        images = []
+        for position, image_path in enumerate(row.get('images') or []):
+            source = self.images_root / image_path
+            if not source.is_file():
+                raise RowError(f"image {source} does not exist")
+            images.append((source, position == 0))
+
+        return listing, bedrooms, images
+
+    def write_batch(self, listings):
+        """
+        Write a batch of listings and their children in one transaction,
+        with one multi-row INSERT per table. Returns the number of listings
+        written, which leaves out those without a stakeholder account.
+        """
+        emails = {listing.listed_by_email for listing, _, _ in listings}
+        stakeholders = {
+            stakeholder.user.email: stakeholder
+            for stakeholder in StakeholderAccount.objects.select_related('user').filter(user__email__in=emails)
+        }
+        valid = []
+        for listing, bedrooms, images in listings:
+            stakeholder = stakeholders.get(listing.listed_by_email)
+            if stakeholder is None:
+                self.stderr.write(f"No stakeholder account for {listing.listed_by_email}, skipping listing")
+                continue
+            listing.listed_by = stakeholder
+            valid.append((listing, bedrooms, images))
+        if not valid:
+            return 0
+
+        saved_images = []
+        try:
+            self.insert_listings(valid, saved_images)
+        except Exception:
+            self.remove_orphaned_images(saved_images)
+            raise
+        return len(valid)
+
+    def insert_listings(self, valid, saved_images):
+        """
+        Insert listings whose stakeholder was found, appending the name of
+        every image file written to `saved_images`.
+        """
+        with transaction.atomic():
+            # bulk_create() refuses multi-table inherited models, so insert
+            # the shared Property rows first and then each child table.
+            parent_fields = Property._meta.concrete_fields
+            parents = Property.objects.bulk_create([
+                Property(**{field.attname: getattr(listing, field.attname) for field in parent_fields})
+                for listing, _, _ in valid
+            ])
+            for (listing, _, _), parent in zip(valid, parents):
+                listing.created_at, listing.updated_at = parent.created_at, parent.updated_at
+            for model in LISTING_MODELS.values():
+                children = [listing for listing, _, _ in valid if isinstance(listing, model)]
+                for child in children:
+                    child.property_ptr_id = child.id
+                if children:
+                    model._base_manager._insert(children, fields=model._meta.local_concrete_fields)
+
+            PriceChange.objects.bulk_create([price_change(listing) for listing, _, _ in valid])
+
+            HomePropertyBedroom.objects.bulk_create([
+                HomePropertyBedroom(home_property_id=listing.id, **{
+                    field.attname: getattr(bedroom, field.attname)
+                    for field in HomePropertyBedroom._meta.concrete_fields
+                    if not field.primary_key and field.name != 'home_property'
+                })
+                for listing, bedrooms, _ in valid for bedroom in bedrooms
+            ])
+
+            property_images = []
+            for listing, _, images in valid:
+                for source, is_primary in images:
+                    image = PropertyImage(property=listing, is_primary=is_primary)
+                    with source.open('rb') as image_file:
+                        image.image.save(os.path.basename(source), File(image_file), save=False)
+                        saved_images.append(image.image.name)
+                        acquire_blob(image.image.storage, image.image.name, File(image_file))
+                    property_images.append(image)
+            PropertyImage.objects.bulk_create(property_images)
+
+            # bulk inserts skip Property.save() and its signals, so do their
+            # follow-up work here
+            queue_search_index_refresh(*(listing.pk for listing, _, _ in valid))
+            transaction.on_commit(schedule_address_geocoding)
+            transaction.on_commit(lambda: detect_duplicate_listings.delay([str(listing.pk) for listing, _, _ in valid]))
+            for image in property_images:
+                transaction.on_commit(lambda image_id=image.pk: generate_image_variants.delay(image_id))
+            transaction.on_commit(lambda: invalidate_tiles(*(listing.location for listing, _, _ in valid)))
+
+    def remove_orphaned_images(self, names):
+        """
+        Delete image files written by a batch that rolled back, unless an
+        image outside the batch already uses the same blob. An upload that
+        finds one of them gone meanwhile writes it again in acquire_blob().
+        """
+        storage = PropertyImage._meta.get_field('image').storage
+        kept = set(ImageBlob.objects.filter(pk__in=filter(None, map(blob_digest, names))).values_list('pk', flat=True))
+        for name in set(names):
+            if blob_digest(name) not in kept:
+                storage.delete(name)
+
+    def save_state(self, state_file, rows):
+        temporary = state_file.with_suffix('.tmp')
+        temporary.write_text(json.dumps({'rows': rows}))
+        os.replace(temporary, state_file)
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.14 on 2026-10-18 06:50
+
+import django.contrib.gis.db.models.fields
+import django.contrib.gis.db.models.functions
+import django.contrib.postgres.indexes
+import django.db.models.functions.comparison
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('properties', '0002_alter_propertyimage_image'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='property',
+            index=django.contrib.postgres.indexes.GistIndex(django.contrib.gis.db.models.functions.Transform(django.db.models.functions.comparison.Cast('location', django.contrib.gis.db.models.fields.GeometryField(srid=4326)), 3857), name='property_location_3857_gist'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-18 06:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('properties', '0003_property_location_3857_gist'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='address_pending',
+            field=models.BooleanField(default=False, editable=False, help_text='Set while the address is waiting to be reverse geocoded'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('address_pending', True)), fields=['updated_at'], name='property_address_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,119 @@
+# Generated by Django 5.0.14 on 2026-10-18 06:57
+
+import django.contrib.gis.db.models.fields
+import django.contrib.gis.db.models.functions
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+import django.db.models.functions.comparison
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_search_index(apps, schema_editor):
+    """
+    Index the existing properties, so listing and search keep returning
+    them right after the migration. Computed from the models as they are
+    at this migration; later migrations refresh the columns they add.
+    """
+    Property = apps.get_model('properties', 'Property')
+    PropertySearchIndex = apps.get_model('properties', 'PropertySearchIndex')
+    BannedProperty = apps.get_model('properties', 'BannedProperty')
+    VerifiedProperty = apps.get_model('properties', 'VerifiedProperty')
+    HomePropertyBedroom = apps.get_model('properties', 'HomePropertyBedroom')
+    PropertyImage = apps.get_model('properties', 'PropertyImage')
+
+    bedrooms = HomePropertyBedroom.objects.filter(
+        home_property=models.OuterRef('pk'),
+    ).order_by().values('home_property').annotate(count=models.Count('pk')).values('count')
+    primary_image = PropertyImage.objects.filter(property=models.OuterRef('pk')).order_by('-is_primary', 'pk')
+    properties = Property.objects.annotate(
+        index_price=Coalesce('homeproperty__price', 'apartmentproperty__price'),
+        index_list_type=models.F('homeproperty__list_type'),
+        index_home_type=models.F('homeproperty__home_type'),
+        index_apartment_type=models.F('apartmentproperty__apartment_type'),
+        index_architectural_style=models.F('homeproperty__architectural_style'),
+        index_bedroom_count=Coalesce(models.Subquery(bedrooms), 0),
+        index_is_banned=models.Exists(BannedProperty.objects.filter(property=models.OuterRef('pk'))),
+        index_is_verified=models.Exists(VerifiedProperty.objects.filter(property=models.OuterRef('pk'))),
+        index_primary_image=Coalesce(
+            models.Subquery(primary_image.values('image')[:1]), models.Value(''), output_field=models.CharField(),
+        ),
+    ).order_by('pk')
+
+    batch = []
+    for prop in properties.iterator(chunk_size=1000):
+        batch.append(PropertySearchIndex(
+            property_id=prop.pk,
+            location=prop.location,
+            address=prop.address,
+            description=prop.description,
+            property_type=prop.property_type,
+            price=prop.index_price,
+            list_type=prop.index_list_type,
+            home_type=prop.index_home_type,
+            apartment_type=prop.index_apartment_type,
+            architectural_style=prop.index_architectural_style,
+            bedroom_count=prop.index_bedroom_count,
+            is_verified=prop.index_is_verified,
+            is_banned=prop.index_is_banned,
+            is_active=prop.is_active,
+            is_deleted=prop.is_deleted,
+            primary_image=prop.index_primary_image,
+            created_at=prop.created_at,
+            updated_at=prop.updated_at,
+        ))
+        if len(batch) == 1000:
+            PropertySearchIndex.objects.bulk_create(batch)
+            batch = []
+    PropertySearchIndex.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0004_property_address_pending'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertySearchIndex',
+            fields=[
+                ('property', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_index', serialize=False, to='properties.property')),
+                ('location', django.contrib.gis.db.models.fields.PointField(geography=True, srid=4326)),
+                ('address', models.TextField(blank=True)),
+                ('description', models.TextField(blank=True)),
+                ('property_type', models.CharField(blank=True, max_length=50, null=True)),
+                ('price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('list_type', models.CharField(blank=True, max_length=10, null=True)),
+                ('home_type', models.CharField(blank=True, max_length=50, null=True)),
+                ('apartment_type', models.CharField(blank=True, max_length=50, null=True)),
+                ('architectural_style', models.CharField(blank=True, max_length=50, null=True)),
+                ('bedroom_count', models.IntegerField(default=0)),
+                ('is_verified', models.BooleanField(default=False)),
+                ('is_banned', models.BooleanField(default=False)),
+                ('is_active', models.BooleanField(default=True)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('primary_image', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Property Search Index',
+                'verbose_name_plural': 'Property Search Index',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='property',
+            name='property_location_3857_gist',
+        ),
+        migrations.AddIndex(
+            model_name='propertysearchindex',
+            index=django.contrib.postgres.indexes.GistIndex(django.contrib.gis.db.models.functions.Transform(django.db.models.functions.comparison.Cast('location', django.contrib.gis.db.models.fields.GeometryField(srid=4326)), 3857), name='search_location_3857_gist'),
+        ),
+        migrations.AddIndex(
+            model_name='propertysearchindex',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_banned', False), ('is_deleted', False)), fields=['-created_at'], name='search_listed_created_idx'),
+        ),
+        migrations.RunPython(fill_search_index, migrations.RunPython.noop),
+    ]
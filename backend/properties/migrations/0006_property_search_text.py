@@ -0,0 +1,34 @@
+# Generated by Django 5.0.14 on 2026-10-18 06:59
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.operations
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0005_property_search_index'),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.TrigramExtension(),
+        migrations.AddField(
+            model_name='propertysearchindex',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('address', config='english', weight='A'), '||', django.contrib.postgres.search.SearchVector('description', config='english', weight='B'), django.contrib.postgres.search.SearchConfig('english')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='propertysearchindex',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_banned', False), ('is_deleted', False)), fields=['price'], name='search_listed_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propertysearchindex',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='search_vector_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='propertysearchindex',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['address'], name='search_address_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
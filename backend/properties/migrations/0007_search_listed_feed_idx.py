@@ -0,0 +1,21 @@
+# Generated by Django 5.0.14 on 2026-10-18 07:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0006_property_search_text'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='propertysearchindex',
+            name='search_listed_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='propertysearchindex',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_banned', False), ('is_deleted', False)), fields=['-created_at', '-property'], name='search_listed_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.14 on 2026-10-18 07:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0007_search_listed_feed_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='propertyimage',
+            name='height',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='propertyimage',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Resized WebP/JPEG copies generated by the image worker'),
+        ),
+        migrations.AddField(
+            model_name='propertyimage',
+            name='variants_source',
+            field=models.CharField(blank=True, editable=False, help_text='Image the variants were generated from', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='propertyimage',
+            name='width',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='propertysearchindex',
+            name='primary_image_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-18 07:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0008_property_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='propertyimage',
+            name='blurhash',
+            field=models.CharField(blank=True, editable=False, help_text='BlurHash placeholder painted before the image loads', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='propertysearchindex',
+            name='primary_image_blurhash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
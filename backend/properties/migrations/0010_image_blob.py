@@ -0,0 +1,38 @@
+# Generated by Django 5.0.14 on 2026-10-18 07:05
+
+import utilities.helpers
+import utilities.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0009_property_image_blurhash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='propertyimage',
+            name='image',
+            field=models.ImageField(storage=utilities.storage.ContentAddressedStorage(), upload_to=utilities.helpers.property_image_upload_handler),
+        ),
+        migrations.CreateModel(
+            name='ImageBlob',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255)),
+                ('size', models.BigIntegerField(default=0)),
+                ('ref_count', models.IntegerField(default=0)),
+                ('derived_files', models.JSONField(blank=True, default=list, help_text='Files generated from this blob, removed with it')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('unreferenced_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Image Blob',
+                'verbose_name_plural': 'Image Blobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(condition=models.Q(('ref_count__lte', 0)), fields=['unreferenced_at'], name='imageblob_unreferenced_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.0.14 on 2026-10-18 07:07
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0010_image_blob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarImageFlag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('distance', models.IntegerField(help_text='Differing bits between the two perceptual hashes')),
+                ('is_reviewed', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Similar Image Flag',
+                'verbose_name_plural': 'Similar Image Flags',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='propertyimage',
+            name='dhash',
+            field=models.BigIntegerField(blank=True, editable=False, help_text='Perceptual difference hash used to find near-duplicate photos', null=True),
+        ),
+        migrations.AddField(
+            model_name='propertyimage',
+            name='dhash_bands',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddIndex(
+            model_name='propertyimage',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['dhash_bands'], name='propertyimage_dhash_bands_gin'),
+        ),
+        migrations.AddField(
+            model_name='similarimageflag',
+            name='image',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similarity_flags', to='properties.propertyimage'),
+        ),
+        migrations.AddField(
+            model_name='similarimageflag',
+            name='similar_image',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='properties.propertyimage'),
+        ),
+        migrations.AddConstraint(
+            model_name='similarimageflag',
+            constraint=models.UniqueConstraint(fields=('image', 'similar_image'), name='unique_similar_image_flag'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.0.14 on 2026-10-18 07:09
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_user_date_joined_id_idx'),
+        ('properties', '0011_image_similarity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DuplicateCandidate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('similarity', models.FloatField(help_text='Estimated Jaccard similarity of the two descriptions')),
+                ('distance', models.FloatField(help_text='Distance between the two listings in metres')),
+                ('is_reviewed', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Duplicate Candidate',
+                'verbose_name_plural': 'Duplicate Candidates',
+                'ordering': ['-similarity', 'distance'],
+            },
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='description_bands',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='description_minhash',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['description_bands'], name='property_description_bands_gin'),
+        ),
+        migrations.AddField(
+            model_name='duplicatecandidate',
+            name='duplicate_of',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='properties.property'),
+        ),
+        migrations.AddField(
+            model_name='duplicatecandidate',
+            name='property',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='duplicate_candidates', to='properties.property'),
+        ),
+        migrations.AddConstraint(
+            model_name='duplicatecandidate',
+            constraint=models.UniqueConstraint(fields=('property', 'duplicate_of'), name='unique_duplicate_candidate'),
+        ),
+    ]
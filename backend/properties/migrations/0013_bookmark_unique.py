@@ -0,0 +1,35 @@
+# Generated by Django 5.0.14 on 2026-10-18 07:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0012_duplicate_listings'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Keep the earliest bookmark of each (user, property) pair so the
+        # unique constraint can be created
+        migrations.RunSQL(
+            """
+            DELETE FROM properties_bookmarkedproperty AS duplicate
+            USING properties_bookmarkedproperty AS kept
+            WHERE duplicate.user_id = kept.user_id
+              AND duplicate.property_id = kept.property_id
+              AND (duplicate.created_at, duplicate.id) > (kept.created_at, kept.id)
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='bookmarkedproperty',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='bookmark_user_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='bookmarkedproperty',
+            constraint=models.UniqueConstraint(fields=('user', 'property'), name='unique_bookmarked_property'),
+        ),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 5.0.14 on 2026-10-18 07:14
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+from properties.geo import geohash
+
+
+def record_current_prices(apps, schema_editor):
+    """
+    Start the history of existing listings with their current price, as
+    of when they were listed.
+    """
+    PriceChange = apps.get_model('properties', 'PriceChange')
+    precision = getattr(settings, 'PRICE_HISTORY_AREA_PRECISION', 5)
+    for model_name, extra_fields in (('HomeProperty', ['list_type']), ('ApartmentProperty', [])):
+        model = apps.get_model('properties', model_name)
+        listings = model.objects.only('pk', 'price', 'property_type', 'location', 'created_at', *extra_fields)
+        batch = []
+        for listing in listings.iterator(chunk_size=2000):
+            batch.append(PriceChange(
+                property_id=listing.pk,
+                price=listing.price,
+                property_type=listing.property_type or model_name.replace('Property', '').lower(),
+                list_type=getattr(listing, 'list_type', '') or '',
+                area=geohash(listing.location.y, listing.location.x, precision),
+                recorded_at=listing.created_at,
+            ))
+            if len(batch) == 2000:
+                PriceChange.objects.bulk_create(batch)
+                batch = []
+        PriceChange.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0013_bookmark_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceStatistic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('area', models.CharField(max_length=12)),
+                ('property_type', models.CharField(max_length=50)),
+                ('list_type', models.CharField(blank=True, default='', max_length=10)),
+                ('month', models.DateField()),
+                ('count', models.PositiveIntegerField()),
+                ('min_price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('p25_price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('median_price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('p75_price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('max_price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Price Statistic',
+                'verbose_name_plural': 'Price Statistics',
+                'ordering': ['area', 'property_type', 'list_type', 'month'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PriceChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('previous_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('property_type', models.CharField(max_length=50)),
+                ('list_type', models.CharField(blank=True, default='', max_length=10)),
+                ('area', models.CharField(help_text="Geohash of the listing's location when the price was set", max_length=12)),
+                ('recorded_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_changes', to='properties.property')),
+            ],
+            options={
+                'verbose_name': 'Price Change',
+                'verbose_name_plural': 'Price Changes',
+                'ordering': ['-recorded_at'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='pricestatistic',
+            constraint=models.UniqueConstraint(fields=('area', 'property_type', 'list_type', 'month'), name='unique_price_statistic'),
+        ),
+        migrations.AddIndex(
+            model_name='pricechange',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['recorded_at'], name='pricechange_recorded_brin'),
+        ),
+        migrations.AddIndex(
+            model_name='pricechange',
+            index=models.Index(fields=['property', '-recorded_at'], name='pricechange_property_idx'),
+        ),
+        migrations.RunPython(record_current_prices, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.0.14 on 2026-10-18 07:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0014_price_history'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='property',
+            name='property_address_pending_idx',
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='geocode_retry_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When a failed reverse geocoding is retried', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(models.OrderBy(models.F('geocode_retry_at'), nulls_first=True), models.F('updated_at'), condition=models.Q(('address_pending', True)), name='property_address_pending_idx'),
+        ),
+    ]
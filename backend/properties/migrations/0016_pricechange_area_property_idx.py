@@ -0,0 +1,17 @@
+# Generated by Django 5.0.14 on 2026-10-18 07:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0015_property_geocode_retry'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pricechange',
+            index=models.Index(fields=['area', 'property'], name='pricechange_area_property_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.14 on 2026-10-18 07:30
+
+from django.db import migrations, models
+from django.db.models.functions import Now
+
+
+def mark_checked_properties(apps, schema_editor):
+    """
+    Properties with a signature have already been checked.
+    """
+    Property = apps.get_model('properties', 'Property')
+    Property.objects.exclude(description_minhash=[]).update(duplicates_checked_at=Now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_user_email_upper_unique'),
+        ('properties', '0016_pricechange_area_property_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='duplicates_checked_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When the description signature was last computed', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('duplicates_checked_at__isnull', True)), fields=['id'], name='property_unchecked_dupes_idx'),
+        ),
+        migrations.RunPython(mark_checked_properties, migrations.RunPython.noop),
+    ]
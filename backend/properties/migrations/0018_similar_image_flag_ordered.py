@@ -0,0 +1,38 @@
+# Generated by Django 5.0.14 on 2026-10-18 07:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0017_property_duplicates_checked_at'),
+    ]
+
+    operations = [
+        # Drop the second copy of pairs flagged both ways, keeping the
+        # reviewed one if any, then store the rest newer image first
+        migrations.RunSQL(
+            """
+            DELETE FROM properties_similarimageflag flag
+            USING properties_similarimageflag other
+            WHERE flag.image_id < flag.similar_image_id
+              AND other.image_id = flag.similar_image_id
+              AND other.similar_image_id = flag.image_id
+              AND (other.is_reviewed OR NOT flag.is_reviewed);
+            DELETE FROM properties_similarimageflag flag
+            USING properties_similarimageflag other
+            WHERE flag.image_id > flag.similar_image_id
+              AND other.image_id = flag.similar_image_id
+              AND other.similar_image_id = flag.image_id;
+            UPDATE properties_similarimageflag
+            SET image_id = similar_image_id, similar_image_id = image_id
+            WHERE image_id < similar_image_id;
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name='similarimageflag',
+            constraint=models.CheckConstraint(check=models.Q(('image__gt', models.F('similar_image'))), name='similar_image_flag_ordered'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.0.14 on 2026-10-18 07:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from properties.price_history import update_price_statistics
+
+
+def record_delistings(apps, schema_editor):
+    """
+    Close the price history of listings that are not shown publicly with a
+    delisting, as of their last update since when it happened is unknown.
+    Then compute the statistics of every month the price history covers,
+    including the history 0014 backfilled, which the hourly rollup only
+    looking at recent changes never reaches.
+    """
+    Property = apps.get_model('properties', 'Property')
+    BannedProperty = apps.get_model('properties', 'BannedProperty')
+    PriceChange = apps.get_model('properties', 'PriceChange')
+    unlisted = Property.objects.filter(
+        models.Q(is_active=False) | models.Q(is_deleted=True)
+        | models.Exists(BannedProperty.objects.filter(property=models.OuterRef('pk'))),
+    )
+    latest = PriceChange.objects.filter(property_id__in=unlisted.values('pk')).annotate(
+        property_updated_at=models.Subquery(Property.objects.filter(pk=models.OuterRef('property_id')).values('updated_at')),
+    ).order_by('property_id', '-recorded_at', '-pk').distinct('property_id')
+    batch = []
+    for change in latest.iterator(chunk_size=2000):
+        batch.append(PriceChange(
+            property_id=change.property_id,
+            price=change.price,
+            previous_price=change.price,
+            property_type=change.property_type,
+            list_type=change.list_type,
+            area=change.area,
+            recorded_at=max(change.recorded_at, change.property_updated_at),
+            is_listed=False,
+        ))
+        if len(batch) == 2000:
+            PriceChange.objects.bulk_create(batch)
+            batch = []
+    PriceChange.objects.bulk_create(batch)
+    update_price_statistics(change_model=PriceChange, statistic_model=apps.get_model('properties', 'PriceStatistic'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0018_similar_image_flag_ordered'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pricechange',
+            name='is_listed',
+            field=models.BooleanField(default=True, help_text='False from when the listing stopped being shown publicly'),
+        ),
+        migrations.AlterField(
+            model_name='pricechange',
+            name='property',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='price_changes', to='properties.property'),
+        ),
+        migrations.RunPython(record_delistings, migrations.RunPython.noop),
+    ]
@@ -1,14 +1,23 @@
 from django.db import models
 import uuid
 from django.contrib.gis.db.models import PointField
+from django.contrib.gis.db.models.functions import Distance
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import BrinIndex, GinIndex, GistIndex
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVector, SearchVectorField, TrigramWordSimilarity,
+)
+from django.contrib.gis.measure import D
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth import get_user_model
 from accounts.models import StakeholderAccount
-import googlemaps
-from django.conf import settings
 import logging
 
 from utilities.helpers import property_image_upload_handler
+from utilities.storage import ContentAddressedStorage
+from .geo import KNNDistance, mercator_location
 
 
 logger = logging.getLogger("django")
@@ -16,10 +25,133 @@ logger = logging.getLogger("django")
 
 User = get_user_model()
 
+# Text search configuration of the search index
+SEARCH_CONFIG = 'english'
+
 LEVEL_CHOICES = [
     ("ground", "Ground"),
 ]
 
+class PropertySearchMixin:
+    """
+    Search helpers shared by querysets exposing `location`, `price`,
+    `list_type` and `property_type`.
+    """
+    def apply_filters(self, filters):
+        """
+        Apply the public search filters (price range, listing type and
+        property type). Expects `with_price()` to have been applied.
+        """
+        queryset = self
+        if filters.get('min_price') is not None:
+            queryset = queryset.filter(price__gte=filters['min_price'])
+        if filters.get('max_price') is not None:
+            queryset = queryset.filter(price__lte=filters['max_price'])
+        if filters.get('list_type'):
+            queryset = queryset.filter(list_type=filters['list_type'])
+        if filters.get('property_type'):
+            queryset = queryset.filter(property_type=filters['property_type'])
+        return queryset
+
+    def nearest(self, point, radius_km=None):
+        """
+        Order by distance to `point` (nearest first), optionally limited to
+        `radius_km`. Both the radius filter (ST_DWithin) and the ordering
+        (the `<->` operator) are served by the GiST index on `location`.
+        """
+        queryset = self
+        if radius_km is not None:
+            queryset = queryset.filter(location__dwithin=(point, D(km=radius_km)))
+        return queryset.annotate(
+            distance=Distance('location', point),
+        ).order_by(KNNDistance('location', point), 'pk')
+
+
+class PropertyQuerySet(PropertySearchMixin, models.QuerySet):
+    def listed(self):
+        """
+        Restrict to properties that can be shown publicly.
+        """
+        banned = BannedProperty.objects.filter(property=models.OuterRef('pk'))
+        return self.filter(is_active=True, is_deleted=False).filter(~models.Exists(banned))
+
+    def with_price(self):
+        """
+        Annotate the price and listing type stored on the concrete child table.
+        """
+        return self.annotate(
+            price=Coalesce('homeproperty__price', 'apartmentproperty__price'),
+            list_type=models.F('homeproperty__list_type'),
+        )
+
+    def with_status(self):
+        """
+        Annotate ban and verification status and the bedroom count, and
+        join the verification and its verifier, in the same query. The
+        annotations are named so they do not shadow the model methods,
+        which read them instead of querying per row.
+        """
+        verification = VerifiedProperty.objects.filter(property=models.OuterRef('pk'))
+        bedrooms = HomePropertyBedroom.objects.filter(
+            home_property=models.OuterRef('pk'),
+        ).order_by().values('home_property').annotate(count=models.Count('pk')).values('count')
+        return self.annotate(
+            banned_flag=models.Exists(BannedProperty.objects.filter(property=models.OuterRef('pk'))),
+            verified_flag=models.Exists(verification),
+            bedroom_count=Coalesce(models.Subquery(bedrooms), 0),
+        ).select_related('verified__verified_by')
+
+
+class PropertySearchIndexQuerySet(PropertySearchMixin, models.QuerySet):
+    def listed(self):
+        """
+        Restrict to properties that can be shown publicly.
+        """
+        return self.filter(is_active=True, is_deleted=False, is_banned=False)
+
+    @staticmethod
+    def filter_conditions(filters):
+        """
+        The condition of each active search filter, keyed by the facet it
+        belongs to, so facet counts can leave out their own filter.
+        """
+        conditions = {}
+        price = models.Q()
+        if filters.get('min_price') is not None:
+            price &= models.Q(price__gte=filters['min_price'])
+        if filters.get('max_price') is not None:
+            price &= models.Q(price__lte=filters['max_price'])
+        if price:
+            conditions['price'] = price
+        for name in ('property_type', 'list_type', 'home_type', 'apartment_type', 'architectural_style'):
+            if filters.get(name):
+                conditions[name] = models.Q(**{name: filters[name]})
+        if filters.get('verified_only'):
+            conditions['verified'] = models.Q(is_verified=True)
+        return conditions
+
+    def apply_filters(self, filters):
+        """
+        Apply the public search filters, including the home/apartment
+        specific ones only the search index has.
+        """
+        return self.filter(*self.filter_conditions(filters).values())
+
+    def search(self, text):
+        """
+        Full-text search over address and description, plus typo tolerant
+        trigram matching of the address, annotated with a `rank`.
+        The tsvector match uses the GIN index on `search_vector` and the
+        trigram match the `gin_trgm_ops` index on `address`.
+        """
+        query = SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+        return self.filter(
+            models.Q(search_vector=query) | models.Q(address__trigram_word_similar=text),
+        ).annotate(
+            rank=SearchRank(models.F('search_vector'), query) + TrigramWordSimilarity(text, 'address'),
+        )
+
+
 # id, address, location, description, special_tags, is_active, is_deleted, last_checked, created_at, updated_at, listed_by_id, listed_by_user_id, verified_id, verified_user_id
 class Property(models.Model):
     """
@@ -44,11 +176,30 @@ class Property(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     listed_by = models.ForeignKey(StakeholderAccount, related_name="properties", on_delete=models.CASCADE)
     property_type = models.CharField(max_length=50, blank=True, null=True, choices=PROPERTY_TYPE_CHOICES)
+    address_pending = models.BooleanField(default=False, editable=False, help_text="Set while the address is waiting to be reverse geocoded")
+    geocode_retry_at = models.DateTimeField(blank=True, null=True, editable=False, help_text="When a failed reverse geocoding is retried")
+    # MinHash signature of the description and its LSH band keys, used to
+    # find reposted listings; filled in by the duplicate detection worker
+    description_minhash = ArrayField(models.IntegerField(), default=list, blank=True, editable=False)
+    description_bands = ArrayField(models.IntegerField(), default=list, blank=True, editable=False)
+    duplicates_checked_at = models.DateTimeField(blank=True, null=True, editable=False, help_text="When the description signature was last computed")
+
+    objects = PropertyQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Property"
         verbose_name_plural = "Properties"
         ordering = ["-created_at"]
+        indexes = [
+            # Small partial index for the geocoding worker's queue
+            models.Index(
+                models.F('geocode_retry_at').asc(nulls_first=True), models.F('updated_at'),
+                condition=models.Q(address_pending=True), name='property_address_pending_idx',
+            ),
+            GinIndex(fields=['description_bands'], name='property_description_bands_gin'),
+            # Properties the duplicate detection has not seen yet
+            models.Index(fields=['id'], condition=models.Q(duplicates_checked_at__isnull=True), name='property_unchecked_dupes_idx'),
+        ]
 
     def __str__(self):
         return f"Property: {self.address[:100]}..."
@@ -57,81 +208,205 @@ class Property(models.Model):
         """
         Check if the property is banned.
         """
+        if hasattr(self, 'banned_flag'):
+            return self.banned_flag
         return self.banned_properties.exists()
     
     def is_verified(self):
         """
         Check if the property is verified.
         """
+        if hasattr(self, 'verified_flag'):
+            return self.verified_flag
         return hasattr(self, 'verified') and self.verified is not None
     
     def is_verified_by(self):
         """
         Check if the property is verified by a user.
         """
+        if getattr(self, 'verified_flag', True) is False:
+            return None
+        # Loaded along with the property by with_status()
         if hasattr(self, 'verified'):
             return self.verified.verified_by
         return None
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded location so save() can tell whether it changed
+        # without querying the database again
+        if 'location' in field_names:
+            instance._remember_location()
+        if 'description' in field_names:
+            instance._loaded_description = instance.description
+        return instance
+
+    def _remember_location(self):
+        # A copy, since GEOS points are edited in place (`location.x = ...`)
+        self._loaded_location = self.location.clone() if self.location is not None else None
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        if fields is None or 'location' in fields:
+            self._remember_location()
+        if fields is None or 'description' in fields:
+            self._loaded_description = self.description
+
+    def has_location_changed(self, update_fields=None):
+        """
+        Check, without a query, whether the location differs from the one
+        stored in the database.
+        """
+        if self._state.adding:
+            return self.location is not None
+        if update_fields is not None and 'location' not in update_fields:
+            return False
+        if not hasattr(self, '_loaded_location'):
+            # A location that was deferred and never loaded cannot have been
+            # changed; one assigned without loading is treated as changed.
+            return 'location' not in self.get_deferred_fields()
+        return self.location != self._loaded_location
+
+    def has_description_changed(self, update_fields=None):
+        """
+        Check, without a query, whether the description differs from the
+        one stored in the database.
+        """
+        if self._state.adding:
+            return True
+        if update_fields is not None and 'description' not in update_fields:
+            return False
+        if not hasattr(self, '_loaded_description'):
+            return 'description' not in self.get_deferred_fields()
+        return self.description != self._loaded_description
+
     def save(self, *args, **kwargs):
         """
-        Override the save method to reverse geocode the location into an address
-        only if the location has changed.
-        """
-        def _update_address():
-            gmaps = googlemaps.Client(key=settings.GOOGLE_MAP_API_KEY)
-
-            # Extract latitude and longitude from the PointField
-            latitude = self.location.y
-            longitude = self.location.x
-
-            try:
-                # Perform reverse geocoding
-                result = gmaps.reverse_geocode((latitude, longitude))
-                if result:
-                    # Extract the formatted address from the response
-                    self.address = result[0]['formatted_address']
-            except Exception as e:
-                # Log the error if reverse geocoding fails
-                logger.error(f"Error during reverse geocoding: {e}")
-
-        # Check if the instance already exists in the database
-        if self.pk:
-            # Fetch the existing instance from the database
-            existing_instance = Property.objects.get(pk=self.pk)
-            # Compare the current location with the existing location
-            if self.location != existing_instance.location:
-                _update_address()
-        else:
-            # For new instances, always perform reverse geocoding
-            if self.location:
-                _update_address()
+        Override the save method to queue reverse geocoding of the location
+        into an address only if the location has changed.
+        The address is resolved by a background worker; until then the
+        property is saved with `address_pending` set.
+        """
+        update_fields = kwargs.get('update_fields')
+        if self.has_location_changed(update_fields):
+            self.address_pending = True
+            self.geocode_retry_at = None
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'address_pending', 'geocode_retry_at'}
 
         super().save(*args, **kwargs)
 
+        deferred = self.get_deferred_fields()
+        if 'location' not in deferred:
+            self._remember_location()
+        if 'description' not in deferred:
+            self._loaded_description = self.description
+
+
+class ImageBlob(models.Model):
+    """
+    One stored image file, shared by every PropertyImage with the same
+    content. `ref_count` counts those images; unreferenced blobs are
+    removed by the `sweep_image_blobs` task.
+    """
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    name = models.CharField(max_length=255)
+    size = models.BigIntegerField(default=0)
+    ref_count = models.IntegerField(default=0)
+    derived_files = models.JSONField(default=list, blank=True, help_text="Files generated from this blob, removed with it")
+    created_at = models.DateTimeField(auto_now_add=True)
+    unreferenced_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Image Blob"
+        verbose_name_plural = "Image Blobs"
+        ordering = ["-created_at"]
+        indexes = [
+            # Small partial index for the sweeper
+            models.Index(fields=['unreferenced_at'], condition=models.Q(ref_count__lte=0), name='imageblob_unreferenced_idx'),
+        ]
+
+    def __str__(self):
+        return f"ImageBlob: {self.sha256} ({self.ref_count} references)"
+
 
 # id, image, ads_id, is_primary
 class PropertyImage(models.Model):
     """
     PropertyImage model class
     """
-    image = models.ImageField(upload_to=property_image_upload_handler)
+    image = models.ImageField(upload_to=property_image_upload_handler, storage=ContentAddressedStorage())
     property = models.ForeignKey(Property, related_name="images", on_delete=models.CASCADE)
     is_primary = models.BooleanField(default=False)
+    width = models.IntegerField(blank=True, null=True, editable=False)
+    height = models.IntegerField(blank=True, null=True, editable=False)
+    variants = models.JSONField(default=dict, blank=True, editable=False, help_text="Resized WebP/JPEG copies generated by the image worker")
+    variants_source = models.CharField(max_length=255, blank=True, editable=False, help_text="Image the variants were generated from")
+    blurhash = models.CharField(max_length=64, blank=True, editable=False, help_text="BlurHash placeholder painted before the image loads")
+    dhash = models.BigIntegerField(blank=True, null=True, editable=False, help_text="Perceptual difference hash used to find near-duplicate photos")
+    dhash_bands = ArrayField(models.IntegerField(), default=list, blank=True, editable=False)
 
     class Meta:
         verbose_name = "Property Image"
         verbose_name_plural = "Property Images"
         ordering = ["-property__created_at"]
+        indexes = [
+            # Multi-index hashing lookups of `dhash` bands
+            GinIndex(fields=['dhash_bands'], name='propertyimage_dhash_bands_gin'),
+        ]
 
     def __str__(self):
         return f"PropertyImage: {self.property.address[:100]}..."
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored file so a replaced one can release its blob
+        if 'image' in field_names:
+            instance._loaded_image = instance.image.name
+        return instance
     
     
 
 
+class PriceTrackingMixin:
+    """
+    Remembers the loaded price of a listing so a change can be recorded in
+    its price history without reading the old price back.
+    """
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'price' in field_names:
+            instance._loaded_price = instance.price
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        if fields is None or 'price' in fields:
+            self._loaded_price = self.price
+
+    def has_price_changed(self, update_fields=None):
+        """
+        Check, without a query, whether the price differs from the one
+        stored in the database.
+        """
+        if update_fields is not None and 'price' not in update_fields:
+            return False
+        if 'price' in self.get_deferred_fields():
+            return False
+        return self.price != getattr(self, '_loaded_price', None)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # post_save handlers have seen the previous price by now
+        if 'price' not in self.get_deferred_fields():
+            self._loaded_price = self.price
+
+
 # id, list_type, price, has_c_of_o, has_deed_of_assignment, has_power_of_atorney, has_survey_plan, has_governors_consent, total_bathrooms, total_full_bathrooms, laundry_level, has_basement, has_fireplace, total_structure_area, total_interior_livable_area, finished_area_above_ground, finished_area_below_ground, total_parking_spaces, parking_feature, garage_spaces, parel_number, special_conditions, home_type, architectural_style, property_condition, year_built, has_fitness_center, has_game_room, has_bicycle_storage, has_swimming_pool, allow_small_dog, allow_large_dog, allow_cat, property_id, property_listed_by_id, property_listed_by_user_id, property_verified_id, property_verified_user_id
-class HomeProperty(Property):
+class HomeProperty(PriceTrackingMixin, Property):
     """
     HomeProperty model class
     """
@@ -266,6 +541,8 @@ class HomeProperty(Property):
         """
         Calculate the total number of bedrooms.
         """
+        if hasattr(self, 'bedroom_count'):
+            return self.bedroom_count
         if hasattr(self, 'bedrooms'):
             return self.bedrooms.count()
         return 0
@@ -279,6 +556,55 @@ class HomeProperty(Property):
         return super().save(*args, **kwargs)
     
 
+class SimilarImageFlag(models.Model):
+    """
+    A property image whose photo nearly matches an image listed by another
+    stakeholder, for moderators to review.
+    """
+    image = models.ForeignKey(PropertyImage, related_name="similarity_flags", on_delete=models.CASCADE)
+    similar_image = models.ForeignKey(PropertyImage, related_name="+", on_delete=models.CASCADE)
+    distance = models.IntegerField(help_text="Differing bits between the two perceptual hashes")
+    is_reviewed = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Similar Image Flag"
+        verbose_name_plural = "Similar Image Flags"
+        ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(fields=['image', 'similar_image'], name='unique_similar_image_flag'),
+            # Each pair is stored once, newer image first
+            models.CheckConstraint(check=models.Q(image__gt=models.F('similar_image')), name='similar_image_flag_ordered'),
+        ]
+
+    def __str__(self):
+        return f"SimilarImageFlag: {self.image_id} ~ {self.similar_image_id} ({self.distance} bits)"
+
+
+class DuplicateCandidate(models.Model):
+    """
+    A listing that is likely a repost of an older one: it is close by and
+    its description is nearly the same. For moderators to review.
+    """
+    property = models.ForeignKey(Property, related_name="duplicate_candidates", on_delete=models.CASCADE)
+    duplicate_of = models.ForeignKey(Property, related_name="+", on_delete=models.CASCADE)
+    similarity = models.FloatField(help_text="Estimated Jaccard similarity of the two descriptions")
+    distance = models.FloatField(help_text="Distance between the two listings in metres")
+    is_reviewed = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Duplicate Candidate"
+        verbose_name_plural = "Duplicate Candidates"
+        ordering = ["-similarity", "distance"]
+        constraints = [
+            models.UniqueConstraint(fields=['property', 'duplicate_of'], name='unique_duplicate_candidate'),
+        ]
+
+    def __str__(self):
+        return f"DuplicateCandidate: {self.property_id} ~ {self.duplicate_of_id} ({self.similarity:.2f})"
+
+
 # id, level, dimention_width, dimention_height, home_id
 class HomePropertyBedroom(models.Model):
     """
@@ -307,7 +633,7 @@ class HomePropertyBedroom(models.Model):
 
 
 # id, price, apartment_type, has_dishwasher, has_washer, has_dryer, has_oven, has_refrigerator, property_id, property_listed_by_id, property_listed_by_user_id, property_verified_id, property_verified_user_id
-class ApartmentProperty(Property):
+class ApartmentProperty(PriceTrackingMixin, Property):
     """
     ApartmentProperty model class
     """
@@ -402,6 +728,141 @@ class BookmarkedProperty(models.Model):
         verbose_name = "Bookmarked Property"
         verbose_name_plural = "Bookmarked Properties"
         ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'property'], name='unique_bookmarked_property'),
+        ]
+        indexes = [
+            # A user's bookmarks, newest first, for the keyset paginator
+            models.Index(fields=['user', '-created_at', '-id'], name='bookmark_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"BookmarkedProperty: {self.property.address[:100]}..."
+
+
+class PriceChange(models.Model):
+    """
+    A price a listing was offered at, from the moment it was set. Rows are
+    only ever appended, one per actual price change or change of whether
+    the listing is shown publicly. They outlive the listing, whose
+    deletion is recorded as a delisting.
+    """
+    property = models.ForeignKey(
+        Property, related_name="price_changes", on_delete=models.DO_NOTHING, db_constraint=False,
+    )
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    previous_price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
+    property_type = models.CharField(max_length=50)
+    list_type = models.CharField(max_length=10, blank=True, default='')
+    area = models.CharField(max_length=12, help_text="Geohash of the listing's location when the price was set")
+    recorded_at = models.DateTimeField(default=timezone.now)
+    is_listed = models.BooleanField(default=True, help_text="False from when the listing stopped being shown publicly")
+
+    class Meta:
+        verbose_name = "Price Change"
+        verbose_name_plural = "Price Changes"
+        ordering = ["-recorded_at"]
+        indexes = [
+            # Rows arrive in time order, so a tiny BRIN index narrows a time
+            # range down to the pages holding it
+            BrinIndex(fields=['recorded_at'], name='pricechange_recorded_brin'),
+            models.Index(fields=['property', '-recorded_at'], name='pricechange_property_idx'),
+            # The listings priced in an area, for the monthly rollups
+            models.Index(fields=['area', 'property'], name='pricechange_area_property_idx'),
+        ]
+
+    def __str__(self):
+        return f"PriceChange: {self.property_id} {self.previous_price} -> {self.price}"
+
+
+class PriceStatistic(models.Model):
+    """
+    Monthly price distribution of the listings priced in one area,
+    rolled up from PriceChange.
+    """
+    area = models.CharField(max_length=12)
+    property_type = models.CharField(max_length=50)
+    list_type = models.CharField(max_length=10, blank=True, default='')
+    month = models.DateField()
+    count = models.PositiveIntegerField()
+    min_price = models.DecimalField(max_digits=12, decimal_places=2)
+    p25_price = models.DecimalField(max_digits=12, decimal_places=2)
+    median_price = models.DecimalField(max_digits=12, decimal_places=2)
+    p75_price = models.DecimalField(max_digits=12, decimal_places=2)
+    max_price = models.DecimalField(max_digits=12, decimal_places=2)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Price Statistic"
+        verbose_name_plural = "Price Statistics"
+        ordering = ["area", "property_type", "list_type", "month"]
+        constraints = [
+            models.UniqueConstraint(fields=['area', 'property_type', 'list_type', 'month'], name='unique_price_statistic'),
+        ]
+
+    def __str__(self):
+        return f"PriceStatistic: {self.area} {self.property_type} {self.list_type} {self.month:%Y-%m}"
+
+
+class PropertySearchIndex(models.Model):
+    """
+    Flattened copy of the fields public search, map clusters and tiles read,
+    so they query one table instead of joining Property with its child
+    tables and status tables. Kept in sync by `properties.search_index`.
+    """
+    property = models.OneToOneField(Property, primary_key=True, related_name="search_index", on_delete=models.CASCADE)
+    location = PointField(geography=True)
+    address = models.TextField(blank=True)
+    description = models.TextField(blank=True)
+    property_type = models.CharField(max_length=50, blank=True, null=True)
+    price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
+    list_type = models.CharField(max_length=10, blank=True, null=True)
+    home_type = models.CharField(max_length=50, blank=True, null=True)
+    apartment_type = models.CharField(max_length=50, blank=True, null=True)
+    architectural_style = models.CharField(max_length=50, blank=True, null=True)
+    bedroom_count = models.IntegerField(default=0)
+    is_verified = models.BooleanField(default=False)
+    is_banned = models.BooleanField(default=False)
+    is_active = models.BooleanField(default=True)
+    is_deleted = models.BooleanField(default=False)
+    primary_image = models.CharField(max_length=255, blank=True)
+    primary_image_variants = models.JSONField(default=dict, blank=True)
+    primary_image_blurhash = models.CharField(max_length=64, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    # Computed by PostgreSQL whenever address or description change
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('address', weight='A', config=SEARCH_CONFIG)
+            + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    objects = PropertySearchIndexQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Property Search Index"
+        verbose_name_plural = "Property Search Index"
+        ordering = ["-created_at"]
+        indexes = [
+            # Web mercator copy of `location` used by map tiles and clusters
+            GistIndex(mercator_location(), name='search_location_3857_gist'),
+            # Keyset pagination of the listing feed
+            models.Index(
+                fields=['-created_at', '-property'],
+                condition=models.Q(is_active=True, is_deleted=False, is_banned=False),
+                name='search_listed_feed_idx',
+            ),
+            models.Index(
+                fields=['price'],
+                condition=models.Q(is_active=True, is_deleted=False, is_banned=False),
+                name='search_listed_price_idx',
+            ),
+            GinIndex(fields=['search_vector'], name='search_vector_gin'),
+            GinIndex(fields=['address'], opclasses=['gin_trgm_ops'], name='search_address_trgm'),
+        ]
+
+    def __str__(self):
+        return f"PropertySearchIndex: {self.address[:100]}..."
@@ -0,0 +1,170 @@
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+import logging
+
+from .geo import geohash
+from .models import PriceChange, PriceStatistic
+
+
+logger = logging.getLogger("django")
+
+
+class PercentileCont(models.Aggregate):
+    """
+    PostgreSQL `percentile_cont(fraction) WITHIN GROUP (ORDER BY ...)`:
+    the value below which `fraction` of the rows fall, interpolated.
+    """
+    function = 'PERCENTILE_CONT'
+    name = 'PercentileCont'
+    template = '%(function)s(%(fraction)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+    output_field = models.FloatField()
+
+    def __init__(self, expression, fraction, **extra):
+        if not 0 <= fraction <= 1:
+            raise ValueError("fraction must be between 0 and 1")
+        super().__init__(expression, fraction=float(fraction), **extra)
+
+
+def price_area(location):
+    """
+    The area a listing's prices are grouped under: the geohash of its
+    location at PRICE_HISTORY_AREA_PRECISION characters.
+    """
+    return geohash(location.y, location.x, getattr(settings, 'PRICE_HISTORY_AREA_PRECISION', 5))
+
+
+def is_publicly_listed(listing):
+    """
+    Whether a listing or search index entry is shown publicly. Only index
+    entries know about bans; listings are judged by their own flags.
+    """
+    return listing.is_active and not listing.is_deleted and not getattr(listing, 'is_banned', False)
+
+
+def price_change(listing, previous_price=None, listed=None):
+    """
+    Unsaved PriceChange recording the current price of a home or
+    apartment listing. `listed` defaults to the listing's own flags.
+    """
+    return PriceChange(
+        property_id=listing.pk,
+        price=listing.price,
+        previous_price=previous_price,
+        property_type=listing.property_type,
+        list_type=getattr(listing, 'list_type', '') or '',
+        area=price_area(listing.location),
+        is_listed=is_publicly_listed(listing) if listed is None else listed,
+    )
+
+
+def record_listing_changes(previous, current):
+    """
+    Append a PriceChange for every listing whose search index entry was
+    listed in `previous` and is not in `current`, or the other way around.
+    Both map property ids to entries. Listings new to the index got theirs
+    with their first price, and deleted ones when they were deleted.
+    """
+    changes = []
+    for property_id, after in current.items():
+        before = previous.get(property_id)
+        listed = is_publicly_listed(after)
+        if before is None or after.price is None or listed == is_publicly_listed(before):
+            continue
+        changes.append(PriceChange(
+            property_id=property_id,
+            price=after.price,
+            previous_price=before.price,
+            property_type=after.property_type or '',
+            list_type=after.list_type or '',
+            area=price_area(after.location),
+            is_listed=listed,
+        ))
+    PriceChange.objects.bulk_create(changes)
+    return len(changes)
+
+
+def _next_month(month):
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _month_start(moment):
+    return timezone.localtime(moment).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def update_price_statistics(since=None, change_model=PriceChange, statistic_model=PriceStatistic):
+    """
+    Recompute the PriceStatistic rollups affected by price changes recorded
+    since `since`, or every rollup when None.
+
+    A month's statistics cover every listing shown in the area at the end
+    of that month, each at the price in effect then: its latest change up
+    to the month's end, unless that change delisted it. A change therefore
+    affects its own month and every month after it, up to the current one.
+    Only the areas with changes are aggregated, each month in one query
+    over the latest change of their listings; the others carry last
+    month's statistics into the current month unchanged.
+
+    The models can be passed in so migrations can run the rollup with
+    their historical models.
+    """
+    changes = change_model.objects.all()
+    if since is not None:
+        changes = changes.filter(recorded_at__gte=since)
+    current_month = _month_start(timezone.now())
+
+    touched = defaultdict(set)
+    first_changes = changes.values('area').annotate(first=models.Min('recorded_at')).order_by()
+    for area, first in first_changes.values_list('area', 'first'):
+        month = _month_start(first)
+        while month <= current_month:
+            touched[month].add(area)
+            month = _next_month(month)
+
+    written = 0
+    with transaction.atomic():
+        for month, areas in sorted(touched.items()):
+            end = _next_month(month)
+            latest = change_model.objects.filter(
+                recorded_at__lt=end,
+                property_id__in=change_model.objects.filter(area__in=areas).values('property_id'),
+            ).order_by('property_id', '-recorded_at', '-pk').distinct('property_id').values('pk')
+            rows = change_model.objects.filter(pk__in=latest, area__in=areas, is_listed=True).values(
+                'area', 'property_type', 'list_type',
+            ).annotate(
+                count=models.Count('pk'),
+                min_price=models.Min('price'),
+                p25_price=PercentileCont('price', 0.25),
+                median_price=PercentileCont('price', 0.5),
+                p75_price=PercentileCont('price', 0.75),
+                max_price=models.Max('price'),
+            ).order_by()
+            # Replaced rather than updated, so types whose last listing left
+            # the area lose their row
+            statistic_model.objects.filter(month=month.date(), area__in=areas).delete()
+            written += len(statistic_model.objects.bulk_create(
+                [statistic_model(month=month.date(), **row) for row in rows], batch_size=1000,
+            ))
+        carried = carry_price_statistics(current_month, change_model, statistic_model)
+
+    logger.info(f"Rolled up {written} price statistics over {len(touched)} months, carried {carried} over")
+    return written + carried
+
+
+def carry_price_statistics(month, change_model=PriceChange, statistic_model=PriceStatistic):
+    """
+    Copy the previous month's statistics of areas without any change this
+    month into `month`: the same listings are shown at the same prices.
+    Areas that already have statistics this month are left alone.
+    """
+    previous_month = _month_start(month - timedelta(days=1))
+    carried = statistic_model.objects.filter(month=previous_month.date()).exclude(
+        area__in=change_model.objects.filter(recorded_at__gte=month).values('area'),
+    ).exclude(
+        area__in=statistic_model.objects.filter(month=month.date()).values('area'),
+    ).values('area', 'property_type', 'list_type', 'count', 'min_price', 'p25_price', 'median_price', 'p75_price', 'max_price')
+    return len(statistic_model.objects.bulk_create(
+        [statistic_model(month=month.date(), **row) for row in carried], batch_size=1000, ignore_conflicts=True,
+    ))
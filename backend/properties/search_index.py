@@ -0,0 +1,131 @@
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
+import logging
+
+from .facets import CHOICE_FACETS, facets_changed, invalidate_facets
+from .models import Property, PropertyImage, PropertySearchIndex
+from .price_history import record_listing_changes
+
+
+logger = logging.getLogger("django")
+
+
+# Columns rewritten on every refresh (everything but the primary key and
+# the columns PostgreSQL generates)
+SEARCH_INDEX_FIELDS = [
+    field.name for field in PropertySearchIndex._meta.concrete_fields
+    if not field.primary_key and not field.generated
+]
+
+
+def search_index_source():
+    """
+    Property rows annotated with every search index column, computed by
+    PostgreSQL in a single query.
+    """
+    primary_image = PropertyImage.objects.filter(
+        property=models.OuterRef('pk'),
+    ).order_by('-is_primary', 'pk')
+
+    return Property.objects.with_status().annotate(
+        index_price=Coalesce('homeproperty__price', 'apartmentproperty__price'),
+        index_list_type=models.F('homeproperty__list_type'),
+        index_home_type=models.F('homeproperty__home_type'),
+        index_apartment_type=models.F('apartmentproperty__apartment_type'),
+        index_architectural_style=models.F('homeproperty__architectural_style'),
+        index_primary_image=Coalesce(
+            models.Subquery(primary_image.values('image')[:1]), models.Value(''), output_field=models.CharField(),
+        ),
+        index_primary_image_variants=models.Subquery(
+            primary_image.values('variants')[:1], output_field=models.JSONField(),
+        ),
+        index_primary_image_blurhash=Coalesce(
+            models.Subquery(primary_image.values('blurhash')[:1]), models.Value(''),
+        ),
+    ).order_by()
+
+
+def _index_entry(prop):
+    return PropertySearchIndex(
+        property_id=prop.pk,
+        location=prop.location,
+        address=prop.address,
+        description=prop.description,
+        property_type=prop.property_type,
+        price=prop.index_price,
+        list_type=prop.index_list_type,
+        home_type=prop.index_home_type,
+        apartment_type=prop.index_apartment_type,
+        architectural_style=prop.index_architectural_style,
+        bedroom_count=prop.bedroom_count,
+        is_verified=prop.verified_flag,
+        is_banned=prop.banned_flag,
+        is_active=prop.is_active,
+        is_deleted=prop.is_deleted,
+        primary_image=prop.index_primary_image,
+        primary_image_variants=prop.index_primary_image_variants or {},
+        primary_image_blurhash=prop.index_primary_image_blurhash,
+        created_at=prop.created_at,
+        updated_at=prop.updated_at,
+    )
+
+
+def refresh_search_index(property_ids):
+    """
+    Recompute the search index entries of `property_ids` with one SELECT and
+    one INSERT ... ON CONFLICT DO UPDATE. Entries of properties that no
+    longer exist are removed. Listings that were listed or delisted since
+    their entry was written get that recorded in their price history, and
+    the cached facet counts are dropped when the rewrite changes them.
+    """
+    property_ids = set(property_ids)
+    if not property_ids:
+        return 0
+
+    previous = PropertySearchIndex.objects.filter(property_id__in=property_ids).only(
+        'location', 'price', 'is_active', 'is_deleted', 'is_banned', 'is_verified', *CHOICE_FACETS,
+    ).in_bulk()
+    entries = [_index_entry(prop) for prop in search_index_source().filter(pk__in=property_ids)]
+    PropertySearchIndex.objects.bulk_create(
+        entries,
+        update_conflicts=True,
+        unique_fields=['property'],
+        update_fields=SEARCH_INDEX_FIELDS,
+    )
+    missing = property_ids - {entry.property_id for entry in entries}
+    if missing:
+        PropertySearchIndex.objects.filter(property_id__in=missing).delete()
+    current = {entry.property_id: entry for entry in entries}
+    record_listing_changes(previous, current)
+    if missing or facets_changed(previous, current):
+        invalidate_facets()
+    return len(entries)
+
+
+def rebuild_search_index(batch_size=1000):
+    """
+    Recompute the whole search index in batches and drop entries whose
+    property is gone. Returns the number of entries written.
+    """
+    total = 0
+    batch = []
+    for property_id in Property.objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=batch_size):
+        batch.append(property_id)
+        if len(batch) == batch_size:
+            total += refresh_search_index(batch)
+            batch = []
+    total += refresh_search_index(batch)
+
+    PropertySearchIndex.objects.exclude(
+        property_id__in=Property.objects.values('pk'),
+    ).delete()
+    logger.info(f"Rebuilt the property search index with {total} entries")
+    return total
+
+
+def queue_search_index_refresh(*property_ids):
+    """
+    Refresh the entries of `property_ids` once the current transaction
+    commits, so the index never shows uncommitted changes.
+    """
+    transaction.on_commit(lambda: refresh_search_index(property_ids))
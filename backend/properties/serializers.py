@@ -0,0 +1,225 @@
+from django.conf import settings
+from rest_framework import serializers
+from .bookmarks import bookmarked_ids
+from .geo import GEOHASH_ALPHABET, make_point, tiles_in_bbox
+from .price_history import price_area
+from .images import variant_urls
+from .models import (
+    Property, HomeProperty, ApartmentProperty, PropertyImage, PropertySearchIndex, BookmarkedProperty,
+    PriceChange, PriceStatistic,
+)
+
+
+class PropertyFilterSerializer(serializers.Serializer):
+    min_price = serializers.DecimalField(required=False, max_digits=10, decimal_places=2, min_value=0)
+    max_price = serializers.DecimalField(required=False, max_digits=10, decimal_places=2, min_value=0)
+    list_type = serializers.ChoiceField(required=False, choices=HomeProperty.LISTING_TYPE_CHOICES)
+    property_type = serializers.ChoiceField(required=False, choices=Property.PROPERTY_TYPE_CHOICES)
+    home_type = serializers.ChoiceField(required=False, choices=HomeProperty.HOME_TYPE_CHOICES)
+    apartment_type = serializers.ChoiceField(required=False, choices=ApartmentProperty.APARTMENT_TYPE_CHOICES)
+    architectural_style = serializers.ChoiceField(required=False, choices=HomeProperty.ARCHITECTURAL_STYLE_CHOICES)
+    verified_only = serializers.BooleanField(required=False, allow_null=True)
+
+    def validate(self, attrs):
+        if 'min_price' in attrs and 'max_price' in attrs and attrs['min_price'] > attrs['max_price']:
+            raise serializers.ValidationError("min_price cannot be greater than max_price.")
+        return attrs
+
+
+class PropertySearchQuerySerializer(PropertyFilterSerializer):
+    q = serializers.CharField(required=False, max_length=200, help_text="Free text matched against address and description")
+    latitude = serializers.FloatField(required=False, min_value=-90, max_value=90)
+    longitude = serializers.FloatField(required=False, min_value=-180, max_value=180)
+    radius_km = serializers.FloatField(required=False, default=10, min_value=0.1, max_value=200)
+    limit = serializers.IntegerField(required=False, default=50, min_value=1, max_value=200)
+
+    def validate(self, attrs):
+        if ('latitude' in attrs) != ('longitude' in attrs):
+            raise serializers.ValidationError("Both latitude and longitude are required for a location search.")
+        return super().validate(attrs)
+
+
+class PropertyClusterQuerySerializer(PropertyFilterSerializer):
+    bbox = serializers.CharField(help_text="west,south,east,north in WGS84 degrees")
+    zoom = serializers.IntegerField(min_value=0, max_value=22)
+
+    def validate_bbox(self, value):
+        try:
+            west, south, east, north = (float(part) for part in value.split(','))
+        except ValueError:
+            raise serializers.ValidationError("bbox must be four comma separated numbers: west,south,east,north.")
+        if not (-180 <= west < east <= 180 and -90 <= south < north <= 90):
+            raise serializers.ValidationError("bbox is out of range or inverted.")
+        return west, south, east, north
+
+    def validate(self, attrs):
+        max_tiles = getattr(settings, 'PROPERTY_CLUSTER_MAX_TILES', 64)
+        if len(tiles_in_bbox(*attrs['bbox'], attrs['zoom'])) > max_tiles:
+            raise serializers.ValidationError("bbox is too large for this zoom level.")
+        return super().validate(attrs)
+
+
+class PropertyClusterSerializer(serializers.Serializer):
+    count = serializers.IntegerField()
+    latitude = serializers.FloatField()
+    longitude = serializers.FloatField()
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2, allow_null=True)
+    max_price = serializers.DecimalField(max_digits=10, decimal_places=2, allow_null=True)
+
+
+class PropertyPinSerializer(serializers.Serializer):
+    id = serializers.UUIDField(source='property_id')
+    latitude = serializers.FloatField()
+    longitude = serializers.FloatField()
+    property_type = serializers.CharField(allow_null=True)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, allow_null=True)
+
+
+class PropertyClusterResponseSerializer(serializers.Serializer):
+    zoom = serializers.IntegerField()
+    clusters = PropertyClusterSerializer(many=True)
+    properties = PropertyPinSerializer(many=True)
+
+
+class PropertyPriceFacetSerializer(serializers.Serializer):
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    max_price = serializers.DecimalField(max_digits=10, decimal_places=2, allow_null=True)
+    count = serializers.IntegerField()
+
+
+class PropertyFacetSerializer(serializers.Serializer):
+    total = serializers.IntegerField()
+    property_type = serializers.DictField(child=serializers.IntegerField())
+    list_type = serializers.DictField(child=serializers.IntegerField())
+    home_type = serializers.DictField(child=serializers.IntegerField())
+    apartment_type = serializers.DictField(child=serializers.IntegerField())
+    architectural_style = serializers.DictField(child=serializers.IntegerField())
+    price = PropertyPriceFacetSerializer(many=True)
+    verified = serializers.IntegerField()
+
+
+class PropertySearchSerializer(serializers.ModelSerializer):
+    id = serializers.UUIDField(source='property_id', read_only=True)
+    latitude = serializers.FloatField(source='location.y', read_only=True)
+    longitude = serializers.FloatField(source='location.x', read_only=True)
+    primary_image = serializers.SerializerMethodField()
+    primary_image_variants = serializers.SerializerMethodField()
+    distance_km = serializers.SerializerMethodField()
+    is_bookmarked = serializers.SerializerMethodField()
+
+    class Meta:
+        model = PropertySearchIndex
+        fields = ['id', 'address', 'description', 'latitude', 'longitude', 'property_type',
+                  'price', 'list_type', 'bedroom_count', 'is_verified', 'primary_image',
+                  'primary_image_variants', 'primary_image_blurhash', 'distance_km',
+                  'is_bookmarked', 'created_at']
+        read_only_fields = fields
+
+    def get_primary_image(self, obj):
+        """
+        URL of the primary image, stored on the index as a storage name.
+        """
+        if not obj.primary_image:
+            return None
+        url = PropertyImage._meta.get_field('image').storage.url(obj.primary_image)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+    def get_primary_image_variants(self, obj):
+        """
+        Resized WebP/JPEG copies of the primary image with srcset strings,
+        or None until the image worker has generated them.
+        """
+        if not obj.primary_image_variants:
+            return None
+        storage = PropertyImage._meta.get_field('image').storage
+        return variant_urls(storage, obj.primary_image_variants, self.context.get('request'))
+
+    def get_distance_km(self, obj):
+        """
+        Distance from the searched point, computed by PostGIS.
+        """
+        distance = getattr(obj, 'distance', None)
+        if distance is None:
+            return None
+        return round(distance.km, 3)
+
+    def get_is_bookmarked(self, obj):
+        """
+        Whether the requesting user bookmarked the property. The user's
+        bookmark set is read once and shared by every item of a page
+        through the serializer context.
+        """
+        if 'bookmarked_ids' not in self.context:
+            request = self.context.get('request')
+            self.context['bookmarked_ids'] = bookmarked_ids(request.user) if request else frozenset()
+        return obj.property_id in self.context['bookmarked_ids']
+
+
+class BookmarkRequestSerializer(serializers.Serializer):
+    property_ids = serializers.ListField(
+        child=serializers.UUIDField(), min_length=1,
+        max_length=getattr(settings, 'BOOKMARK_BULK_MAX_SIZE', 100),
+    )
+
+
+class BookmarkIdsSerializer(serializers.Serializer):
+    property_ids = serializers.ListField(child=serializers.UUIDField())
+
+
+class BookmarkSerializer(serializers.ModelSerializer):
+    property = PropertySearchSerializer(source='property.search_index', read_only=True)
+
+    class Meta:
+        model = BookmarkedProperty
+        fields = ['property', 'created_at']
+        read_only_fields = fields
+
+
+class PriceStatisticQuerySerializer(serializers.Serializer):
+    area = serializers.CharField(required=False, help_text="Geohash of the area, as returned in `area`")
+    latitude = serializers.FloatField(required=False, min_value=-90, max_value=90)
+    longitude = serializers.FloatField(required=False, min_value=-180, max_value=180)
+    property_type = serializers.ChoiceField(required=False, choices=Property.PROPERTY_TYPE_CHOICES)
+    list_type = serializers.ChoiceField(required=False, choices=HomeProperty.LISTING_TYPE_CHOICES)
+    months = serializers.IntegerField(required=False, default=12, min_value=1, max_value=120)
+
+    def validate_area(self, value):
+        precision = getattr(settings, 'PRICE_HISTORY_AREA_PRECISION', 5)
+        if len(value) != precision or any(character not in GEOHASH_ALPHABET for character in value):
+            raise serializers.ValidationError(f"area must be a {precision} character geohash.")
+        return value
+
+    def validate(self, attrs):
+        if ('latitude' in attrs) != ('longitude' in attrs):
+            raise serializers.ValidationError("latitude and longitude must be given together.")
+        if 'latitude' in attrs:
+            attrs['area'] = price_area(make_point(attrs.pop('latitude'), attrs.pop('longitude')))
+        if 'area' not in attrs:
+            raise serializers.ValidationError("Either area or latitude and longitude is required.")
+        return attrs
+
+
+class PriceStatisticSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PriceStatistic
+        fields = ['area', 'property_type', 'list_type', 'month', 'count', 'min_price',
+                  'p25_price', 'median_price', 'p75_price', 'max_price']
+        read_only_fields = fields
+
+
+class PriceChangeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PriceChange
+        fields = ['price', 'previous_price', 'is_listed', 'recorded_at']
+        read_only_fields = fields
+
+
+class GeocodeCacheCountersSerializer(serializers.Serializer):
+    hits = serializers.IntegerField()
+    misses = serializers.IntegerField()
+
+
+class GeocodeCacheStatsSerializer(serializers.Serializer):
+    local = GeocodeCacheCountersSerializer(help_text="In-process LRU caches of the workers")
+    shared = GeocodeCacheCountersSerializer(help_text="Shared Django cache; misses call the geocoding API")
@@ -0,0 +1,157 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .blobs import acquire_blob, release_blob
+from .bookmarks import invalidate_bookmarks
+from .price_history import is_publicly_listed, price_change
+from .models import (
+    Property, HomeProperty, ApartmentProperty, HomePropertyBedroom, PropertyImage,
+    BannedProperty, VerifiedProperty, BookmarkedProperty,
+)
+from .search_index import queue_search_index_refresh
+from .tasks import detect_duplicate_listings, generate_image_variants, schedule_address_geocoding
+from .tiles import invalidate_tiles
+
+
+def refresh_property_search_index(sender, instance, **kwargs):
+    """
+    Rewrite the search index entry of a saved property.
+    Deleted properties lose their entry through the cascade.
+    """
+    queue_search_index_refresh(instance.pk)
+
+
+def refresh_related_search_index(sender, instance, **kwargs):
+    """
+    Bedrooms, images and ban/verification records are part of the search
+    index entry of the property they belong to.
+    """
+    queue_search_index_refresh(instance.home_property_id if sender is HomePropertyBedroom else instance.property_id)
+
+
+def queue_image_variants(sender, instance, **kwargs):
+    """
+    Generate variants in the background for new or replaced images.
+    """
+    if instance.image and instance.image.name != instance.variants_source:
+        transaction.on_commit(lambda: generate_image_variants.delay(instance.pk))
+
+
+def track_image_blob(sender, instance, **kwargs):
+    """
+    Keep blob reference counts in step with the file each image points at.
+    """
+    name, previous = instance.image.name, getattr(instance, '_loaded_image', None)
+    if name != previous:
+        if name:
+            acquire_blob(instance.image.storage, name, instance.image)
+        if previous:
+            release_blob(previous)
+        instance._loaded_image = name
+
+
+def release_image_blob(sender, instance, **kwargs):
+    """
+    A deleted image no longer references its blob. The file itself is
+    removed by the sweeper once no image uses it.
+    """
+    release_blob(getattr(instance, '_loaded_image', instance.image.name))
+
+
+def invalidate_property_tiles(sender, instance, **kwargs):
+    """
+    Drop the cached map tiles that showed the property before and after
+    the change.
+    """
+    if 'location' in instance.get_deferred_fields():
+        # Loading it would cost the query dirty tracking avoids; the tiles
+        # expire on their own
+        return
+    # post_save runs before save() refreshes `_loaded_location`, so it still
+    # holds the location the row had before this save
+    locations = (instance.location, getattr(instance, '_loaded_location', None))
+    # Tiles are rendered from the search index, so only invalidate them
+    # after the index entry has been refreshed on commit
+    transaction.on_commit(lambda: invalidate_tiles(*locations))
+
+
+def queue_address_geocoding(sender, instance, **kwargs):
+    """
+    Hand properties waiting for an address to the geocoding worker once
+    the transaction that saved them commits.
+    """
+    if instance.address_pending:
+        transaction.on_commit(schedule_address_geocoding)
+
+
+def queue_duplicate_detection(sender, instance, update_fields=None, **kwargs):
+    """
+    Check saved properties for duplicates once their description or
+    location changed. post_save runs before save() refreshes the loaded
+    values, so they still hold the ones the row had before this save.
+    """
+    if instance.has_description_changed(update_fields) or instance.has_location_changed(update_fields):
+        transaction.on_commit(lambda: detect_duplicate_listings.delay([str(instance.pk)]))
+
+
+def record_price_change(sender, instance, created=False, update_fields=None, **kwargs):
+    """
+    Append the new price of a home or apartment to its price history,
+    only when it actually changed.
+    """
+    if instance.has_price_changed(update_fields):
+        previous_price = None if created else getattr(instance, '_loaded_price', None)
+        listed = is_publicly_listed(instance) and (
+            created or not BannedProperty.objects.filter(property_id=instance.pk).exists()
+        )
+        price_change(instance, previous_price, listed).save()
+
+
+def record_delisting(sender, instance, **kwargs):
+    """
+    The price history outlives a deleted listing, which from then on no
+    longer counts towards its area's price statistics.
+    """
+    if not {'price', 'location'} & instance.get_deferred_fields():
+        price_change(instance, instance.price, listed=False).save()
+
+
+def invalidate_banned_property_tiles(sender, instance, **kwargs):
+    """
+    Banning or unbanning changes whether a property is drawn on the map.
+    """
+    location = instance.property.location
+    transaction.on_commit(lambda: invalidate_tiles(location))
+
+
+def invalidate_user_bookmarks(sender, instance, **kwargs):
+    """
+    Bookmarks changed one at a time, e.g. in the admin, also refresh the
+    user's cached bookmark set.
+    """
+    invalidate_bookmarks(instance.user_id)
+
+
+def connect_signals():
+    # Signals are sent with the concrete class, so connect every
+    # Property model explicitly. The search index handlers are connected
+    # first so their on_commit refresh runs before the tile invalidation.
+    for model in (Property, HomeProperty, ApartmentProperty):
+        post_save.connect(refresh_property_search_index, sender=model, dispatch_uid=f"search-index-save-{model.__name__}")
+        post_save.connect(invalidate_property_tiles, sender=model, dispatch_uid=f"tiles-save-{model.__name__}")
+        post_delete.connect(invalidate_property_tiles, sender=model, dispatch_uid=f"tiles-delete-{model.__name__}")
+        post_save.connect(queue_address_geocoding, sender=model, dispatch_uid=f"geocode-save-{model.__name__}")
+        post_save.connect(queue_duplicate_detection, sender=model, dispatch_uid=f"duplicates-save-{model.__name__}")
+    for model in (HomeProperty, ApartmentProperty):
+        post_save.connect(record_price_change, sender=model, dispatch_uid=f"price-history-save-{model.__name__}")
+        post_delete.connect(record_delisting, sender=model, dispatch_uid=f"price-history-delete-{model.__name__}")
+    for model in (HomePropertyBedroom, PropertyImage, BannedProperty, VerifiedProperty):
+        post_save.connect(refresh_related_search_index, sender=model, dispatch_uid=f"search-index-save-{model.__name__}")
+        post_delete.connect(refresh_related_search_index, sender=model, dispatch_uid=f"search-index-delete-{model.__name__}")
+    post_save.connect(queue_image_variants, sender=PropertyImage, dispatch_uid="variants-save-PropertyImage")
+    post_save.connect(track_image_blob, sender=PropertyImage, dispatch_uid="blobs-save-PropertyImage")
+    post_delete.connect(release_image_blob, sender=PropertyImage, dispatch_uid="blobs-delete-PropertyImage")
+    post_save.connect(invalidate_banned_property_tiles, sender=BannedProperty, dispatch_uid="tiles-save-BannedProperty")
+    post_delete.connect(invalidate_banned_property_tiles, sender=BannedProperty, dispatch_uid="tiles-delete-BannedProperty")
+    post_save.connect(invalidate_user_bookmarks, sender=BookmarkedProperty, dispatch_uid="bookmarks-save-BookmarkedProperty")
+    post_delete.connect(invalidate_user_bookmarks, sender=BookmarkedProperty, dispatch_uid="bookmarks-delete-BookmarkedProperty")
@@ -0,0 +1,57 @@
+from django.conf import settings
+import logging
+
+from utilities.perceptual_hash import hamming_distance, hash_detail, probe_bands
+from .models import PropertyImage, SimilarImageFlag
+
+
+logger = logging.getLogger("django")
+
+
+def find_similar_images(image):
+    """
+    Images of other stakeholders whose photo is within
+    IMAGE_SIMILARITY_MAX_DISTANCE bits of `image`, as `(image, distance)`.
+
+    Candidates share a (nearly) equal 16 bit band with the hash and are
+    found through the GIN index on `dhash_bands`, so the lookup never
+    compares against the whole library.
+
+    Hashes with less than IMAGE_SIMILARITY_MIN_DETAIL bits of detail
+    (see `hash_detail`) are not matched: low-detail photos all look alike
+    to a difference hash.
+    """
+    if image.dhash is None or hash_detail(image.dhash) < getattr(settings, 'IMAGE_SIMILARITY_MIN_DETAIL', 8):
+        return []
+    max_distance = getattr(settings, 'IMAGE_SIMILARITY_MAX_DISTANCE', 6)
+    candidates = PropertyImage.objects.filter(
+        dhash_bands__overlap=probe_bands(image.dhash, radius=0 if max_distance < 4 else 1),
+    ).exclude(
+        property__listed_by_id=image.property.listed_by_id,
+    ).only('id', 'dhash')
+
+    matches = []
+    for candidate in candidates:
+        distance = hamming_distance(image.dhash, candidate.dhash)
+        if distance <= max_distance:
+            matches.append((candidate, distance))
+    return matches
+
+
+def flag_similar_images(image):
+    """
+    Record a SimilarImageFlag for every near match of `image`. Each pair
+    is stored once, with the newer image (the higher id) as `image`,
+    whichever of the two is being checked.
+    """
+    matches = find_similar_images(image)
+    SimilarImageFlag.objects.bulk_create(
+        [
+            SimilarImageFlag(image_id=max(image.pk, match.pk), similar_image_id=min(image.pk, match.pk), distance=distance)
+            for match, distance in matches
+        ],
+        ignore_conflicts=True,
+    )
+    if matches:
+        logger.info(f"Property image {image.pk} nearly matches {len(matches)} images of other stakeholders")
+    return matches
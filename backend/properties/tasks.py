@@ -0,0 +1,248 @@
+from collections import defaultdict
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from datetime import timedelta
+import logging
+
+from .blobs import record_derived_files
+from .duplicates import flag_duplicate_listings, update_description_signatures
+from .geocoding import GeocodingError, reverse_geocoder
+from .images import generate_variants, variant_files
+from .models import ImageBlob, Property, PropertyImage
+from .price_history import update_price_statistics
+from .search_index import queue_search_index_refresh
+from .similarity import flag_similar_images
+
+
+logger = logging.getLogger("django")
+
+
+GEOCODE_TASK_LOCK_KEY = "geocode-pending-addresses:scheduled"
+GEOCODE_RETRY_LOCK_KEY = "geocode-pending-addresses:retry"
+
+
+def schedule_address_geocoding():
+    """
+    Queue a geocoding run for pending addresses.
+    Saves arriving within GEOCODE_BATCH_DELAY seconds of each other share
+    one run, so a burst of saves is geocoded as a single batch.
+    """
+    delay = getattr(settings, 'GEOCODE_BATCH_DELAY', 5)
+    if cache.add(GEOCODE_TASK_LOCK_KEY, True, timeout=delay):
+        geocode_pending_addresses.apply_async(countdown=delay)
+
+
+def geocode_retry_delay(failures):
+    """
+    Seconds before addresses that failed to resolve are tried again,
+    doubling with each consecutive failed run up to GEOCODE_RETRY_MAX_DELAY.
+    """
+    delay = getattr(settings, 'GEOCODE_RETRY_DELAY', 60) * 2 ** failures
+    return min(delay, getattr(settings, 'GEOCODE_RETRY_MAX_DELAY', 60 * 60))
+
+
+@shared_task(ignore_result=True)
+def geocode_pending_addresses(batch_size=None, failures=0):
+    """
+    Resolve the address of properties saved with `address_pending` and
+    write them back with a single bulk update.
+    Properties sharing a geocode cache cell are resolved once.
+
+    Properties whose lookup fails get a `geocode_retry_at` and wait until
+    then behind the rest of the queue, so an outage of the geocoding
+    service backs off instead of retrying the same rows in a loop.
+    `failures` counts the consecutive runs that resolved nothing.
+    """
+    batch_size = batch_size or getattr(settings, 'GEOCODE_BATCH_SIZE', 500)
+    now = timezone.now()
+    pending = list(
+        Property.objects.filter(Q(geocode_retry_at__isnull=True) | Q(geocode_retry_at__lte=now), address_pending=True)
+        .only('id', 'location')
+        .order_by(F('geocode_retry_at').asc(nulls_first=True), 'updated_at')[:batch_size]
+    )
+    if not pending:
+        return
+
+    groups = defaultdict(list)
+    for prop in pending:
+        groups[reverse_geocoder.cache_key(prop.location.y, prop.location.x)].append(prop)
+
+    addresses, failed = {}, []
+    for props in groups.values():
+        location = props[0].location
+        try:
+            address = reverse_geocoder.resolve(location.y, location.x)
+        except GeocodingError as e:
+            # Leave the rows pending; they are retried after a delay
+            logger.error(f"Error during reverse geocoding: {e}")
+            failed.extend(prop.pk for prop in props)
+            continue
+        for prop in props:
+            addresses[prop.pk] = (prop.location, address)
+    reverse_geocoder.publish_stats()
+
+    with transaction.atomic():
+        # Lock the rows and skip any whose location changed while the
+        # lookups were running; their new save has queued another run.
+        current = Property.objects.select_for_update(skip_locked=True).filter(
+            pk__in=addresses, address_pending=True,
+        ).only('id', 'location', 'address', 'address_pending')
+        resolved = []
+        for prop in current:
+            location, address = addresses[prop.pk]
+            if prop.location != location:
+                continue
+            if address:
+                prop.address = address
+            prop.address_pending = False
+            resolved.append(prop)
+        Property.objects.bulk_update(resolved, ['address', 'address_pending'])
+        # bulk_update() sends no signals
+        queue_search_index_refresh(*(prop.pk for prop in resolved))
+
+    logger.info(f"Geocoded {len(resolved)} of {len(pending)} pending property addresses")
+
+    if failed:
+        # Runs that resolve nothing back off further each time
+        failures = 0 if resolved else failures + 1
+        delay = geocode_retry_delay(failures)
+        Property.objects.filter(pk__in=failed, address_pending=True).update(
+            geocode_retry_at=now + timedelta(seconds=delay),
+        )
+        if cache.add(GEOCODE_RETRY_LOCK_KEY, True, timeout=delay):
+            geocode_pending_addresses.apply_async((batch_size, failures), countdown=delay)
+
+    if resolved and len(pending) == batch_size:
+        # There may be more waiting
+        geocode_pending_addresses.delay(batch_size)
+
+
+@shared_task(ignore_result=True)
+def generate_image_variants(image_id):
+    """
+    Generate the resized WebP/JPEG variants of a property image, record its
+    dimensions, BlurHash placeholder and perceptual hash, and flag it when
+    it nearly matches another stakeholder's photo. Runs after the upload
+    request, whenever the stored image differs from the one the current
+    variants were made from.
+    """
+    image = PropertyImage.objects.select_related('property').filter(pk=image_id).first()
+    if image is None or not image.image or image.image.name == image.variants_source:
+        return
+    name = image.image.name
+
+    # Images sharing a blob share its variants, so only the first one
+    # processed does the work
+    processed = PropertyImage.objects.filter(
+        image=name, variants_source=name,
+    ).values('width', 'height', 'blurhash', 'dhash', 'dhash_bands', 'variants').first()
+    if processed is None:
+        try:
+            processed = generate_variants(image.image)
+        except (OSError, SyntaxError, ValueError) as e:
+            # Pillow raises these for missing, truncated or unsupported files
+            logger.error(f"Could not generate variants for property image {image_id}: {e}")
+            return
+        record_derived_files(name, variant_files(processed['variants']))
+
+    # Only store the variants if the image was not replaced meanwhile; the
+    # replacement has queued its own run. Variant files belong to the blob
+    # and are removed with it.
+    updated = PropertyImage.objects.filter(pk=image_id, image=name).update(
+        variants_source=name, **processed,
+    )
+    if updated:
+        # update() sends no signals
+        queue_search_index_refresh(image.property_id)
+        image.dhash = processed['dhash']
+        flag_similar_images(image)
+
+
+@shared_task(ignore_result=True)
+def sweep_image_blobs(batch_size=None):
+    """
+    Delete image blobs, with their variants, that no PropertyImage has
+    referenced for IMAGE_BLOB_GRACE_PERIOD seconds.
+    """
+    batch_size = batch_size or getattr(settings, 'IMAGE_BLOB_SWEEP_BATCH_SIZE', 500)
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'IMAGE_BLOB_GRACE_PERIOD', 60 * 60 * 24))
+    storage = PropertyImage._meta.get_field('image').storage
+
+    with transaction.atomic():
+        blobs = list(
+            ImageBlob.objects.select_for_update(skip_locked=True)
+            .filter(ref_count__lte=0, unreferenced_at__lt=cutoff)[:batch_size]
+        )
+        ImageBlob.objects.filter(pk__in=[blob.pk for blob in blobs]).delete()
+        # Remove the files while the rows are still locked: an upload of the
+        # same content waits in acquire_blob() until this commits, then
+        # finds the file gone and writes it again
+        for blob in blobs:
+            for name in (blob.name, *blob.derived_files):
+                storage.delete(name)
+
+    logger.info(f"Swept {len(blobs)} unreferenced image blobs")
+
+    if len(blobs) == batch_size:
+        sweep_image_blobs.delay(batch_size)
+
+
+@shared_task(ignore_result=True)
+def detect_duplicate_listings(property_ids):
+    """
+    Refresh the description signatures of the given properties and flag
+    the nearby listings they likely duplicate.
+    """
+    properties = list(
+        Property.objects.filter(pk__in=property_ids, is_deleted=False)
+        .only('id', 'location', 'description', 'created_at')
+    )
+    # bulk_update() sends no signals, so this does not queue another run
+    update_description_signatures(properties)
+    flagged = sum(len(flag_duplicate_listings(prop)) > 0 for prop in properties)
+    logger.info(f"Checked {len(properties)} properties for duplicates, {flagged} have likely duplicates")
+
+
+@shared_task(ignore_result=True)
+def detect_recent_duplicate_listings(batch_size=None):
+    """
+    Nightly pass over the properties changed within
+    DUPLICATE_LISTING_SCAN_WINDOW seconds, or never checked, handed to
+    detect_duplicate_listings in batches.
+    Catches changes whose per-save check was lost, and backfills
+    signatures for listings created before detection existed.
+    """
+    batch_size = batch_size or getattr(settings, 'DUPLICATE_LISTING_BATCH_SIZE', 500)
+    since = timezone.now() - timedelta(seconds=getattr(settings, 'DUPLICATE_LISTING_SCAN_WINDOW', 60 * 60 * 25))
+    property_ids = (
+        Property.objects.filter(Q(updated_at__gte=since) | Q(duplicates_checked_at__isnull=True), is_deleted=False)
+        .order_by('pk').values_list('pk', flat=True)
+    )
+
+    batch, queued = [], 0
+    for property_id in property_ids.iterator(chunk_size=batch_size):
+        batch.append(str(property_id))
+        if len(batch) == batch_size:
+            detect_duplicate_listings.delay(batch)
+            queued, batch = queued + len(batch), []
+    if batch:
+        detect_duplicate_listings.delay(batch)
+        queued += len(batch)
+
+    logger.info(f"Queued duplicate detection for {queued} properties")
+
+
+@shared_task(ignore_result=True)
+def rollup_price_history(full=False):
+    """
+    Refresh the monthly price statistics touched by price changes of the
+    last PRICE_ROLLUP_WINDOW seconds. The window is longer than the beat
+    interval so changes committed late are still picked up. `full`
+    recomputes every month, e.g. after backfilling history.
+    """
+    since = None if full else timezone.now() - timedelta(seconds=getattr(settings, 'PRICE_ROLLUP_WINDOW', 60 * 60 * 2))
+    update_price_statistics(since)
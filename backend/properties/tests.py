@@ -1,3 +1,283 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from io import BytesIO, StringIO
+from pathlib import Path
+from PIL import Image
+from unittest import mock
+import json
+import tempfile
 
-# Create your tests here.
+from accounts.models import StakeholderAccount, User
+from .bookmarks import add_bookmarks, bookmark_version_key, bookmarked_ids
+from .geo import make_point
+from .geocoding import GeocodingError, reverse_geocoder
+from .models import (
+    ApartmentProperty, BannedProperty, ImageBlob, PriceChange, Property, PropertyImage, PropertySearchIndex,
+)
+from .search_index import rebuild_search_index
+from .tasks import geocode_pending_addresses, geocode_retry_delay, sweep_image_blobs
+
+
+def png_bytes(colour):
+    output = BytesIO()
+    Image.new('RGB', (8, 8), colour).save(output, format='PNG')
+    return output.getvalue()
+
+
+class PropertyTestCase(TestCase):
+    """
+    Background tasks are not queued; tests call the ones they cover.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(email="agent@example.com")
+        cls.stakeholder = StakeholderAccount.objects.create(user=user)
+        cls.user = User.objects.create_user(email="buyer@example.com")
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch('celery.app.task.Task.apply_async')
+        self.apply_async = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_listing(self, **fields):
+        values = {
+            'description': "Bright two bedroom apartment close to the station",
+            'address': "1 Marina Road",
+            'location': make_point(6.45, 3.39),
+            'price': Decimal('150000.00'),
+            'listed_by': self.stakeholder,
+            **fields,
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            return ApartmentProperty.objects.create(**values)
+
+
+class SearchIndexSyncTests(PropertyTestCase):
+    def test_save_writes_the_entry(self):
+        listing = self.create_listing()
+        entry = PropertySearchIndex.objects.get(pk=listing.pk)
+        self.assertEqual(entry.property_type, 'apartment')
+        self.assertEqual(entry.price, Decimal('150000.00'))
+        self.assertTrue(PropertySearchIndex.objects.listed().filter(pk=listing.pk).exists())
+
+        listing.price = Decimal('120000.00')
+        listing.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            listing.save()
+        entry.refresh_from_db()
+        self.assertEqual(entry.price, Decimal('120000.00'))
+        self.assertFalse(PropertySearchIndex.objects.listed().filter(pk=listing.pk).exists())
+
+    def test_ban_and_delete_remove_the_listing(self):
+        listing = self.create_listing()
+        with self.captureOnCommitCallbacks(execute=True):
+            BannedProperty.objects.create(property=listing, banned_by=self.user, reason="Spam")
+        self.assertTrue(PropertySearchIndex.objects.get(pk=listing.pk).is_banned)
+        self.assertFalse(PriceChange.objects.filter(property_id=listing.pk).order_by('-recorded_at', '-pk')[0].is_listed)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            listing.delete()
+        self.assertFalse(PropertySearchIndex.objects.filter(pk=listing.pk).exists())
+        # The price history outlives the listing
+        self.assertTrue(PriceChange.objects.filter(property_id=listing.pk).exists())
+
+    def test_rebuild(self):
+        listing = self.create_listing()
+        PropertySearchIndex.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn("Indexed 1 properties", out.getvalue())
+        self.assertEqual(PropertySearchIndex.objects.get().pk, listing.pk)
+
+        # Changes made without signals are picked up too
+        Property.objects.filter(pk=listing.pk).update(is_deleted=True)
+        self.assertEqual(rebuild_search_index(), 1)
+        self.assertFalse(PropertySearchIndex.objects.listed().exists())
+
+
+class ImportListingsTests(PropertyTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        media = override_settings(MEDIA_ROOT=self.directory / "media")
+        media.enable()
+        self.addCleanup(media.disable)
+        (self.directory / "front.png").write_bytes(png_bytes((200, 30, 30)))
+
+    def import_rows(self, rows, *args):
+        path = self.directory / "listings.jsonl"
+        path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+        out, err = StringIO(), StringIO()
+        call_command('import_listings', str(path), '--images-root', str(self.directory), *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def row(self, **fields):
+        return {
+            'property_type': 'apartment',
+            'description': "Quiet studio near the park",
+            'price': "90000.00",
+            'latitude': 6.5,
+            'longitude': 3.4,
+            'listed_by': self.stakeholder.user.email,
+            **fields,
+        }
+
+    def test_imports_valid_rows_and_skips_the_rest(self):
+        out, err = self.import_rows([
+            self.row(images=["front.png"]),
+            self.row(latitude=None),
+            self.row(listed_by="nobody@example.com"),
+            self.row(property_type='castle'),
+        ])
+        self.assertIn("Imported 1 listings", out)
+        self.assertIn("skipped 2 invalid rows", out)
+        self.assertIn("latitude and longitude are required", err)
+        self.assertIn("No stakeholder account for nobody@example.com", err)
+
+        listing = ApartmentProperty.objects.get()
+        self.assertTrue(listing.address_pending)
+        self.assertEqual(PriceChange.objects.get(property_id=listing.pk).price, Decimal('90000.00'))
+        image = listing.images.get()
+        self.assertTrue(image.is_primary)
+        self.assertEqual(ImageBlob.objects.get().ref_count, 1)
+        self.assertFalse((self.directory / "listings.jsonl.import-state").exists())
+
+    def test_resume_skips_imported_rows(self):
+        (self.directory / "listings.jsonl.import-state").write_text(json.dumps({'rows': 1}))
+        out, _ = self.import_rows([self.row(description="First"), self.row(description="Second")], '--resume')
+        self.assertIn("Resuming after row 1", out)
+        self.assertEqual(list(ApartmentProperty.objects.values_list('description', flat=True)), ["Second"])
+        self.assertFalse((self.directory / "listings.jsonl.import-state").exists())
+
+
+class ImageBlobTests(PropertyTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        media = override_settings(MEDIA_ROOT=directory.name)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.listing = self.create_listing()
+        self.storage = PropertyImage._meta.get_field('image').storage
+
+    def add_image(self, content):
+        image = PropertyImage(property=self.listing)
+        image.image.save("photo.png", ContentFile(content), save=False)
+        image.save()
+        return image
+
+    def test_identical_uploads_share_a_counted_blob(self):
+        first = self.add_image(png_bytes((10, 120, 200)))
+        second = self.add_image(png_bytes((10, 120, 200)))
+        self.assertEqual(first.image.name, second.image.name)
+        blob = ImageBlob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+
+        first.delete()
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 1)
+        self.assertIsNone(blob.unreferenced_at)
+        second.delete()
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 0)
+        self.assertIsNotNone(blob.unreferenced_at)
+
+    def test_replacing_the_file_moves_the_reference(self):
+        image = self.add_image(png_bytes((10, 120, 200)))
+        previous = image.image.name
+        image.image.save("photo.png", ContentFile(png_bytes((250, 250, 0))), save=False)
+        image.save()
+        self.assertEqual(dict(ImageBlob.objects.values_list('name', 'ref_count')), {previous: 0, image.image.name: 1})
+
+    def test_sweeper_removes_unreferenced_blobs_after_the_grace_period(self):
+        kept = self.add_image(png_bytes((1, 2, 3)))
+        recent = self.add_image(png_bytes((4, 5, 6)))
+        old = self.add_image(png_bytes((7, 8, 9)))
+        names = {image.pk: image.image.name for image in (kept, recent, old)}
+        self.storage.save_derived(names[old.pk] + ".webp", ContentFile(b"variant"))
+        ImageBlob.objects.filter(name=names[old.pk]).update(derived_files=[names[old.pk] + ".webp"])
+        recent.delete()
+        old.delete()
+        ImageBlob.objects.filter(name=names[old.pk]).update(unreferenced_at=timezone.now() - timedelta(days=2))
+
+        sweep_image_blobs()
+        self.assertEqual(set(ImageBlob.objects.values_list('name', flat=True)), {names[kept.pk], names[recent.pk]})
+        self.assertTrue(self.storage.exists(names[kept.pk]))
+        self.assertTrue(self.storage.exists(names[recent.pk]))
+        self.assertFalse(self.storage.exists(names[old.pk]))
+        self.assertFalse(self.storage.exists(names[old.pk] + ".webp"))
+
+    def test_upload_after_a_sweep_writes_the_file_again(self):
+        image = self.add_image(png_bytes((90, 90, 90)))
+        name = image.image.name
+        image.delete()
+        ImageBlob.objects.update(unreferenced_at=timezone.now() - timedelta(days=2))
+        sweep_image_blobs()
+        self.assertFalse(self.storage.exists(name))
+
+        again = self.add_image(png_bytes((90, 90, 90)))
+        self.assertEqual(again.image.name, name)
+        self.assertTrue(self.storage.exists(name))
+        self.assertEqual(ImageBlob.objects.get().ref_count, 1)
+
+
+class GeocodeWorkerTests(PropertyTestCase):
+    def test_resolves_pending_addresses(self):
+        listing = self.create_listing(address="")
+        self.assertTrue(listing.address_pending)
+        with mock.patch.object(reverse_geocoder, 'resolve', return_value="12 Marina Road, Lagos") as resolve:
+            with self.captureOnCommitCallbacks(execute=True):
+                geocode_pending_addresses()
+        resolve.assert_called_once()
+        listing.refresh_from_db()
+        self.assertEqual(listing.address, "12 Marina Road, Lagos")
+        self.assertFalse(listing.address_pending)
+        self.assertEqual(PropertySearchIndex.objects.get(pk=listing.pk).address, "12 Marina Road, Lagos")
+
+    def test_failures_back_off(self):
+        listing = self.create_listing(address="")
+        self.apply_async.reset_mock()
+        with mock.patch.object(reverse_geocoder, 'resolve', side_effect=GeocodingError("timeout")) as resolve:
+            geocode_pending_addresses()
+            listing.refresh_from_db()
+            self.assertTrue(listing.address_pending)
+            self.assertGreater(listing.geocode_retry_at, timezone.now())
+            self.apply_async.assert_called_once_with((500, 1), countdown=geocode_retry_delay(1))
+
+            # Nothing is due until the retry time
+            geocode_pending_addresses()
+            self.assertEqual(resolve.call_count, 1)
+
+        # Moving the listing makes it due right away
+        listing.location = make_point(6.46, 3.40)
+        listing.save()
+        self.assertIsNone(listing.geocode_retry_at)
+
+
+class BookmarkCacheTests(PropertyTestCase):
+    def test_bookmarks_are_cached_until_they_change(self):
+        listing = self.create_listing()
+        self.assertEqual(bookmarked_ids(self.user), frozenset())
+        with self.assertNumQueries(0):
+            self.assertEqual(bookmarked_ids(self.user), frozenset())
+
+        version = cache.get(bookmark_version_key(self.user.pk))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(add_bookmarks(self.user, [listing.pk]), [listing.pk])
+        self.assertNotEqual(cache.get(bookmark_version_key(self.user.pk)), version)
+        self.assertEqual(bookmarked_ids(self.user), frozenset({listing.pk}))
+
+    def test_only_listed_properties_are_bookmarked(self):
+        inactive = self.create_listing(is_active=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(add_bookmarks(self.user, [inactive.pk]), [])
+        self.assertEqual(bookmarked_ids(self.user), frozenset())
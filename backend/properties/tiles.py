@@ -0,0 +1,97 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from .geo import WEB_MERCATOR_EXTENT, tiles_near_lnglat
+from .models import PropertySearchIndex
+
+
+TILE_CACHE_PREFIX = "property-tile"
+
+# The mercator expression must stay identical to the one indexed by
+# `search_location_3857_gist` for the `&&` test to use the index.
+TILE_SQL = """
+WITH bounds AS (
+    SELECT ST_TileEnvelope(%(zoom)s, %(x)s, %(y)s) AS geom
+),
+features AS (
+    SELECT
+        ST_AsMVTGeom(
+            ST_Transform((entry.location)::geometry(GEOMETRY,4326), 3857),
+            bounds.geom, %(extent)s, %(buffer)s, true
+        ) AS geom,
+        entry.property_id::text AS id,
+        entry.property_type,
+        entry.price::float8 AS price,
+        entry.list_type,
+        entry.home_type,
+        entry.apartment_type
+    FROM {search_index} AS entry
+    CROSS JOIN bounds
+    WHERE ST_Transform((entry.location)::geometry(GEOMETRY,4326), 3857)
+            && ST_Expand(bounds.geom, %(margin)s)
+        AND entry.is_active
+        AND NOT entry.is_deleted
+        AND NOT entry.is_banned
+)
+SELECT ST_AsMVT(features.*, 'properties', %(extent)s, 'geom') FROM features
+""".format(
+    search_index=PropertySearchIndex._meta.db_table,
+)
+
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+
+
+def tile_cache_key(zoom, x, y):
+    return f"{TILE_CACHE_PREFIX}:{zoom}:{x}:{y}"
+
+
+def render_tile(zoom, x, y):
+    """
+    Build the Mapbox Vector Tile for one XYZ tile with ST_AsMVT.
+    """
+    # Widen the index test by the tile buffer so points just outside the
+    # tile edge are still clipped into the buffer like the client expects.
+    tile_size = 2 * WEB_MERCATOR_EXTENT / (1 << zoom)
+    params = {
+        'zoom': zoom,
+        'x': x,
+        'y': y,
+        'extent': TILE_EXTENT,
+        'buffer': TILE_BUFFER,
+        'margin': tile_size * TILE_BUFFER / TILE_EXTENT,
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(TILE_SQL, params)
+        row = cursor.fetchone()
+    return bytes(row[0]) if row and row[0] is not None else b""
+
+
+def get_tile(zoom, x, y):
+    """
+    Cached vector tile bytes for one XYZ tile.
+    """
+    key = tile_cache_key(zoom, x, y)
+    tile = cache.get(key)
+    if tile is None:
+        tile = render_tile(zoom, x, y)
+        cache.set(key, tile, timeout=getattr(settings, 'PROPERTY_TILE_CACHE_TIMEOUT', 3600))
+    return tile
+
+
+def invalidate_tiles(*locations):
+    """
+    Drop the cached tiles, at every served zoom level, that draw any of
+    `locations`: the tile containing it and the neighbours whose buffer
+    it falls in.
+    """
+    max_zoom = getattr(settings, 'PROPERTY_TILE_MAX_ZOOM', 20)
+    keys = {
+        tile_cache_key(zoom, x, y)
+        for location in locations if location is not None
+        for zoom in range(max_zoom + 1)
+        for x, y in tiles_near_lnglat(location.x, location.y, zoom, TILE_BUFFER / TILE_EXTENT)
+    }
+    if keys:
+        cache.delete_many(list(keys))
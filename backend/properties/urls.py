@@ -0,0 +1,14 @@
+from django.urls import path
+from .views import BookmarkViewSet, GeocodeCacheStatsView, PropertyViewSet, PropertyTileView
+from rest_framework.routers import DefaultRouter
+
+
+router = DefaultRouter()
+
+router.register(r'bookmarks', BookmarkViewSet, basename='bookmark')
+router.register(r'', PropertyViewSet, basename='property')
+
+urlpatterns = [
+    path('tiles/<int:z>/<int:x>/<int:y>.mvt', PropertyTileView.as_view(), name='property-tile'),
+    path('geocoding/cache-stats/', GeocodeCacheStatsView.as_view(), name='geocode-cache-stats'),
+] + router.urls
@@ -1,3 +1,264 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from datetime import timedelta
+from rest_framework import viewsets, views
+from rest_framework import permissions
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.request import Request
+from rest_framework.response import Response
+from drf_yasg.utils import swagger_auto_schema
+from .bookmarks import add_bookmarks, bookmarked_ids, remove_bookmarks
+from .clustering import clusters_for_bbox
+from .facets import get_facet_counts
+from .geo import make_point
+from .geocoding import reverse_geocoder
+from .models import BookmarkedProperty, PriceChange, PriceStatistic, PropertySearchIndex
+from .search_index import SEARCH_INDEX_FIELDS
+from .tiles import get_tile
+from .serializers import PropertySearchQuerySerializer, PropertySearchSerializer
+from .serializers import PropertyClusterQuerySerializer, PropertyClusterResponseSerializer
+from .serializers import PropertyFilterSerializer, PropertyFacetSerializer
+from .serializers import BookmarkIdsSerializer, BookmarkRequestSerializer, BookmarkSerializer
+from .serializers import PriceChangeSerializer, PriceStatisticQuerySerializer, PriceStatisticSerializer
+from .serializers import GeocodeCacheStatsSerializer
 
-# Create your views here.
+
+class PropertyViewSet(viewsets.mixins.ListModelMixin,
+                      viewsets.mixins.RetrieveModelMixin,
+                      viewsets.GenericViewSet):
+    queryset = PropertySearchIndex.objects.listed().defer('search_vector')
+    lookup_field = 'pk'
+    lookup_url_kwarg = 'pk'
+    lookup_value_regex = '[0-9a-f-]{36}'
+    serializer_class = PropertySearchSerializer
+    permission_classes = [permissions.AllowAny]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action != 'list':
+            return queryset
+
+        params = PropertySearchQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+        queryset = queryset.apply_filters(filters)
+        if filters.get('q'):
+            queryset = queryset.search(filters['q'])
+
+        if 'latitude' in filters:
+            point = make_point(filters['latitude'], filters['longitude'])
+            queryset = queryset.nearest(point, radius_km=filters['radius_km'])
+        elif filters.get('q'):
+            queryset = queryset.order_by('-rank', 'pk')
+        else:
+            # Browsing the feed is paged by the keyset paginator
+            return queryset
+
+        return queryset[:filters['limit']]
+
+    def paginate_queryset(self, queryset):
+        # Distance and relevance ordered searches are capped by `limit`
+        # rather than paged, since their order has no stable keyset
+        if queryset.query.is_sliced:
+            return None
+        return super().paginate_queryset(queryset)
+
+    @swagger_auto_schema(query_serializer=PropertySearchQuerySerializer)
+    def list(self, request, *args, **kwargs):
+        """
+        Search listed properties.
+        When `latitude` and `longitude` are given, only properties within
+        `radius_km` are returned, nearest first, with their distance.
+        `q` matches address and description, tolerating typos in the
+        address; without a location, matches are ordered by relevance.
+        Otherwise the newest properties come first, paged with `cursor`.
+        """
+        return super().list(request, *args, **kwargs)
+
+    @action(methods=['GET'], detail=False, url_path='clusters')
+    @swagger_auto_schema(
+        query_serializer=PropertyClusterQuerySerializer,
+        responses={
+            status.HTTP_200_OK: PropertyClusterResponseSerializer,
+        }
+    )
+    def clusters(self, request: Request, *args, **kwargs):
+        """
+        Map pins for a viewport.
+        Properties are grouped into grid clusters (count, centroid and price
+        range) until `zoom` reaches PROPERTY_CLUSTER_MAX_ZOOM, after which the
+        individual properties are returned.
+        """
+        params = PropertyClusterQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = {
+            key: value for key, value in params.validated_data.items() if key not in ('bbox', 'zoom')
+        }
+        queryset = self.get_queryset().apply_filters(filters)
+        result = clusters_for_bbox(
+            queryset, params.validated_data['bbox'], params.validated_data['zoom'], filters)
+        return Response(PropertyClusterResponseSerializer(result).data, status=status.HTTP_200_OK)
+
+    @action(methods=['GET'], detail=False, url_path='facets')
+    @swagger_auto_schema(
+        query_serializer=PropertyFilterSerializer,
+        responses={
+            status.HTTP_200_OK: PropertyFacetSerializer,
+        }
+    )
+    def facets(self, request: Request, *args, **kwargs):
+        """
+        Result counts for every filter option under the current filters.
+        Each facet's counts ignore that facet's own filter, so they show what
+        selecting another option would return.
+        """
+        params = PropertyFilterSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        counts = get_facet_counts(params.validated_data)
+        return Response(PropertyFacetSerializer(counts).data, status=status.HTTP_200_OK)
+
+    @action(methods=['GET'], detail=False, url_path='price-stats')
+    @swagger_auto_schema(
+        query_serializer=PriceStatisticQuerySerializer,
+        responses={
+            status.HTTP_200_OK: PriceStatisticSerializer(many=True),
+        }
+    )
+    def price_stats(self, request: Request, *args, **kwargs):
+        """
+        Monthly price distribution (count, quartiles and range) of the
+        listings priced in an area over the last `months` months.
+        The area is a geohash cell, given directly or by a point inside it.
+        Statistics are precomputed rollups, refreshed every hour.
+        """
+        params = PriceStatisticQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+        start = timezone.localdate().replace(day=1)
+        for _ in range(filters['months'] - 1):
+            start = (start - timedelta(days=1)).replace(day=1)
+        statistics = PriceStatistic.objects.filter(area=filters['area'], month__gte=start)
+        for name in ('property_type', 'list_type'):
+            if filters.get(name):
+                statistics = statistics.filter(**{name: filters[name]})
+        return Response(PriceStatisticSerializer(statistics, many=True).data, status=status.HTTP_200_OK)
+
+    @action(methods=['GET'], detail=True, url_path='price-history')
+    @swagger_auto_schema(
+        responses={
+            status.HTTP_200_OK: PriceChangeSerializer(many=True),
+        }
+    )
+    def price_history(self, request: Request, *args, **kwargs):
+        """
+        Every price the property was listed at, newest first. The oldest
+        entry marks when it came on the market; entries with `is_listed`
+        false when it was taken off it.
+        """
+        listing = self.get_object()
+        changes = PriceChange.objects.filter(property_id=listing.pk)
+        return Response(PriceChangeSerializer(changes, many=True).data, status=status.HTTP_200_OK)
+
+
+class BookmarkViewSet(viewsets.mixins.ListModelMixin,
+                      viewsets.GenericViewSet):
+    serializer_class = BookmarkSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        # Bookmarks of properties that were delisted since are hidden
+        return BookmarkedProperty.objects.filter(
+            user_id=self.request.user.pk,
+            property__search_index__in=PropertySearchIndex.objects.listed(),
+        ).select_related('property__search_index').only(
+            'created_at', *(f'property__search_index__{name}' for name in SEARCH_INDEX_FIELDS),
+        )
+
+    def list(self, request, *args, **kwargs):
+        """
+        The user's bookmarked properties, most recently bookmarked first,
+        paged with `cursor`.
+        """
+        return super().list(request, *args, **kwargs)
+
+    @action(methods=['GET'], detail=False, url_path='ids')
+    @swagger_auto_schema(
+        responses={
+            status.HTTP_200_OK: BookmarkIdsSerializer,
+        }
+    )
+    def ids(self, request: Request, *args, **kwargs):
+        """
+        IDs of every property the user has bookmarked.
+        """
+        data = {'property_ids': sorted(bookmarked_ids(request.user), key=str)}
+        return Response(BookmarkIdsSerializer(data).data, status=status.HTTP_200_OK)
+
+    @action(methods=['POST'], detail=False, url_path='add')
+    @swagger_auto_schema(
+        request_body=BookmarkRequestSerializer,
+        responses={
+            status.HTTP_200_OK: BookmarkIdsSerializer,
+        }
+    )
+    def add(self, request: Request, *args, **kwargs):
+        """
+        Bookmark several properties at once. Properties that are already
+        bookmarked are left as they are; the response lists the properties
+        that exist.
+        """
+        serializer = BookmarkRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        added = add_bookmarks(request.user, serializer.validated_data['property_ids'])
+        return Response(BookmarkIdsSerializer({'property_ids': added}).data, status=status.HTTP_200_OK)
+
+    @action(methods=['POST'], detail=False, url_path='remove')
+    @swagger_auto_schema(request_body=BookmarkRequestSerializer)
+    def remove(self, request: Request, *args, **kwargs):
+        """
+        Remove several bookmarks at once. Removing a property that is not
+        bookmarked is not an error.
+        """
+        serializer = BookmarkRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        remove_bookmarks(request.user, serializer.validated_data['property_ids'])
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class PropertyTileView(views.APIView):
+    """
+    Mapbox Vector Tile of the listed properties in one XYZ tile.
+    """
+    permission_classes = [permissions.AllowAny]
+    # Tiles are public and identical for every client, so they are served
+    # without authentication to keep them cacheable by the CDN and browser.
+    authentication_classes = []
+    swagger_schema = None
+
+    def get(self, request: Request, z: int, x: int, y: int):
+        if z > getattr(settings, 'PROPERTY_TILE_MAX_ZOOM', 20) or x >= (1 << z) or y >= (1 << z):
+            raise Http404("Tile out of range")
+
+        response = HttpResponse(get_tile(z, x, y), content_type="application/vnd.mapbox-vector-tile")
+        # Kept short: invalidate_tiles() only reaches the server-side cache
+        patch_cache_control(response, public=True, max_age=getattr(settings, 'PROPERTY_TILE_HTTP_MAX_AGE', 60))
+        return response
+
+
+class GeocodeCacheStatsView(views.APIView):
+    """
+    Hit/miss counters of the reverse geocoding cache, summed over the
+    workers that geocode property addresses.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        responses={
+            status.HTTP_200_OK: GeocodeCacheStatsSerializer,
+        }
+    )
+    def get(self, request, *args, **kwargs):
+        return Response(GeocodeCacheStatsSerializer(reverse_geocoder.shared_stats()).data, status=status.HTTP_200_OK)
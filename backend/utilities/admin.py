@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from functools import lru_cache
+
+
+def estimated_count(queryset):
+    """
+    Row count of an unfiltered queryset as estimated by PostgreSQL from
+    the table statistics in `pg_class`, without scanning. None for
+    filtered querysets, whose planner estimates can be far too low, and
+    when no estimate is available.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql' or queryset.query.where:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+            [connection.ops.quote_name(queryset.model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+    # -1 until the table has been vacuumed or analyzed
+    return int(row[0]) if row and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Admin changelist paginator that doesn't count unfiltered tables above
+    ADMIN_ESTIMATED_COUNT_THRESHOLD rows, using PostgreSQL's estimate
+    instead, which is what a changelist needs to draw its page links.
+    Filtered and searched changelists are counted exactly, so every page
+    of their results stays reachable.
+    """
+    @cached_property
+    def count(self):
+        threshold = getattr(settings, 'ADMIN_ESTIMATED_COUNT_THRESHOLD', 10000)
+        estimate = estimated_count(self.object_list)
+        if estimate is None or estimate < threshold:
+            return super().count
+        return estimate
+
+
+class ScalableAdminMixin:
+    """
+    ModelAdmin settings for changelists over large tables: estimated
+    instead of exact counts, and no second count of the unfiltered table.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@lru_cache(maxsize=None)
+def model_field_names(model, include_relations=True):
+    """
+    Names of a model's concrete fields, computed once per model. Reverse
+    relations are never included.
+    """
+    return tuple(
+        field.name for field in model._meta.concrete_fields
+        if include_relations or not field.is_relation
+    )
@@ -0,0 +1,73 @@
+from PIL import Image
+import numpy as np
+
+
+BASE83_CHARACTERS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+
+# The hash only keeps a few cosine components, so a tiny copy of the
+# image gives the same result as the full size one
+SAMPLE_SIZE = 32
+
+
+def _base83(value, length):
+    digits = []
+    for _ in range(length):
+        value, digit = divmod(value, 83)
+        digits.append(BASE83_CHARACTERS[digit])
+    return "".join(reversed(digits))
+
+
+def _srgb_to_linear(values):
+    values = values / 255.0
+    return np.where(values <= 0.04045, values / 12.92, ((values + 0.055) / 1.055) ** 2.4)
+
+
+def _linear_to_srgb(value):
+    value = min(max(value, 0.0), 1.0)
+    if value <= 0.0031308:
+        return int(value * 12.92 * 255 + 0.5)
+    return int((1.055 * value ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def encode_blurhash(image, x_components=4, y_components=3):
+    """
+    BlurHash string of a Pillow image (https://blurha.sh).
+
+    The image is reduced to SAMPLE_SIZE pixels first and every component is
+    computed at once as a NumPy tensor contraction, so the cost is
+    dominated by decoding the image rather than by the transform.
+    """
+    if not (1 <= x_components <= 9 and 1 <= y_components <= 9):
+        raise ValueError("BlurHash supports 1 to 9 components per axis")
+
+    sample = image.convert('RGB')
+    sample.thumbnail((SAMPLE_SIZE, SAMPLE_SIZE), Image.BILINEAR)
+    pixels = _srgb_to_linear(np.asarray(sample, dtype=np.float64))
+    height, width, _ = pixels.shape
+
+    cos_x = np.cos(np.pi * np.arange(x_components)[:, None] * np.arange(width)[None, :] / width)
+    cos_y = np.cos(np.pi * np.arange(y_components)[:, None] * np.arange(height)[None, :] / height)
+    # factors[j, i] is the (r, g, b) weight of basis function cos_x[i] * cos_y[j]
+    factors = np.einsum('jy,ix,yxc->jic', cos_y, cos_x, pixels) / (width * height)
+    factors[1:, :] *= 2
+    factors[0, 1:] *= 2
+
+    factors = factors.reshape(-1, 3)
+    dc, ac = factors[0], factors[1:]
+
+    result = _base83((x_components - 1) + (y_components - 1) * 9, 1)
+    if len(ac):
+        quantised_maximum = int(max(0, min(82, np.floor(np.abs(ac).max() * 166 - 0.5))))
+        maximum = (quantised_maximum + 1) / 166
+    else:
+        quantised_maximum, maximum = 0, 1
+    result += _base83(quantised_maximum, 1)
+
+    r, g, b = (_linear_to_srgb(channel) for channel in dc)
+    result += _base83((r << 16) + (g << 8) + b, 4)
+
+    scaled = ac / maximum
+    quantised = np.clip(np.floor(np.sign(scaled) * np.sqrt(np.abs(scaled)) * 9 + 9.5), 0, 18).astype(int)
+    for qr, qg, qb in quantised:
+        result += _base83(int(qr) * 19 * 19 + int(qg) * 19 + int(qb), 2)
+    return result
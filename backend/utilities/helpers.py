@@ -1,5 +1,7 @@
 def property_image_upload_handler(self, filename):
         """
         Custom handler for the upload_to parameter of the ImageField.
+        The storage names the file after its content, so only the directory
+        and the extension of this path are kept.
         """
-        return f'property/{self.property.id}/images/{filename}'
\ No newline at end of file
+        return f'property/images/{filename}'
\ No newline at end of file
@@ -0,0 +1,76 @@
+import hashlib
+import numpy as np
+import re
+
+
+SIGNATURE_SIZE = 64
+BAND_ROWS = 4
+SHINGLE_SIZE = 3
+
+MERSENNE_PRIME = (1 << 31) - 1
+
+# Fixed seed: stored signatures are only comparable with ones made by the
+# same hash functions, so changing it means recomputing every signature
+_random = np.random.default_rng(1_000_003)
+_A = _random.integers(1, MERSENNE_PRIME, SIGNATURE_SIZE, dtype=np.uint64)
+_B = _random.integers(0, MERSENNE_PRIME, SIGNATURE_SIZE, dtype=np.uint64)
+
+
+def _stable_hash(text, digest_size=4):
+    # hash() is salted per process, so it cannot be used for stored values
+    return hashlib.blake2b(text.encode(), digest_size=digest_size).digest()
+
+
+def shingles(text):
+    """
+    Overlapping SHINGLE_SIZE word sequences of a text, ignoring case and
+    punctuation. Texts shorter than that are a single shingle.
+    """
+    words = re.findall(r'\w+', text.lower())
+    if len(words) <= SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(text):
+    """
+    MinHash signature of a text: for each of SIGNATURE_SIZE hash functions,
+    the smallest hash of its shingles. The fraction of equal values in two
+    signatures estimates the Jaccard similarity of the shingle sets.
+    Empty texts have an empty signature.
+    """
+    tokens = shingles(text)
+    if not tokens:
+        return []
+    values = np.fromiter(
+        (int.from_bytes(_stable_hash(token), 'big') for token in tokens),
+        dtype=np.uint64, count=len(tokens),
+    )
+    # (a * x + b) mod p stays below 2**63, and the result fits an int4 column
+    hashed = (np.outer(_A, values) + _B[:, None]) % MERSENNE_PRIME
+    return hashed.min(axis=1).tolist()
+
+
+def lsh_bands(signature):
+    """
+    Locality sensitive hashing keys of a signature: one per band of
+    BAND_ROWS values. Two texts share a key when a whole band of their
+    signatures is equal, which is likely above a similarity of about
+    (BAND_ROWS / SIGNATURE_SIZE) ** (1 / BAND_ROWS) and unlikely below it.
+    """
+    return [
+        int.from_bytes(
+            _stable_hash(f"{start}:" + ",".join(map(str, signature[start:start + BAND_ROWS]))),
+            'big', signed=True,
+        )
+        for start in range(0, len(signature), BAND_ROWS)
+    ]
+
+
+def estimated_similarity(first, second):
+    """
+    Jaccard similarity estimated from two signatures.
+    """
+    if not first or len(first) != len(second):
+        return 0.0
+    return sum(a == b for a, b in zip(first, second)) / len(first)
@@ -0,0 +1,137 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+import binascii
+import json
+
+
+class Row(models.Func):
+    """
+    SQL row constructor, e.g. `ROW("created_at", "id")`, so a keyset can be
+    compared as a whole and matched against a composite index.
+    """
+    function = 'ROW'
+    output_field = models.Field()
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opaque cursor pagination that seeks past the last row of the previous
+    page with `ROW(a, b) < ROW(x, y)` instead of an OFFSET.
+
+    Every page costs the same as the first when a composite index matches
+    the ordering, and rows inserted while a client scrolls cannot shift the
+    pages it has not fetched yet. The ordering must end with a unique field
+    and use one direction; views can override it with `keyset_ordering`.
+    """
+    ordering = ('-created_at', '-pk')
+    page_size = 50
+    max_page_size = 200
+    page_size_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = _('Invalid cursor')
+
+    def get_ordering(self, view):
+        ordering = getattr(view, 'keyset_ordering', self.ordering)
+        if len({name.startswith('-') for name in ordering}) != 1:
+            raise ImproperlyConfigured("KeysetPagination ordering must use a single direction.")
+        return ordering
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        ordering = self.get_ordering(view)
+        self.descending = ordering[0].startswith('-')
+        opts = queryset.model._meta
+        self.fields = [
+            opts.pk if name.lstrip('-') == 'pk' else opts.get_field(name.lstrip('-'))
+            for name in ordering
+        ]
+
+        queryset = queryset.order_by(*ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            keyset = Row(*(models.F(field.attname) for field in self.fields))
+            lookup = 'lt' if self.descending else 'gt'
+            queryset = queryset.alias(keyset=keyset).filter(**{
+                f'keyset__{lookup}': Row(*(models.Value(value, output_field=field) for field, value in zip(self.fields, position)))
+            })
+
+        page_size = self.get_page_size(request)
+        # One extra row tells whether there is a next page without a COUNT
+        page = list(queryset[:page_size + 1])
+        self.has_next = len(page) > page_size
+        page = page[:page_size]
+        self.last_row = page[-1] if page else None
+        return page
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            values = json.loads(urlsafe_b64decode(encoded.encode()))
+            if not isinstance(values, list) or len(values) != len(self.fields):
+                raise ValueError
+            return [field.to_python(value) for field, value in zip(self.fields, values)]
+        except (binascii.Error, UnicodeDecodeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row):
+        values = [field.value_to_string(row) for field in self.fields]
+        encoded = urlsafe_b64encode(json.dumps(values).encode()).decode()
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.last_row)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+        ]
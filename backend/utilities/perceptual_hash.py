@@ -0,0 +1,80 @@
+from PIL import Image
+import numpy as np
+
+
+HASH_BITS = 64
+BAND_BITS = 16
+BAND_COUNT = HASH_BITS // BAND_BITS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+
+def dhash(image):
+    """
+    64 bit difference hash of a Pillow image: each bit tells whether a
+    pixel of a 9x8 grayscale thumbnail is brighter than its left neighbour.
+    Survives rescaling, recompression and small colour changes.
+    """
+    pixels = np.asarray(image.convert('L').resize((9, 8), Image.LANCZOS), dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def to_signed(value):
+    """
+    Fit an unsigned 64 bit hash into a signed BIGINT column.
+    """
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def to_unsigned(value):
+    return value & ((1 << HASH_BITS) - 1)
+
+
+def hamming_distance(first, second):
+    return bin(to_unsigned(first) ^ to_unsigned(second)).count('1')
+
+
+def hash_detail(value):
+    """
+    How much structure a hash captured: the number of its bits that go
+    against the majority. Flat or evenly lit photos (blank walls, floor
+    plans) hash to nearly all zeros or all ones and score close to 0.
+    """
+    ones = bin(to_unsigned(value)).count('1')
+    return min(ones, HASH_BITS - ones)
+
+
+def _band_key(position, band):
+    # The band position is part of the key so equal values in different
+    # bands do not match each other
+    return (position << BAND_BITS) | band
+
+
+def hash_bands(value):
+    """
+    Multi-index hashing keys of a hash: one per 16 bit band.
+    """
+    value = to_unsigned(value)
+    return [
+        _band_key(position, (value >> (position * BAND_BITS)) & BAND_MASK)
+        for position in range(BAND_COUNT)
+    ]
+
+
+def probe_bands(value, radius=1):
+    """
+    Band keys to look up to find every hash within `BAND_COUNT * (radius + 1) - 1`
+    bits of `value`: by the pigeonhole principle one of its bands then
+    differs from ours by at most `radius` bits. Only radius 0 and 1 are
+    supported, which covers distances up to 7.
+    """
+    if radius not in (0, 1):
+        raise ValueError("radius must be 0 or 1")
+    value = to_unsigned(value)
+    keys = []
+    for position in range(BAND_COUNT):
+        band = (value >> (position * BAND_BITS)) & BAND_MASK
+        keys.append(_band_key(position, band))
+        if radius:
+            keys.extend(_band_key(position, band ^ (1 << bit)) for bit in range(BAND_BITS))
+    return keys
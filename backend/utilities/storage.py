@@ -0,0 +1,77 @@
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.core.files.utils import validate_file_name
+import hashlib
+import os
+import tempfile
+
+
+def content_sha256(content):
+    """
+    Hex SHA-256 of a Django File's content, read in chunks.
+    """
+    digest = hashlib.sha256()
+    # chunks() rewinds the file first, so it can be read again afterwards
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage that names files after the SHA-256 of their
+    content, inside the directory the upload_to handler chose.
+
+    Saving bytes that are already stored writes nothing and returns the
+    existing name, so identical uploads share one file.
+    """
+    def save(self, name, content, max_length=None):
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        digest = content_sha256(content)
+        directory = os.path.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        name = os.path.join(directory, digest[:2], f"{digest}{extension}")
+        validate_file_name(name, allow_relative_path=True)
+        if self.exists(name):
+            return name
+        return self._save_content_addressed(name, content)
+
+    def _save_content_addressed(self, name, content):
+        """
+        Write the file under a temporary name and link it into place.
+        Concurrent uploads of the same bytes both get the canonical name
+        instead of a suffixed copy, and the file never appears half written.
+        """
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, mode=self.directory_permissions_mode or 0o777, exist_ok=True)
+        fd, temporary = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                for chunk in content.chunks():
+                    handle.write(chunk if isinstance(chunk, bytes) else chunk.encode())
+            if self.file_permissions_mode is not None:
+                os.chmod(temporary, self.file_permissions_mode)
+            try:
+                os.link(temporary, full_path)
+            except FileExistsError:
+                # Stored meanwhile by another upload; same digest, same bytes
+                pass
+        finally:
+            os.remove(temporary)
+        return name
+
+    def save_derived(self, name, content, max_length=None):
+        """
+        Store a file generated from a stored one under `name` itself,
+        replacing any previous version, instead of under its own digest.
+
+        Different originals can produce byte identical derived files, which
+        must not end up shared: each is removed with its original.
+        """
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        if self.exists(name):
+            self.delete(name)
+        return super().save(name, content, max_length=max_length)
@@ -0,0 +1,193 @@
+from datetime import datetime, timezone as dt_timezone
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, TestCase
+from PIL import Image
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from urllib.parse import parse_qs, urlparse
+import os
+import random
+import tempfile
+import uuid
+
+from accounts.models import User
+from .blurhash import encode_blurhash
+from .minhash import SIGNATURE_SIZE, estimated_similarity, lsh_bands, minhash_signature, shingles
+from .pagination import KeysetPagination
+from .perceptual_hash import HASH_BITS, hamming_distance, hash_bands, hash_detail, probe_bands, to_signed, to_unsigned
+from .storage import ContentAddressedStorage
+
+
+def keyset_request(path='/users/', **params):
+    return Request(APIRequestFactory().get(path, params))
+
+
+class KeysetCursorTests(SimpleTestCase):
+    def setUp(self):
+        self.paginator = KeysetPagination()
+        self.paginator.fields = [User._meta.get_field('date_joined'), User._meta.pk]
+
+    def test_cursor_round_trip(self):
+        user = User(id=uuid.uuid4(), date_joined=datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc))
+        self.paginator.request = keyset_request(limit=10)
+        link = self.paginator.encode_cursor(user)
+
+        query = parse_qs(urlparse(link).query)
+        self.assertEqual(query['limit'], ['10'])
+        position = self.paginator.decode_cursor(keyset_request(cursor=query['cursor'][0]))
+        self.assertEqual(position, [user.date_joined, user.id])
+
+    def test_invalid_cursor(self):
+        for cursor in ('not base64!', 'W10=', 'WyJ4IiwgInkiXQ=='):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(NotFound):
+                    self.paginator.decode_cursor(keyset_request(cursor=cursor))
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Rows sharing a `date_joined` are told apart by the primary key
+        joined = [datetime(2024, 1, day, tzinfo=dt_timezone.utc) for day in (1, 2, 2, 2, 3)]
+        cls.users = [
+            User.objects.create_user(email=f"user{index}@example.com", date_joined=date_joined)
+            for index, date_joined in enumerate(joined)
+        ]
+
+    def paginate(self, **params):
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(User.objects.all(), keyset_request(**params))
+        return page, paginator.get_next_link()
+
+    def test_pages_follow_the_ordering_without_gaps_or_repeats(self):
+        expected = sorted(self.users, key=lambda user: (user.date_joined, user.pk), reverse=True)
+        seen = []
+        page, link = self.paginate(limit=2)
+        while True:
+            self.assertLessEqual(len(page), 2)
+            seen.extend(page)
+            if link is None:
+                break
+            page, link = self.paginate(**{key: values[0] for key, values in parse_qs(urlparse(link).query).items()})
+        self.assertEqual([user.pk for user in seen], [user.pk for user in expected])
+
+    def test_last_page_has_no_next_link(self):
+        page, link = self.paginate(limit=len(self.users))
+        self.assertEqual(len(page), len(self.users))
+        self.assertIsNone(link)
+
+
+def gradient_image():
+    image = Image.new('RGB', (32, 24))
+    image.putdata([(x * 8, y * 10, (x * y) % 256) for y in range(24) for x in range(32)])
+    return image
+
+
+class BlurHashTests(SimpleTestCase):
+    # Produced by the reference implementation (woltapp/blurhash, C
+    # encoder) for the same pixels. Images of at most SAMPLE_SIZE pixels
+    # are encoded unscaled, so the strings must match exactly.
+    def test_matches_reference_encoder(self):
+        self.assertEqual(encode_blurhash(gradient_image()), "LxH27h2lwtX3mAWUjwfAgFfmfTfi")
+        self.assertEqual(encode_blurhash(gradient_image(), 5, 4), "VxH27h2lwtX3a^mAWUjwfAfTgFfmfTfifNn$WsjsfNfT")
+
+    def test_solid_colour(self):
+        solid = Image.new('RGB', (16, 16), (120, 60, 200))
+        self.assertEqual(encode_blurhash(solid), "LBD%.Q$;fQ$;$;j]fQj]fQfQfQfQ")
+        self.assertEqual(encode_blurhash(solid, 1, 1), "00D%.Q")
+
+    def test_component_range(self):
+        with self.assertRaises(ValueError):
+            encode_blurhash(gradient_image(), 10, 3)
+
+
+def flip_bits(value, count, rng):
+    for bit in rng.sample(range(HASH_BITS), count):
+        value ^= 1 << bit
+    return value
+
+
+class PerceptualHashTests(SimpleTestCase):
+    def test_signed_round_trip(self):
+        for value in (0, 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1, 0x8000_0000_0000_0001):
+            with self.subTest(value=value):
+                signed = to_signed(value)
+                self.assertTrue(-(1 << 63) <= signed < 1 << 63)
+                self.assertEqual(to_unsigned(signed), value)
+
+    def test_probe_bands_find_every_hash_within_seven_bits(self):
+        rng = random.Random(42)
+        for _ in range(500):
+            value = rng.getrandbits(HASH_BITS)
+            distance = rng.randint(0, 7)
+            other = flip_bits(value, distance, rng)
+            self.assertEqual(hamming_distance(to_signed(value), other), distance)
+            self.assertTrue(set(probe_bands(to_signed(value))) & set(hash_bands(to_signed(other))))
+            if distance <= 3:
+                self.assertTrue(set(probe_bands(value, radius=0)) & set(hash_bands(other)))
+
+    def test_hash_detail(self):
+        self.assertEqual(hash_detail(0), 0)
+        self.assertEqual(hash_detail(to_signed((1 << 64) - 1)), 0)
+        self.assertEqual(hash_detail(0b1011), 3)
+
+
+def random_words(count, rng):
+    return [f"w{rng.getrandbits(32)}" for _ in range(count)]
+
+
+class MinHashTests(SimpleTestCase):
+    def test_signature_is_stable(self):
+        # Stored signatures are compared with ones computed later, possibly
+        # by another process, so the values must never change
+        text = "Bright two bedroom apartment close to the station"
+        signature = minhash_signature(text)
+        self.assertEqual(len(signature), SIGNATURE_SIZE)
+        self.assertEqual(signature[:4], [99022466, 10464829, 85927594, 87947139])
+        self.assertEqual(minhash_signature("BRIGHT two-bedroom apartment, close to the station!"), signature)
+        self.assertEqual(lsh_bands(minhash_signature(text)), lsh_bands(signature))
+
+    def test_empty_text(self):
+        self.assertEqual(shingles(" ... "), set())
+        self.assertEqual(minhash_signature(""), [])
+        self.assertEqual(lsh_bands([]), [])
+        self.assertEqual(estimated_similarity([], []), 0.0)
+
+    def test_lsh_threshold(self):
+        # The bands put the threshold at a similarity of about 0.5: texts
+        # around 0.8 must share a band, texts around 0.1 must not
+        rng = random.Random(7)
+        for _ in range(100):
+            words = random_words(60, rng)
+            similar = list(words)
+            for index in rng.sample(range(len(words)), 2):
+                similar[index] = random_words(1, rng)[0]
+            different = words[:12] + random_words(48, rng)
+
+            signature = minhash_signature(" ".join(words))
+            similar_signature = minhash_signature(" ".join(similar))
+            different_signature = minhash_signature(" ".join(different))
+            bands = set(lsh_bands(signature))
+            self.assertTrue(bands & set(lsh_bands(similar_signature)))
+            self.assertFalse(bands & set(lsh_bands(different_signature)))
+            self.assertGreater(estimated_similarity(signature, similar_signature), 0.6)
+            self.assertLess(estimated_similarity(signature, different_signature), 0.3)
+
+
+class ContentAddressedStorageTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.storage = ContentAddressedStorage(location=directory.name)
+
+    def test_identical_content_shares_one_file(self):
+        name = self.storage.save('images/first.JPG', ContentFile(b'same bytes'))
+        self.assertRegex(name, r'^images/[0-9a-f]{2}/[0-9a-f]{64}\.jpg$')
+        self.assertEqual(self.storage.save('images/second.jpg', ContentFile(b'same bytes')), name)
+
+    def test_concurrent_upload_keeps_the_canonical_name(self):
+        # Both uploads passed the exists() check before either wrote
+        name = self.storage.save('images/photo.png', ContentFile(b'same bytes'))
+        self.assertEqual(self.storage._save_content_addressed(name, ContentFile(b'same bytes')), name)
+        self.assertEqual(os.listdir(os.path.dirname(self.storage.path(name))), [os.path.basename(name)])